@@ -3,6 +3,7 @@ from poke_battle_sim.poke_sim import PokeSim
 from poke_battle_sim.core.pokemon import Pokemon
 from poke_battle_sim.core.trainer import Trainer
 from poke_battle_sim.core.battle import Battle
+from poke_battle_sim.core.async_battle import AsyncBattle
 
 
 PokeSim.start()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+import gc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from math import sqrt
+from random import Random
+from statistics import NormalDist
+
+from poke_battle_sim.poke_sim import PokeSim
+from poke_battle_sim.sink import battle_row, open_sink
+
+import poke_battle_sim.core.battle as bt
+import poke_battle_sim.core.trainer as tr
+import poke_battle_sim.conf.global_data as gd
+
+
+class BatchResult:
+    def __init__(self, confidence: float):
+        """
+        Running statistics of a batch of battles between the same two Trainers.
+
+        The win rate is trainer 1's and its interval is a Wilson score interval, battles without
+        a winner count as losses. The average turns interval uses the normal approximation.
+        Battles that raised an exception are only counted as errors.
+        """
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.battles = 0
+        self.t1_wins = 0
+        self.t2_wins = 0
+        self.draws = 0
+        self.errors = 0
+        self.turns_sum = 0
+        self.turns_sq_sum = 0
+        self.stop_reason = None
+
+    def add(self, outcomes: list[tuple[int | None, int]]):
+        for winner, turns in outcomes:
+            if winner is None:
+                self.errors += 1
+                continue
+            self.battles += 1
+            if winner == 1:
+                self.t1_wins += 1
+            elif winner == 2:
+                self.t2_wins += 1
+            else:
+                self.draws += 1
+            self.turns_sum += turns
+            self.turns_sq_sum += turns * turns
+
+    @property
+    def win_rate(self) -> float:
+        return self.t1_wins / self.battles if self.battles else 0.0
+
+    @property
+    def win_rate_interval(self) -> tuple[float, float]:
+        if not self.battles:
+            return 0.0, 1.0
+        n = self.battles
+        p = self.win_rate
+        z2 = self.z * self.z
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        half = self.z * sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return max(0.0, center - half), min(1.0, center + half)
+
+    @property
+    def avg_turns(self) -> float:
+        return self.turns_sum / self.battles if self.battles else 0.0
+
+    @property
+    def turns_interval(self) -> tuple[float, float]:
+        if self.battles < 2:
+            return 0.0, float("inf")
+        n = self.battles
+        variance = max(0.0, (self.turns_sq_sum - n * self.avg_turns**2) / (n - 1))
+        half = self.z * sqrt(variance / n)
+        return self.avg_turns - half, self.avg_turns + half
+
+
+def random_policy(battle: bt.Battle, trainer: tr.Trainer) -> list[str]:
+    """
+    Picks a random available move of the Trainer's current Pokemon with the battle's random
+    number generator, or Struggle if none is available. A Pokemon that can't select a move
+    (recharging or in the middle of a multi-turn move) gets its first move, which the battle
+    replaces.
+    """
+    moves = trainer.current_poke.get_available_moves()
+    if moves:
+        return ["move", battle.rng.choice(moves).name]
+    if moves is None:
+        return ["move", trainer.current_poke.moves[0].name]
+    return list(gd.STRUGGLE)
+
+
+def run_batch(
+    make_battle: callable,
+    t1_policy: callable = random_policy,
+    t2_policy: callable = random_policy,
+    width: float = 0.05,
+    turns_width: float = None,
+    confidence: float = 0.95,
+    min_battles: int = 30,
+    max_battles: int = 10000,
+    chunk_size: int = 100,
+    workers: int = 1,
+    threads: int = 1,
+    seed: int = None,
+    max_turns: int = 1000,
+    callback: callable = None,
+    sink: str = None,
+) -> BatchResult:
+    """
+    Runs battles in chunks until the win rate interval is narrower than width (and the average
+    turns interval narrower than turns_width if provided) or max_battles battles were run.
+
+    - make_battle: function without arguments returning a new, unstarted Battle; each chunk builds
+    one and replays it with Battle.reset
+    - t1_policy, t2_policy: functions (battle, trainer) returning the trainer's turn action
+    - workers: number of processes running chunks in parallel; make_battle and the policies must
+    be picklable (module level functions) when it is more than 1
+    - threads: number of threads running chunks in parallel, which only speeds up free-threaded
+    builds of Python; each chunk's battle is then given a random.Random of its own, so policies
+    drawing random numbers must use battle.rng as random_policy does
+    - seed: if provided, chunk i gets the seed seed + i and its game j is reset with
+    game_seed(seed + i, j), which makes the batch and each of its games reproducible
+    - max_turns: turns after which a battle is stopped and counted as a draw; battles raising an
+    exception are counted in BatchResult.errors, against max_battles but not in the statistics
+    - callback: function called with the BatchResult after every chunk
+    - sink: path of a .csv, .jsonl or .parquet file receiving a row per battle, see battle_row;
+    '{chunk}' in the path is replaced by the chunk number so that every chunk writes its own file
+    from the process running it, which is required with several workers or Parquet
+    """
+    if not callable(make_battle) or not callable(t1_policy) or not callable(t2_policy):
+        raise Exception("Attempted to run batch with invalid battle or policy function")
+    if not 0 < width <= 1 or (turns_width is not None and turns_width <= 0):
+        raise Exception("Attempted to run batch with invalid interval width")
+    if not 0 < confidence < 1:
+        raise Exception("Attempted to run batch with invalid confidence")
+    if chunk_size < 1 or workers < 1 or threads < 1 or max_battles < 1:
+        raise Exception("Attempted to run batch with invalid budget")
+    if workers > 1 and threads > 1:
+        raise Exception("Attempted to run batch with both worker processes and threads")
+    parallel = max(workers, threads)
+    if sink and "{chunk}" not in sink and (parallel > 1 or sink.lower().endswith(".parquet")):
+        raise Exception("Attempted to run batch with sink shared between chunks")
+
+    result = BatchResult(confidence)
+    executor = None
+    frozen = False
+    if workers > 1:
+        frozen = PokeSim.freeze_for_workers()
+        executor = ProcessPoolExecutor(workers)
+    elif threads > 1:
+        executor = ThreadPoolExecutor(threads)
+    chunk_id = 0
+    try:
+        while result.stop_reason is None:
+            chunks = []
+            remaining = max_battles - result.battles - result.errors
+            while remaining > 0 and len(chunks) < parallel:
+                n = min(chunk_size, remaining)
+                chunk_seed = seed + chunk_id if seed is not None else None
+                args = (make_battle, t1_policy, t2_policy, n, chunk_seed, max_turns, chunk_id, sink, threads > 1)
+                chunks.append(executor.submit(_run_chunk, *args) if executor else args)
+                remaining -= n
+                chunk_id += 1
+            if frozen:
+                # the first submission forked every worker
+                gc.unfreeze()
+                frozen = False
+            for chunk in chunks:
+                result.add(chunk.result() if executor else _run_chunk(*chunk))
+            if result.battles >= min_battles and _is_precise(result, width, turns_width):
+                result.stop_reason = "precision"
+            elif result.battles + result.errors >= max_battles:
+                result.stop_reason = "budget"
+            if callback:
+                callback(result)
+    finally:
+        if frozen:
+            gc.unfreeze()
+        if executor:
+            executor.shutdown()
+    return result
+
+
+def game_seed(chunk_seed: int | None, game: int) -> int | None:
+    """
+    Seed of a game of a chunk, distinct for every chunk seed and game below 2**32.
+    """
+    if chunk_seed is None:
+        return None
+    return chunk_seed * 2**32 + game
+
+
+def _is_precise(result: BatchResult, width: float, turns_width: float | None) -> bool:
+    low, high = result.win_rate_interval
+    if high - low > width:
+        return False
+    if turns_width is not None:
+        low, high = result.turns_interval
+        return high - low <= turns_width
+    return True
+
+
+def _run_chunk(
+    make_battle: callable,
+    t1_policy: callable,
+    t2_policy: callable,
+    n: int,
+    seed: int | None,
+    max_turns: int,
+    chunk_id: int = 0,
+    sink: str = None,
+    own_rng: bool = False,
+) -> list[tuple[int | None, int]]:
+    battle = make_battle()
+    if own_rng:
+        battle.rng = Random()
+    outcomes = []
+    result_sink = open_sink(sink.format(chunk=chunk_id)) if sink else None
+    try:
+        for i in range(n):
+            battle_seed = game_seed(seed, i)
+            battle.reset(seed=battle_seed)
+            battle.start()
+            try:
+                while not battle.is_finished() and battle.turn_count < max_turns:
+                    battle.turn(t1_policy(battle, battle.t1), t2_policy(battle, battle.t2))
+            except Exception:
+                outcomes.append((None, battle.turn_count))
+                continue
+            battle.get_cur_text()
+            if battle.get_winner() is battle.t1:
+                outcomes.append((1, battle.turn_count))
+            elif battle.get_winner() is battle.t2:
+                outcomes.append((2, battle.turn_count))
+            else:
+                outcomes.append((0, battle.turn_count))
+            if result_sink:
+                result_sink.add(battle_row(battle, chunk_id, i, battle_seed))
+    finally:
+        if result_sink:
+            result_sink.close()
+    return outcomes
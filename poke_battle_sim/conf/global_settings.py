@@ -49,6 +49,44 @@ DROWSY = 6
 INGRAIN = 7
 AQUA_RING = 8
 
+# Residual Effects (in end of turn processing order)
+RES_WISH = 0
+RES_INGRAIN = 1
+RES_AQUA_RING = 2
+RES_RAIN_DISH = 3
+RES_FUTURE_SIGHT = 4
+RES_DOOM_DESIRE = 5
+RES_LIGHT_SCREEN = 6
+RES_SAFEGUARD = 7
+RES_MIST = 8
+RES_TAILWIND = 9
+RES_LUCKY_CHANT = 10
+RES_IMPRISON = 11
+RES_PERISH_SONG = 12
+RES_NV_STATUS = 13
+RES_BINDING = 14
+RES_LEECH_SEED = 15
+RES_NIGHTMARE = 16
+RES_CURSE = 17
+RES_SOLAR_POWER = 18
+RES_WEATHER = 19
+RES_ABILITY = 20
+RES_ITEM = 21
+RES_FLINCH = 22
+RES_FORESIGHT = 23
+RES_DESTINY_BOND = 24
+RES_ROOST = 25
+RES_ENCORE = 26
+RES_EMBARGO = 27
+RES_HEAL_BLOCK = 28
+RES_UPROAR = 29
+RES_PROTECT = 30
+RES_ENDURE = 31
+RES_MAGIC_COAT = 32
+RES_SNATCH = 33
+RES_SUCKER_PUNCH = 34
+RES_YAWN = 35
+
 # Binding Types
 BIND = 1
 WRAP = 2
@@ -118,6 +156,7 @@ GEN = 13
 # Move Data Formatting
 MOVE_ID = 0
 MOVE_NAME = 1
+MOVE_GEN = 2
 MOVE_TYPE = 3
 MOVE_POWER = 4
 MOVE_PP = 5
@@ -130,6 +169,25 @@ MOVE_EFFECT_CHANCE = 11
 MOVE_EFFECT_AMT = 12
 MOVE_EFFECT_STAT = 13
 
+# Item Data Formatting
+ITEM_ID = 0
+ITEM_NAME = 1
+ITEM_POCKET = 2
+
+# Width of the move power buckets indexed by PokeSim
+POWER_BUCKET = 20
+
+# Random substreams of Battle.enable_random_streams
+STREAM_DAMAGE = 0
+STREAM_CRIT = 1
+STREAM_ACCURACY = 2
+STREAM_SECONDARY = 3
+STREAM_SPEED_TIE = 4
+
+# Reasons recorded in Battle.draw_reason
+DRAW_TURN_LIMIT = "turn-limit"
+DRAW_NO_PROGRESS = "no-progress"
+
 # CSV Numerical Columns
 POKEMON_STATS_NUMS = [0, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
 MOVES_NUM = [0, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
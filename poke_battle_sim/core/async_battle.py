@@ -0,0 +1,145 @@
+from __future__ import annotations
+import asyncio
+
+from poke_battle_sim.batch import random_policy
+
+import poke_battle_sim.core.battle as bt
+import poke_battle_sim.core.trainer as tr
+
+
+class AsyncBattle:
+    def __init__(
+        self,
+        battle: bt.Battle,
+        t1_action: callable,
+        t2_action: callable,
+        t1_selection: callable = None,
+        t2_selection: callable = None,
+        timeout: float = None,
+        default_action: callable = random_policy,
+    ):
+        """
+        Drives a Battle from asyncio, with coroutines choosing the Trainers' actions and switch-ins.
+
+        - t1_action, t2_action: coroutine functions (battle, trainer) returning a turn action
+        - t1_selection, t2_selection: coroutine functions (battle, trainer) returning the party
+        position of the Pokemon to send out; if not provided, the first available Pokemon is sent
+        - timeout: seconds given to each decision before falling back to its default
+        - default_action: function (battle, trainer) used when an action times out or is invalid
+
+        A selection needed in the middle of a turn suspends the turn: the battle is left as it is
+        at that point while the selection is awaited, then the turn is undone with the battle's
+        journal and replayed from the same random state with the answer. The battle's own random
+        number generator is used as given.
+
+        A marker is only taken on turns where a selection coroutine may be awaited, that is when a
+        Trainer with one has at least two Pokemon to choose from. If the battle has no journal,
+        the AsyncBattle enables one for these turns, clears it after every turn and disables it
+        once no selection can be awaited anymore. A journal enabled by the caller is kept, and the
+        entries of a turn are only cleared if it held no earlier markers.
+        """
+        if not isinstance(battle, bt.Battle):
+            raise Exception("Attempted to create AsyncBattle with invalid Battle")
+        if not callable(t1_action) or not callable(t2_action):
+            raise Exception("Attempted to create AsyncBattle with invalid action function")
+        self.battle = battle
+        self.actions = {battle.t1: t1_action, battle.t2: t2_action}
+        self.selections = {battle.t1: t1_selection, battle.t2: t2_selection}
+        self.timeout = timeout
+        self.default_action = default_action
+        self._answers = {battle.t1: [], battle.t2: []}
+        self._cursors = {battle.t1: 0, battle.t2: 0}
+        self._journal = None
+
+    async def run(self, max_turns: int = 1000) -> tr.Trainer | None:
+        if not self.battle.battle_started:
+            self.battle.start()
+        while not self.battle.is_finished() and self.battle.turn_count < max_turns:
+            await self.turn()
+        return self.battle.get_winner()
+
+    async def turn(self):
+        battle = self.battle
+        t1_turn, t2_turn = await asyncio.gather(
+            self._choose_action(battle.t1), self._choose_action(battle.t2)
+        )
+        selections = battle.t1.selection, battle.t2.selection
+        battle.t1.selection = self._select
+        battle.t2.selection = self._select
+        for trainer in self._answers:
+            self._answers[trainer].clear()
+        marker = None
+        if self._may_select():
+            if not battle.journal:
+                battle.enable_journal()
+                self._journal = battle.journal
+            marker = battle.mark()
+            state = battle.rng.getstate()
+            streams = battle.streams.getstate() if battle.streams else None
+        elif self._journal and battle.journal is self._journal:
+            battle.disable_journal()
+            self._journal = None
+        try:
+            while True:
+                self._cursors[battle.t1] = 0
+                self._cursors[battle.t2] = 0
+                try:
+                    battle.turn(t1_turn, t2_turn)
+                    break
+                except _SelectionNeeded as e:
+                    pos = await self._choose_selection(e.trainer)
+                    self._answers[e.trainer].append(pos)
+                    battle.undo_to(marker)
+                    battle.rng.setstate(state)
+                    if streams:
+                        battle.streams.setstate(streams)
+        finally:
+            battle.t1.selection, battle.t2.selection = selections
+            if marker == 0 or self._journal and battle.journal is self._journal:
+                battle.journal.clear()
+
+    def _may_select(self) -> bool:
+        return any(
+            self.selections[trainer]
+            and sum(p.is_alive and p is not trainer.current_poke for p in trainer.poke_list) > 1
+            for trainer in self.selections
+        )
+
+    async def _choose_action(self, trainer: tr.Trainer) -> list[str]:
+        try:
+            action = await asyncio.wait_for(
+                self.actions[trainer](self.battle, trainer), self.timeout
+            )
+        except asyncio.TimeoutError:
+            action = None
+        if not trainer.is_valid_action(action):
+            action = self.default_action(self.battle, trainer)
+        return action
+
+    async def _choose_selection(self, trainer: tr.Trainer) -> int | None:
+        if not self.selections[trainer]:
+            return None
+        try:
+            return await asyncio.wait_for(
+                self.selections[trainer](self.battle, trainer), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return None
+
+    def _select(self, trainer: tr.Trainer):
+        candidates = [p for p in trainer.poke_list if p.is_alive and p is not trainer.current_poke]
+        if len(candidates) < 2 or not self.selections[trainer]:
+            return
+        cursor = self._cursors[trainer]
+        if cursor == len(self._answers[trainer]):
+            raise _SelectionNeeded(trainer)
+        self._cursors[trainer] += 1
+        pos = self._answers[trainer][cursor]
+        if isinstance(pos, int) and 0 <= pos < len(trainer.poke_list):
+            trainer.current_poke = trainer.poke_list[pos]
+
+
+class _SelectionNeeded(Exception):
+    def __init__(self, trainer: tr.Trainer):
+        super().__init__("Selection needed")
+        self.trainer = trainer
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from weakref import ref
+
+
+class BackRef:
+    """
+    Descriptor for a back-pointer only used for lookups, stored as a weak reference so that the
+    pointed object is kept alive by its owner alone and no reference cycle is formed.
+
+    Reading it gives the object, or None if it was never set or has been freed.
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.key = "_" + name
+
+    def __get__(self, obj: object, objtype: type = None) -> object:
+        if obj is None:
+            return self
+        value = obj.__dict__.get(self.key)
+        return value() if value else None
+
+    def __set__(self, obj: object, value: object):
+        obj.__dict__[self.key] = ref(value) if value is not None else None
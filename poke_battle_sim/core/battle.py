@@ -1,7 +1,12 @@
 from __future__ import annotations
-from random import randrange
+import random
+from time import perf_counter_ns
 
 from poke_battle_sim.core.move import Move
+from poke_battle_sim.core.journal import Journal
+from poke_battle_sim.core.timer_wheel import TimerWheel
+from poke_battle_sim.core.text_log import TextLog
+from poke_battle_sim.core.profiler import profile_phases
 from poke_battle_sim.poke_sim import PokeSim
 
 import poke_battle_sim.core.pokemon as pk
@@ -11,22 +16,45 @@ import poke_battle_sim.core.battlefield as bf
 import poke_battle_sim.util.process_move as pm
 import poke_battle_sim.util.process_ability as pa
 import poke_battle_sim.util.process_item as pi
+import poke_battle_sim.util.serialize as sz
+import poke_battle_sim.util.random_streams as rs
 
 import poke_battle_sim.conf.global_settings as gs
 import poke_battle_sim.conf.global_data as gd
 
 
 class Battle:
-    def __init__(self, t1: tr.Trainer, t2: tr.Trainer, terrain: str = gs.OTHER_TERRAIN, weather: str = gs.CLEAR):
+    def __init__(
+        self,
+        t1: tr.Trainer,
+        t2: tr.Trainer,
+        terrain: str = gs.OTHER_TERRAIN,
+        weather: str = gs.CLEAR,
+        profiler: object = None,
+        text: bool = True,
+        text_log: TextLog = None,
+        max_turns: int = None,
+        stall_turns: int = None,
+        rng: random.Random = None,
+    ):
         """
         Creating a battle object requires exactly two Trainers with a valid party size
         and no overlapping Pokemon or Pokemon already in battle.
 
         The order of Trainers does not affect any battle mechanics.
 
-        Two optional parameters can be added :
+        Optional parameters:
         - terrain: the name of the terrain
         - weather: the starting weather
+        - profiler: a Profiler receiving the turn phases, move effect timings and the number of
+        times each item and ability handler ran for the battle
+        - text: whether the battle text is kept, disabling it speeds up simulations
+        - text_log: a TextLog keeping the battle text in bounded memory instead of lists
+        - max_turns: turns after which the battle ends in a draw
+        - stall_turns: consecutive turns without progress after which the battle ends in a draw,
+        a turn makes progress when pp is spent or the total hp of a side drops below its lowest value
+        - rng: the random.Random the battle draws its random numbers from, a new one by default,
+        so that battles run on several threads neither share nor contend for random state
         """
         if not isinstance(t1, tr.Trainer) or not isinstance(t2, tr.Trainer):
             raise Exception("Attempted to create Battle with invalid Trainer")
@@ -46,13 +74,35 @@ class Battle:
             raise Exception("Attempted to create Battle with invalid terrain type")
         if not isinstance(weather, str) or weather not in gs.WEATHERS:
             raise Exception("Attempted to create Battle with invalid weather")
+        if text_log is not None and not isinstance(text_log, TextLog):
+            raise Exception("Attempted to create Battle with invalid text log")
+        if rng is not None and not isinstance(rng, random.Random):
+            raise Exception("Attempted to create Battle with invalid random generator")
+        if max_turns is not None and (not isinstance(max_turns, int) or max_turns < 1):
+            raise Exception("Attempted to create Battle with invalid turn limit")
+        if stall_turns is not None and (not isinstance(stall_turns, int) or stall_turns < 1):
+            raise Exception("Attempted to create Battle with invalid stall limit")
 
         self.t1 = t1
         self.t2 = t2
         self.battle_started = False
-        self.all_text = []
+        self.text_log = text_log
+        self.all_text = text_log if text_log is not None else []
         self.cur_text = []
+        self.text_enabled = text
+        self.max_turns = max_turns
+        self.rng = rng if rng is not None else random.Random()
+        self.stall_turns = stall_turns
+        self.draw_reason = None
+        self.journal = None
+        self.streams = None
+        self.timer_wheel = TimerWheel()
+        self.expiring = {}
         self.battlefield = bf.Battlefield(self, terrain=terrain, weather=weather)
+        self.profiler = profiler
+        if profiler:
+            profile_phases(self, _PROFILED_PHASES, profiler)
+            profile_phases(self.battlefield, ("update",), profiler, prefix="battlefield_")
 
     def start(self):
         self.t1.start(self)
@@ -61,9 +111,12 @@ class Battle:
         self.t2_faint = False
         self.battle_started = True
         self.winner = None
+        self.draw_reason = None
         self.last_move = None
         self.last_move_next = None
         self.turn_count = 0
+        self.stall_count = 0
+        self.stall_state = self._stall_state() if self.stall_turns else None
         self.add_text(self.t1.name + " sent out " + self.t1.current_poke.nickname + "!")
         self.add_text(self.t2.name + " sent out " + self.t2.current_poke.nickname + "!")
 
@@ -160,7 +213,7 @@ class Battle:
                     - self.t2.current_poke.stats_effective[gs.SPD]
                 )
                 if spd_dif == 0:
-                    t1_first = randrange(2) < 1
+                    t1_first = rs.draw(self, gs.STREAM_SPEED_TIE, None, 2) < 1
                 else:
                     t1_first = spd_dif > 0
                     if self.battlefield.trick_room_count:
@@ -203,7 +256,8 @@ class Battle:
 
         if self.winner:
             return
-        self.battlefield.update()
+        self.expiring = self.timer_wheel.advance()
+        self.battlefield.update(self.expiring.get(self.battlefield, ()))
 
         dif = (
             self.t1.current_poke.stats_effective[gs.SPD]
@@ -216,11 +270,13 @@ class Battle:
             faster = self.t2
             slower = self.t1
         else:
-            faster = self.t1 if randrange(2) < 1 else self.t2
+            faster = self.t1 if rs.draw(self, gs.STREAM_SPEED_TIE, None, 2) < 1 else self.t2
             slower = self.t2 if faster is self.t1 else self.t1
 
         if faster.current_poke.is_alive:
             self._post_process_status(faster, slower)
+        else:
+            self.timer_wheel.postpone(faster)
         self._faint_check()
         if self.winner:
             return
@@ -228,18 +284,156 @@ class Battle:
             self._process_selection(faster)
         if slower.current_poke.is_alive:
             self._post_process_status(slower, faster)
+        else:
+            self.timer_wheel.postpone(slower)
         self._faint_check()
         if self.winner:
             return
         if not slower.current_poke.is_alive:
             self._process_selection(slower)
+        if self.max_turns or self.stall_turns:
+            self._draw_check()
+
+    def reset(self, seed: int = None):
+        """
+        Restores both Trainers, their Pokemon and the battlefield to the configuration the battle
+        was created with, reusing all of the existing objects. Call start() again to replay it.
+
+        If a seed is provided, the battle's random number generator is seeded with it, which makes
+        the replayed battle reproducible, and so are the random streams if enabled.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+            if self.streams:
+                self.streams.reseed(seed)
+        self.t1.reset()
+        self.t2.reset()
+        self.timer_wheel.reset()
+        self.battlefield.reset()
+        self.expiring = {}
+        self.battle_started = False
+        self.winner = None
+        self.draw_reason = None
+        self.all_text.clear()
+        self.cur_text = []
+        if self.journal:
+            self.journal.clear()
+
+    def close(self):
+        """
+        Detaches both Trainers and their Pokemon from the battle, ending it if it is still running,
+        and drops the journal and profiler hooks. Back-pointers to the battle are weak, so a
+        closed battle is freed as soon as it is no longer referenced. Use reset() and start() to
+        play it again. A battle used in a with block is closed when the block exits.
+        """
+        self.disable_journal()
+        if self.battle_started and not self.is_finished():
+            self._process_end_battle()
+        if self.text_log is not None:
+            self.text_log.hold = None
+            self.text_log.flush()
+        self.battle_started = False
+        self.t1.cur_battle = None
+        self.t2.cur_battle = None
+        for name in _PROFILED_PHASES:
+            self.__dict__.pop(name, None)
+        self.battlefield.__dict__.pop("update", None)
+
+    def __enter__(self) -> Battle:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def to_bytes(self, text: bool = True) -> bytes:
+        """
+        Encodes a started battle in a compact versioned format: both teams as in Trainer.to_bytes,
+        then the state of the battle, its Trainers, Pokemon and moves as fixed record layouts with
+        names written once.
+
+        The state of the random number generator is encoded when it is a plain random.Random, so
+        that the decoded battle continues with the same draws; otherwise the decoded battle gets a
+        new one. The journal, profiler, selection functions and random streams are not encoded.
+        With text=False the battle text is left out as well, which is required when the text is
+        kept in a TextLog.
+        """
+        return sz.encode_battle(self, text)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Battle:
+        return sz.decode_battle(data)
+
+    def enable_random_streams(self, seed: int):
+        """
+        Draws damage rolls, critical hits, accuracy checks, secondary effect chances and speed
+        ties from per-purpose substreams seeded with seed (see RandomStreams) instead of the battle's
+        random number generator, so that battles between variants of a team share those numbers,
+        which reduces the variance of paired comparisons. Other random draws still come from the
+        battle's random number generator.
+        """
+        if not isinstance(seed, int):
+            raise Exception("Attempted to enable random streams with invalid seed")
+        self.streams = rs.RandomStreams(seed)
+
+    def enable_journal(self):
+        """
+        Turns on journaling: from the first mark() on, every write to the battle, its Trainers,
+        Pokemon, moves, battlefield and timer wheel records the value it replaces, and
+        undo_to(marker) pops the entries written since the marker, restoring all of it in place as
+        it was when marked, which allows a search to explore turns without copying the battle.
+        Until the battle is closed, the lists, dicts and sets held by these objects are replaced
+        by recording copies and the classes of the objects by recording subclasses.
+
+        Randomness is not journaled: undoing a turn then replaying it gives the same outcome only
+        if the random number generator and random streams are restored by the caller as well.
+        A TextLog neither sends nor drops the text added after the first marker until the battle
+        is undone to it.
+        """
+        if not self.journal:
+            self.journal = Journal()
+
+    def disable_journal(self):
+        """
+        Turns off journaling, dropping all markers and giving the battle's objects back their
+        classes and plain containers.
+        """
+        if self.journal:
+            self.journal.unwatch()
+        self.journal = None
+        if self.text_log is not None:
+            self.text_log.hold = None
+
+    def mark(self) -> int:
+        if not self.journal:
+            raise Exception("Cannot mark Battle without journal enabled")
+        marker = self.journal.mark()
+        if not marker and self.text_log is not None:
+            self.text_log.hold = len(self.text_log)
+        if not self.journal.watching:
+            self.journal.watch(
+                self, (Battle, bf.Battlefield, TimerWheel, tr.Trainer, pk.Pokemon, Move), _UNJOURNALED_ATTRS
+            )
+        self.journal.record_length(self, "all_text")
+        self.journal.record_length(self, "cur_text", in_place=False)
+        return marker
+
+    def undo_to(self, marker: int):
+        if not self.journal:
+            raise Exception("Cannot undo Battle without journal enabled")
+        self.journal.undo_to(marker)
+        if not marker and self.text_log is not None:
+            self.text_log.hold = None
 
     def get_cur_text(self) -> list:
+        if self.text_log is not None:
+            return self.text_log.read_new()
         cur_t = self.cur_text
         self.cur_text = []
         return cur_t
 
     def get_all_text(self) -> list:
+        if self.text_log is not None:
+            return self.text_log.read_all()
         return self.all_text
 
     def _half_turn(
@@ -267,14 +461,20 @@ class Battle:
             else:
                 raise Exception("Trainer attempted to use item with invalid data format")
         elif self._process_pp(attacker.current_poke, a_move_data):
-            pm.process_move(
-                attacker.current_poke,
-                defender.current_poke,
-                self.battlefield,
-                self,
-                a_move_data.get_tcopy(),
-                not defender.has_moved,
-            )
+            if self.profiler:
+                self.profiler.enter("process_move", perf_counter_ns())
+            try:
+                pm.process_move(
+                    attacker.current_poke,
+                    defender.current_poke,
+                    self.battlefield,
+                    self,
+                    a_move_data.get_tcopy(),
+                    not defender.has_moved,
+                )
+            finally:
+                if self.profiler:
+                    self.profiler.exit("process_move", perf_counter_ns())
             if self.last_move_next:
                 self.last_move, self.last_move_next = self.last_move_next, None
             attacker.current_poke.update_last_moves()
@@ -306,76 +506,100 @@ class Battle:
 
     def _post_process_status(self, trainer: tr.Trainer, other: tr.Trainer):
         poke = trainer.current_poke
-        if trainer.wish:
-            trainer.wish -= 1
-            if not trainer.wish:
-                if poke.heal_block_count == 0:
-                    self.add_text(trainer.wish_poke + "'s wish came true!")
-                    trainer.current_poke.heal(trainer.current_poke.max_hp // 2)
-                trainer.wish_poke = None
-        if poke.v_status[gs.INGRAIN] and poke.heal_block_count == 0:
+        residuals = trainer.residuals | poke.residuals
+        residuals |= self.expiring.get(trainer, set())
+        residuals |= self.expiring.get(poke, set())
+        if poke.ability in _RESIDUAL_ABILITIES:
+            residuals.add(_RESIDUAL_ABILITIES[poke.ability])
+        if poke.nv_status:
+            residuals.add(gs.RES_NV_STATUS)
+        if self.battlefield.weather != gs.CLEAR:
+            residuals.add(gs.RES_WEATHER)
+        if poke.item in gd.END_TURN_ITEM_CHECK:
+            residuals.add(gs.RES_ITEM)
+        for residual in sorted(residuals):
+            if residual > gs.RES_PERISH_SONG and not poke.is_alive:
+                return
+            if _RESIDUAL_HANDLERS[residual](self, trainer, other, poke):
+                return
+        if poke.is_alive:
+            poke.has_moved = True
+
+    def _res_wish(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if poke.heal_block_count == 0:
+            self.add_text(trainer.wish_poke + "'s wish came true!")
+            poke.heal(poke.max_hp // 2)
+        trainer.wish_poke = None
+
+    def _res_ingrain(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.v_status[gs.INGRAIN]:
+            poke.residuals.discard(gs.RES_INGRAIN)
+        elif poke.heal_block_count == 0:
             self.add_text(poke.nickname + " absorbed nutrients with its roots!")
             heal_amt = max(1, poke.max_hp // 16)
             if poke.item == "big-root":
                 heal_amt = int(heal_amt * 1.3)
             poke.heal(heal_amt, text_skip=True)
-        if poke.v_status[gs.AQUA_RING] and poke.heal_block_count == 0:
+
+    def _res_aqua_ring(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.v_status[gs.AQUA_RING]:
+            poke.residuals.discard(gs.RES_AQUA_RING)
+        elif poke.heal_block_count == 0:
             self.add_text("A veil of water restored " + poke.nickname + "'s HP!")
             heal_amt = max(1, poke.max_hp // 16)
             if poke.item == "big-root":
                 heal_amt = int(heal_amt * 1.3)
             poke.heal(heal_amt, text_skip=True)
+
+    def _res_rain_dish(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if self.battlefield.weather == gs.RAIN and poke.has_ability("rain-dish"):
             poke.heal(poke.max_hp // 16)
-        if trainer.fs_count and poke.is_alive:
-            trainer.fs_count -= 1
-            if not trainer.fs_count:
-                poke.take_damage(trainer.fs_dmg)
-                self.add_text(poke.nickname + " took the Future Sight attack!")
-        if trainer.dd_count and poke.is_alive:
-            trainer.dd_count -= 1
-            if not trainer.dd_count:
-                poke.take_damage(trainer.dd_dmg)
-                self.add_text(poke.nickname + " took the Doom Desire attack!")
-        if trainer.reflect:
-            trainer.reflect -= 1
-        if trainer.light_screen:
-            trainer.light_screen -= 1
-            self.add_text(trainer.name + "'s Light Screen wore off.")
-        if trainer.safeguard:
-            trainer.safeguard -= 1
-            if not trainer.safeguard:
-                self.add_text(trainer.name + " is no longer protected by Safeguard.")
-        if trainer.mist:
-            trainer.mist -= 1
-            if not trainer.mist:
-                self.add_text(trainer.name + " is no longer protected by mist!")
-        if trainer.tailwind_count:
-            trainer.tailwind_count -= 1
-            if not trainer.tailwind_count:
-                self.add_text(trainer.name + "'s " + "tailwind petered out!")
-                for poke in trainer.poke_list:
-                    poke.stats_actual[gs.SPD] //= 2
-        if trainer.lucky_chant:
-            trainer.lucky_chant -= 1
-            if not trainer.lucky_chant:
-                self.add_text(trainer.name + "'s Lucky Chant wore off!")
+
+    def _res_future_sight(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if poke.is_alive:
+            poke.take_damage(trainer.fs_dmg)
+            self.add_text(poke.nickname + " took the Future Sight attack!")
+
+    def _res_doom_desire(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if poke.is_alive:
+            poke.take_damage(trainer.dd_dmg)
+            self.add_text(poke.nickname + " took the Doom Desire attack!")
+
+    def _res_light_screen(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(trainer.name + "'s Light Screen wore off.")
+
+    def _res_safeguard(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(trainer.name + " is no longer protected by Safeguard.")
+
+    def _res_mist(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(trainer.name + " is no longer protected by mist!")
+
+    def _res_tailwind(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(trainer.name + "'s " + "tailwind petered out!")
+        for p in trainer.poke_list:
+            p.stats_actual[gs.SPD] //= 2
+
+    def _res_lucky_chant(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(trainer.name + "'s Lucky Chant wore off!")
+
+    def _res_imprison(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if (
             trainer.imprisoned_poke
             and trainer.imprisoned_poke is not other.current_poke
         ):
             trainer.imprisoned_poke = None
-        if poke.perish_count and poke.is_alive:
-            poke.perish_count -= 1
-            if not poke.perish_count:
-                poke.faint()
-                return
+        if not trainer.imprisoned_poke:
+            trainer.residuals.discard(gs.RES_IMPRISON)
 
-        if not poke.is_alive:
-            return
+    def _res_perish_song(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon) -> bool:
+        if poke.is_alive:
+            poke.faint()
+            return True
+        return False
 
+    def _res_nv_status(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.nv_status and (
-            (poke.has_ability("shed-skin") and randrange(10) < 3)
+            (poke.has_ability("shed-skin") and self.rng.randrange(10) < 3)
             or (poke.has_ability("hydration") and self.battlefield.weather == gs.RAIN)
         ):
             pm.cure_nv_status(poke.nv_status, poke, self)
@@ -400,12 +624,14 @@ class Battle:
                 self.add_text(poke.nickname + " was healed by its Poison Heal!")
                 poke.heal(max(1, poke.max_hp // 8))
             poke.nv_counter += 1
-        if poke.v_status[gs.BINDING_COUNT] and poke.is_alive:
+
+    def _res_binding(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon) -> bool:
+        if poke.v_status[gs.BINDING_COUNT]:
             if poke.binding_poke is other.current_poke and poke.binding_type:
                 self.add_text(poke.nickname + " is hurt by " + poke.binding_type + "!")
                 poke.take_damage(max(1, poke.max_hp // 16))
                 if not poke.is_alive:
-                    return
+                    return True
                 poke.v_status[gs.BINDING_COUNT] -= 1
                 if not poke.v_status[gs.BINDING_COUNT]:
                     poke.binding_type = None
@@ -414,103 +640,126 @@ class Battle:
                 poke.v_status[gs.BINDING_COUNT] = 0
                 poke.binding_type = None
                 poke.binding_poke = None
-        if poke.v_status[gs.LEECH_SEED] and poke.is_alive:
-            self.add_text(poke.nickname + "'s health is sapped by Leech Seed!")
-            heal_amt = poke.take_damage(max(1, poke.max_hp // 8))
-            if poke.item == "big-root":
-                heal_amt = int(heal_amt * 1.3)
-            other = (
-                self.t2.current_poke
-                if poke is self.t1.current_poke
-                else self.t1.current_poke
-            )
-            if other.is_alive:
-                if not poke.has_ability("liquid-ooze"):
-                    if other.heal_block_count == 0:
-                        other.heal(heal_amt)
-                else:
-                    other.take_damage(heal_amt)
-                    self.add_text(other.nickname + " sucked up the liquid ooze!")
-        if poke.v_status[gs.NIGHTMARE] and poke.is_alive:
-            self.add_text(poke.nickname + " is locked in a nightmare!")
-            poke.take_damage(max(1, poke.max_hp // 4))
-        if poke.v_status[gs.CURSE] and poke.is_alive:
-            self.add_text(poke.nickname + " is afflicted by the curse!")
-            poke.take_damage(max(1, poke.max_hp // 4))
+        if not poke.v_status[gs.BINDING_COUNT]:
+            poke.residuals.discard(gs.RES_BINDING)
+        return False
+
+    def _res_leech_seed(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.v_status[gs.LEECH_SEED]:
+            poke.residuals.discard(gs.RES_LEECH_SEED)
+            return
+        self.add_text(poke.nickname + "'s health is sapped by Leech Seed!")
+        heal_amt = poke.take_damage(max(1, poke.max_hp // 8))
+        if poke.item == "big-root":
+            heal_amt = int(heal_amt * 1.3)
+        other_poke = other.current_poke
+        if other_poke.is_alive:
+            if not poke.has_ability("liquid-ooze"):
+                if other_poke.heal_block_count == 0:
+                    other_poke.heal(heal_amt)
+            else:
+                other_poke.take_damage(heal_amt)
+                self.add_text(other_poke.nickname + " sucked up the liquid ooze!")
+
+    def _res_nightmare(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.v_status[gs.NIGHTMARE]:
+            poke.residuals.discard(gs.RES_NIGHTMARE)
+            return
+        self.add_text(poke.nickname + " is locked in a nightmare!")
+        poke.take_damage(max(1, poke.max_hp // 4))
+
+    def _res_curse(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.v_status[gs.CURSE]:
+            poke.residuals.discard(gs.RES_CURSE)
+            return
+        self.add_text(poke.nickname + " is afflicted by the curse!")
+        poke.take_damage(max(1, poke.max_hp // 4))
+
+    def _res_solar_power(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.has_ability("solar-power"):
             self.add_text(poke.nickname + "was hurt by its Solar Power!")
             poke.take_damage(max(1, poke.max_hp // 8))
-        if not poke.is_alive:
-            return
 
+    def _res_weather(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         self.battlefield.process_weather_effects(poke)
 
-        if not poke.is_alive:
-            return
-
+    def _res_ability(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         pa.end_turn_abilities(poke, self)
+
+    def _res_item(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         pi.end_turn_items(poke, self)
 
-        if poke.v_status[gs.FLINCHED]:
-            poke.v_status[gs.FLINCHED] = 0
+    def _res_flinch(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        poke.v_status[gs.FLINCHED] = 0
+        poke.residuals.discard(gs.RES_FLINCH)
+
+    def _res_foresight(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.foresight_target and poke.foresight_target is not other:
             poke.foresight_target = None
-        if poke.bide_count:
-            poke.bide_count -= 1
-        if poke.mr_count:
-            poke.mr_count -= 1
-        if poke.db_count:
-            poke.db_count -= 1
-            if not poke.mr_count:
-                poke.mr_target = None
-        if poke.charged:
-            poke.charged -= 1
-        if poke.taunt:
-            poke.taunt -= 1
+        if not poke.foresight_target:
+            poke.residuals.discard(gs.RES_FORESIGHT)
+
+    def _res_destiny_bond(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        if not poke.mr_count:
+            poke.mr_target = None
+
+    def _res_roost(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.r_types:
             poke.types = poke.r_types
             poke.r_types = None
-        if poke.encore_count:
-            poke.encore_count -= 1
-            if not poke.encore_count:
-                poke.encore_move = None
-                for move in poke.moves:
-                    move.encore_blocked = False
-                    self.add_text(poke.nickname + "'s encore ended.")
-        if poke.embargo_count:
-            poke.embargo_count -= 1
-            if not poke.encore_count:
-                self.add_text(poke.nickname + " can use items again!")
-        if poke.heal_block_count:
-            poke.heal_block_count -= 1
-            if not poke.heal_block_count:
-                self.add_text(poke.nickname + "'s Heal Block wore off!")
-        if poke.uproar:
-            poke.uproar -= 1
-            if not poke.uproar:
-                self.add_text(poke.nickname + " calmed down.")
+        poke.residuals.discard(gs.RES_ROOST)
+
+    def _res_encore(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        poke.encore_move = None
+        for move in poke.moves:
+            move.encore_blocked = False
+        self.add_text(poke.nickname + "'s encore ended.")
+
+    def _res_embargo(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(poke.nickname + " can use items again!")
+
+    def _res_heal_block(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(poke.nickname + "'s Heal Block wore off!")
+
+    def _res_uproar(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        self.add_text(poke.nickname + " calmed down.")
+
+    def _res_protect(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.protect:
             poke.protect = False
             poke.invulnerable = False
             if poke.last_successful_move not in ["protect", "detect", "endure"]:
                 poke.protect_count = 0
+        poke.residuals.discard(gs.RES_PROTECT)
+
+    def _res_endure(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.endure:
             poke.endure = False
             if poke.last_successful_move not in ["protect", "detect", "endure"]:
                 poke.protect_count = 0
-        if poke.magic_coat:
-            poke.magic_coat = False
-        if poke.snatch:
-            poke.snatch = False
-        if poke.sucker_punch_check:
-            poke.sucker_punch_check = False
-        if not poke.has_moved:
-            poke.has_moved = True
+        poke.residuals.discard(gs.RES_ENDURE)
+
+    def _res_magic_coat(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        poke.magic_coat = False
+        poke.residuals.discard(gs.RES_MAGIC_COAT)
+
+    def _res_snatch(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        poke.snatch = False
+        poke.residuals.discard(gs.RES_SNATCH)
+
+    def _res_sucker_punch(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
+        poke.sucker_punch_check = False
+        poke.residuals.discard(gs.RES_SUCKER_PUNCH)
+
+    def _res_yawn(self, trainer: tr.Trainer, other: tr.Trainer, poke: pk.Pokemon):
         if poke.v_status[gs.DROWSY]:
             poke.v_status[gs.DROWSY] -= 1
-            if not poke.v_status[gs.DROWSY] and not poke.nv_status:
+            if poke.v_status[gs.DROWSY]:
+                return
+            if not poke.nv_status:
                 poke.nv_status = gs.ASLEEP
                 self.add_text(poke.nickname + " fell asleep!")
+        poke.residuals.discard(gs.RES_YAWN)
 
     def _pre_process_move(self, trainer: tr.Trainer, t_move: list) -> list:
         if t_move[gs.PPM_MOVE] == gd.RECHARGING or t_move[gs.PPM_MOVE] == gd.BIDING:
@@ -550,6 +799,30 @@ class Battle:
         self.add_text(winner.name + " has defeated " + loser.name + "!")
         self.winner = winner
 
+    def _draw_check(self):
+        if self.stall_turns:
+            t1_low, t2_low, pp = self.stall_state
+            t1_hp, t2_hp, cur_pp = self._stall_state()
+            self.stall_count = 0 if t1_hp < t1_low or t2_hp < t2_low or cur_pp < pp else self.stall_count + 1
+            self.stall_state = (min(t1_hp, t1_low), min(t2_hp, t2_low), cur_pp)
+            if self.stall_count >= self.stall_turns:
+                self._draw(gs.DRAW_NO_PROGRESS)
+                return
+        if self.max_turns and self.turn_count >= self.max_turns:
+            self._draw(gs.DRAW_TURN_LIMIT)
+
+    def _stall_state(self) -> tuple[int, int, int]:
+        return (
+            sum(poke.cur_hp for poke in self.t1.poke_list),
+            sum(poke.cur_hp for poke in self.t2.poke_list),
+            sum(move.current_pp for poke in self.t1.poke_list + self.t2.poke_list for move in poke.moves),
+        )
+
+    def _draw(self, reason: str):
+        self._process_end_battle()
+        self.add_text("The battle between " + self.t1.name + " and " + self.t2.name + " ended in a draw!")
+        self.draw_reason = reason
+
     def _process_selection(self, selector: tr.Trainer, can_skip: bool = True) -> bool:
         if self.winner:
             return True
@@ -753,7 +1026,7 @@ class Battle:
                     < self.t2.current_poke.stats_effective[gs.SPD]
                 )
             else:
-                return randrange(2) < 1
+                return rs.draw(self, gs.STREAM_SPEED_TIE, None, 2) < 1
         return self.t2.current_poke.has_ability("stall")
 
     def _ltail_check(self) -> bool:
@@ -781,7 +1054,7 @@ class Battle:
                     < self.t2.current_poke.stats_effective[gs.SPD]
                 )
             else:
-                return randrange(2) < 1
+                return rs.draw(self, gs.STREAM_SPEED_TIE, None, 2) < 1
         return (
             self.t2.current_poke.item == "lagging-tail"
             or self.t2.current_poke.item == "full-incense"
@@ -792,8 +1065,10 @@ class Battle:
             return
         if t1_move_data.name == "sucker-punch" and t2_move_data.category != gs.STATUS:
             self.t1.current_poke.sucker_punch_check = True
+            self.t1.current_poke.add_residual(gs.RES_SUCKER_PUNCH)
         if t2_move_data.name == "sucker-punch" and t1_move_data.category != gs.STATUS:
             self.t1.current_poke.sucker_punch_check = True
+            self.t1.current_poke.add_residual(gs.RES_SUCKER_PUNCH)
 
     def _pressure_check(self, attacker: pk.Pokemon, move_data: Move):
         if (
@@ -805,23 +1080,85 @@ class Battle:
 
     def _prio_boost_check(self, t1_first: bool) -> bool:
         if self.t1.current_poke.prio_boost and self.t2.current_poke.prio_boost:
-            return randrange(2) < 1
+            return rs.draw(self, gs.STREAM_SPEED_TIE, None, 2) < 1
         elif self.t1.current_poke.prio_boost or self.t2.current_poke.prio_boost:
             return self.t1.current_poke.prio_boost
         else:
             return t1_first
 
     def add_text(self, txt: str):
-        if not self.winner:
+        if self.text_enabled and not self.winner:
             self.all_text.append(txt)
-            self.cur_text.append(txt)
+            if self.text_log is None:
+                self.cur_text.append(txt)
 
     def _pop_text(self):
+        if not self.text_enabled:
+            return
         self.all_text.pop()
-        self.cur_text.pop()
+        if self.text_log is None:
+            self.cur_text.pop()
 
     def is_finished(self) -> bool:
-        return not not self.winner
+        return not not self.winner or self.draw_reason is not None
 
     def get_winner(self) -> tr.Trainer | None:
         return self.winner
+
+
+_PROFILED_PHASES = (
+    "turn",
+    "_pre_process_move",
+    "_half_turn",
+    "_faint_check",
+    "_post_process_status",
+    "_process_selection",
+)
+_UNJOURNALED_ATTRS = frozenset(
+    ("journal", "profiler", "streams", "rng", "text_log", "all_text", "cur_text", "md", "selection")
+)
+_RESIDUAL_ABILITIES = {
+    "rain-dish": gs.RES_RAIN_DISH,
+    "solar-power": gs.RES_SOLAR_POWER,
+    "speed-boost": gs.RES_ABILITY,
+    "slow-start": gs.RES_ABILITY,
+    "bad-dreams": gs.RES_ABILITY,
+}
+_RESIDUAL_HANDLERS = {
+    gs.RES_WISH: Battle._res_wish,
+    gs.RES_INGRAIN: Battle._res_ingrain,
+    gs.RES_AQUA_RING: Battle._res_aqua_ring,
+    gs.RES_RAIN_DISH: Battle._res_rain_dish,
+    gs.RES_FUTURE_SIGHT: Battle._res_future_sight,
+    gs.RES_DOOM_DESIRE: Battle._res_doom_desire,
+    gs.RES_LIGHT_SCREEN: Battle._res_light_screen,
+    gs.RES_SAFEGUARD: Battle._res_safeguard,
+    gs.RES_MIST: Battle._res_mist,
+    gs.RES_TAILWIND: Battle._res_tailwind,
+    gs.RES_LUCKY_CHANT: Battle._res_lucky_chant,
+    gs.RES_IMPRISON: Battle._res_imprison,
+    gs.RES_PERISH_SONG: Battle._res_perish_song,
+    gs.RES_NV_STATUS: Battle._res_nv_status,
+    gs.RES_BINDING: Battle._res_binding,
+    gs.RES_LEECH_SEED: Battle._res_leech_seed,
+    gs.RES_NIGHTMARE: Battle._res_nightmare,
+    gs.RES_CURSE: Battle._res_curse,
+    gs.RES_SOLAR_POWER: Battle._res_solar_power,
+    gs.RES_WEATHER: Battle._res_weather,
+    gs.RES_ABILITY: Battle._res_ability,
+    gs.RES_ITEM: Battle._res_item,
+    gs.RES_FLINCH: Battle._res_flinch,
+    gs.RES_FORESIGHT: Battle._res_foresight,
+    gs.RES_DESTINY_BOND: Battle._res_destiny_bond,
+    gs.RES_ROOST: Battle._res_roost,
+    gs.RES_ENCORE: Battle._res_encore,
+    gs.RES_EMBARGO: Battle._res_embargo,
+    gs.RES_HEAL_BLOCK: Battle._res_heal_block,
+    gs.RES_UPROAR: Battle._res_uproar,
+    gs.RES_PROTECT: Battle._res_protect,
+    gs.RES_ENDURE: Battle._res_endure,
+    gs.RES_MAGIC_COAT: Battle._res_magic_coat,
+    gs.RES_SNATCH: Battle._res_snatch,
+    gs.RES_SUCKER_PUNCH: Battle._res_sucker_punch,
+    gs.RES_YAWN: Battle._res_yawn,
+}
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from poke_battle_sim.core.timer_wheel import Countdown
+from poke_battle_sim.core.back_ref import BackRef
+
 import poke_battle_sim.core.battle as bt
 
 import poke_battle_sim.util.process_ability as pa
@@ -8,47 +11,51 @@ import poke_battle_sim.conf.global_settings as gs
 
 
 class Battlefield:
+    cur_battle = BackRef()
+    weather_count = Countdown("weather_count")
+    gravity_count = Countdown("gravity_count")
+    trick_room_count = Countdown("trick_room_count")
+
     def __init__(self, battle: bt.Battle, terrain: str = gs.OTHER_TERRAIN, weather: str = gs.CLEAR):
-        self.weather = weather
+        self.cur_battle = battle
         self._terrain = terrain
+        self.o_weather = weather
+        self.reset()
+
+    def reset(self):
+        self.countdowns = {}
+        self.weather = self.o_weather
         self.acc_modifier = 1
         self.weather_count = -1
         self.gravity_count = 0
         self.trick_room_count = 0
         self.gravity_stats = None
-        self.cur_battle = battle
 
-    def update(self):
-        if self.weather_count != 0:
-            self.weather_count -= 1
-            if self.weather_count != 0:
-                if self.weather == gs.SANDSTORM:
-                    self.cur_battle.add_text("The sandstorm is raging.")
-                elif self.weather == gs.RAIN:
-                    self.cur_battle.add_text("Rain continues to fall.")
-                elif self.weather == gs.HARSH_SUNLIGHT:
-                    self.cur_battle.add_text("The sunlight is strong.")
-                elif self.weather == gs.HAIL:
-                    self.cur_battle.add_text("The hail is crashing down.")
-            else:
-                if self.weather == gs.SANDSTORM:
-                    self.cur_battle.add_text("The sandstorm subsided.")
-                elif self.weather == gs.RAIN:
-                    self.cur_battle.add_text("The rain stopped.")
-                elif self.weather == gs.HARSH_SUNLIGHT:
-                    self.cur_battle.add_text("The harsh sunlight faded.")
-                elif self.weather == gs.HAIL:
-                    self.cur_battle.add_text("The hail stopped.")
-        if self.gravity_count:
-            self.gravity_count -= 1
-            if not self.gravity_count:
-                self.acc_modifier = 1
-                self.cur_battle.t1.current_poke.grounded = False
-                self.cur_battle.t2.current_poke.grounded = False
-        if self.trick_room_count:
-            self.trick_room_count -= 1
-            if not self.trick_room_count:
-                self.cur_battle.add_text("The twisted dimensions returned to normal!")
+    def update(self, expiring: set = ()):
+        if "weather_count" in expiring:
+            if self.weather == gs.SANDSTORM:
+                self.cur_battle.add_text("The sandstorm subsided.")
+            elif self.weather == gs.RAIN:
+                self.cur_battle.add_text("The rain stopped.")
+            elif self.weather == gs.HARSH_SUNLIGHT:
+                self.cur_battle.add_text("The harsh sunlight faded.")
+            elif self.weather == gs.HAIL:
+                self.cur_battle.add_text("The hail stopped.")
+        elif self.weather_count:
+            if self.weather == gs.SANDSTORM:
+                self.cur_battle.add_text("The sandstorm is raging.")
+            elif self.weather == gs.RAIN:
+                self.cur_battle.add_text("Rain continues to fall.")
+            elif self.weather == gs.HARSH_SUNLIGHT:
+                self.cur_battle.add_text("The sunlight is strong.")
+            elif self.weather == gs.HAIL:
+                self.cur_battle.add_text("The hail is crashing down.")
+        if "gravity_count" in expiring:
+            self.acc_modifier = 1
+            self.cur_battle.t1.current_poke.grounded = False
+            self.cur_battle.t2.current_poke.grounded = False
+        if "trick_room_count" in expiring:
+            self.cur_battle.add_text("The twisted dimensions returned to normal!")
 
     def change_weather(self, weather: int):
         if self.weather != weather:
@@ -0,0 +1,426 @@
+from __future__ import annotations
+from queue import Queue
+from weakref import WeakSet
+
+from poke_battle_sim.core.back_ref import BackRef
+
+
+class Journal:
+    def __init__(self):
+        """
+        A Journal stores undo entries for a battle's objects, undone in reverse order,
+        which allows a battle to be explored in place and rolled back to any marker.
+
+        Once watch() is called, the watched objects and the lists, dicts, sets and Queues they
+        hold record the previous value of every attribute and the previous contents of every
+        container as they are written, so a marker costs nothing and undoing only pops the
+        entries written since it. Undoing restores the very objects in use.
+        """
+        self.entries = []
+        self.epoch = 0
+        self.watching = False
+        self._types = ()
+        self._skipped = frozenset()
+        self._classes = {}
+        self._journaled = set()
+        self._watched = WeakSet()
+        self._originals = []
+
+    def mark(self) -> int:
+        self.epoch += 1
+        return len(self.entries)
+
+    def record_length(self, obj: object, attr: str, in_place: bool = True):
+        value = getattr(obj, attr)
+        self.entries.append((_LENGTH, obj, attr, (value, len(value), in_place)))
+
+    def watch(self, root: object, types: tuple, skipped: frozenset):
+        """
+        Starts recording the writes to every object of one of types reachable from root through
+        their attributes and the lists, tuples, dicts, sets and Queues they hold, except through
+        the attributes named in skipped, and to the objects and containers they are given later.
+
+        The classes of the watched objects are swapped for recording subclasses of the same name
+        and their lists, dicts and sets replaced by recording copies until unwatch() is called.
+        """
+        self._types = types
+        self._skipped = skipped
+        self.watching = True
+        memo = {}
+        self._adopt(root, memo)
+        self._originals = [pair for pair in memo.values() if pair[0] is not pair[1]]
+
+    def unwatch(self):
+        """
+        Stops recording and gives the watched objects back their classes and plain containers,
+        reusing the containers they held when watched.
+        """
+        if not self.watching:
+            return
+        self.watching = False
+        originals = {id(wrapped): original for original, wrapped in self._originals}
+        done = {}
+        watched = list(self._watched)
+        for obj in watched:
+            obj.__class__ = obj.__class__.__base__
+        for obj in watched:
+            d = obj.__dict__
+            for k, v in d.items():
+                if type(v) in _WRAPPERS or type(v) is _JournaledQueue:
+                    d[k] = _unwrap(v, originals, done)
+        self._watched = WeakSet()
+        self._originals = []
+        self.entries.clear()
+
+    def undo_to(self, marker: int):
+        entries = self.entries
+        if not isinstance(marker, int) or marker < 0 or marker > len(entries):
+            raise Exception("Attempted to undo Journal to invalid marker")
+        self.epoch += 1
+        while len(entries) > marker:
+            kind, obj, attr, value = entries.pop()
+            if kind == _ATTR:
+                if value is _MISSING:
+                    obj.__dict__.pop(attr, None)
+                else:
+                    obj.__dict__[attr] = value
+            elif kind == _CONTENTS:
+                _restore_contents(obj, value)
+            else:
+                value, length, in_place = value
+                if in_place:
+                    del value[length:]
+                    setattr(obj, attr, value)
+                else:
+                    setattr(obj, attr, value[:length])
+
+    def clear(self):
+        self.entries.clear()
+        self.epoch += 1
+
+    def _adopt(self, value, memo: dict):
+        kind = type(value)
+        if kind in _ATOMIC or kind in _WRAPPERS or kind is _JournaledQueue or kind in self._journaled:
+            return value
+        pair = memo.get(id(value))
+        if pair is not None:
+            return pair[1]
+        if kind is list or kind is dict or kind is set:
+            wrapped = _WRAPPERS_OF[kind](value)
+            wrapped.journal = self
+            wrapped.epoch = 0
+            memo[id(value)] = (value, wrapped)
+            adopt = self._adopt
+            if kind is list:
+                for i, v in enumerate(value):
+                    if type(v) not in _ATOMIC:
+                        list.__setitem__(wrapped, i, adopt(v, memo))
+            elif kind is dict:
+                if not all(type(k) in _ATOMIC and type(v) in _ATOMIC for k, v in value.items()):
+                    dict.clear(wrapped)
+                    dict.update(wrapped, ((adopt(k, memo), adopt(v, memo)) for k, v in value.items()))
+            elif not all(type(v) in _ATOMIC for v in value):
+                set.clear(wrapped)
+                set.update(wrapped, [adopt(v, memo) for v in value])
+            return wrapped
+        if kind is Queue:
+            memo[id(value)] = (value, value)
+            value.__class__ = _JournaledQueue
+            value.journal = self
+            value.epoch = 0
+            items = value.queue
+            for i, item in enumerate(items):
+                items[i] = self._adopt(item, memo)
+            return value
+        if isinstance(value, tuple):
+            memo[id(value)] = (value, value)
+            for item in value:
+                self._adopt(item, memo)
+            return value
+        if isinstance(value, self._types):
+            memo[id(value)] = (value, value)
+            value.__class__ = self._journaled_class(kind)
+            self._watched.add(value)
+            d = value.__dict__
+            skipped = self._skipped
+            for k, v in d.items():
+                if k not in skipped and type(v) not in _ATOMIC:
+                    d[k] = self._adopt(v, memo)
+        return value
+
+    def _journaled_class(self, cls: type) -> type:
+        journaled = self._classes.get(cls)
+        if journaled is not None:
+            return journaled
+        # a BackRef is recorded under its key, other data descriptors through the writes they make
+        keys = dict.fromkeys(self._skipped)
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, BackRef):
+                    keys[name] = attr.key
+                elif hasattr(type(attr), "__set__"):
+                    keys[name] = None
+        entries = self.entries
+        adopt = self._adopt
+        set_attr = object.__setattr__
+        del_attr = object.__delattr__
+
+        def __setattr__(obj, name, value):
+            key = keys.get(name, name)
+            if key is not None:
+                old = obj.__dict__.get(key, _MISSING)
+                if old is not value:
+                    entries.append((_ATTR, obj, key, old))
+                    if type(value) not in _ATOMIC:
+                        value = adopt(value, {})
+            set_attr(obj, name, value)
+
+        def __delattr__(obj, name):
+            key = keys.get(name, name)
+            if key is not None:
+                entries.append((_ATTR, obj, key, obj.__dict__.get(key, _MISSING)))
+            del_attr(obj, name)
+
+        journaled = type(cls.__name__, (cls,), {
+            "__setattr__": __setattr__,
+            "__delattr__": __delattr__,
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+        })
+        self._classes[cls] = journaled
+        self._journaled.add(journaled)
+        return journaled
+
+
+def _record(container):
+    # the contents are recorded once per marker, before their first change
+    journal = container.journal
+    if container.epoch != journal.epoch:
+        container.epoch = journal.epoch
+        journal.entries.append((_CONTENTS, container, None, _SNAPSHOTS[type(container)](container)))
+
+
+def _adopt_item(container, value):
+    return value if type(value) in _ATOMIC else container.journal._adopt(value, {})
+
+
+class _JournaledList(list):
+    __slots__ = ("journal", "epoch")
+
+    def __setitem__(self, index, value):
+        _record(self)
+        if type(index) is slice:
+            value = [_adopt_item(self, v) for v in value]
+        else:
+            value = _adopt_item(self, value)
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        _record(self)
+        list.__delitem__(self, index)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, count):
+        _record(self)
+        return list.__imul__(self, count)
+
+    def append(self, value):
+        _record(self)
+        list.append(self, _adopt_item(self, value))
+
+    def extend(self, values):
+        _record(self)
+        list.extend(self, [_adopt_item(self, v) for v in values])
+
+    def insert(self, index, value):
+        _record(self)
+        list.insert(self, index, _adopt_item(self, value))
+
+    def pop(self, index=-1):
+        _record(self)
+        return list.pop(self, index)
+
+    def remove(self, value):
+        _record(self)
+        list.remove(self, value)
+
+    def clear(self):
+        _record(self)
+        list.clear(self)
+
+    def sort(self, *args, **kwargs):
+        _record(self)
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        _record(self)
+        list.reverse(self)
+
+
+class _JournaledDict(dict):
+    __slots__ = ("journal", "epoch")
+
+    def __setitem__(self, key, value):
+        _record(self)
+        dict.__setitem__(self, _adopt_item(self, key), _adopt_item(self, value))
+
+    def __delitem__(self, key):
+        _record(self)
+        dict.__delitem__(self, key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        _record(self)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        _record(self)
+        return dict.popitem(self)
+
+    def update(self, *args, **kwargs):
+        _record(self)
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, _adopt_item(self, key), _adopt_item(self, value))
+
+    def clear(self):
+        _record(self)
+        dict.clear(self)
+
+
+class _JournaledSet(set):
+    __slots__ = ("journal", "epoch")
+
+    def add(self, value):
+        _record(self)
+        set.add(self, _adopt_item(self, value))
+
+    def discard(self, value):
+        _record(self)
+        set.discard(self, value)
+
+    def remove(self, value):
+        _record(self)
+        set.remove(self, value)
+
+    def pop(self):
+        _record(self)
+        return set.pop(self)
+
+    def clear(self):
+        _record(self)
+        set.clear(self)
+
+    def update(self, *others):
+        _record(self)
+        for other in others:
+            set.update(self, [_adopt_item(self, v) for v in other])
+
+    def difference_update(self, *others):
+        _record(self)
+        set.difference_update(self, *others)
+
+    def intersection_update(self, *others):
+        _record(self)
+        set.intersection_update(self, *others)
+
+    def symmetric_difference_update(self, other):
+        _record(self)
+        set.symmetric_difference_update(self, [_adopt_item(self, v) for v in other])
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+
+class _JournaledQueue(Queue):
+    def _put(self, item):
+        _record(self)
+        Queue._put(self, _adopt_item(self, item))
+
+    def _get(self):
+        _record(self)
+        return Queue._get(self)
+
+
+def _restore_contents(container, contents):
+    if isinstance(container, list):
+        list.__setitem__(container, slice(None), contents)
+    elif isinstance(container, dict):
+        dict.clear(container)
+        dict.update(container, contents)
+    elif isinstance(container, set):
+        set.clear(container)
+        set.update(container, contents)
+    else:
+        container.queue.clear()
+        container.queue.extend(contents)
+
+
+def _unwrap(value, originals: dict, done: dict):
+    kind = type(value)
+    if kind is _JournaledQueue:
+        value.__class__ = Queue
+        del value.journal, value.epoch
+        items = value.queue
+        for i, item in enumerate(items):
+            items[i] = _unwrap(item, originals, done)
+        return value
+    base = _WRAPPERS.get(kind)
+    if base is None:
+        return value
+    result = done.get(id(value))
+    if result is not None:
+        return result
+    result = originals.get(id(value))
+    if result is None:
+        result = base()
+    done[id(value)] = result
+    if base is dict:
+        items = [(_unwrap(k, originals, done), _unwrap(v, originals, done)) for k, v in dict.items(value)]
+    else:
+        items = [_unwrap(v, originals, done) for v in base.__iter__(value)]
+    result.clear()
+    if base is list:
+        result.extend(items)
+    else:
+        result.update(items)
+    return result
+
+
+_MISSING = object()
+_ATTR = 0
+_LENGTH = 1
+_CONTENTS = 2
+_ATOMIC = frozenset((int, float, str, bool, type(None)))
+_WRAPPERS = {_JournaledList: list, _JournaledDict: dict, _JournaledSet: set}
+_WRAPPERS_OF = {list: _JournaledList, dict: _JournaledDict, set: _JournaledSet}
+_SNAPSHOTS = {
+    _JournaledList: list,
+    _JournaledDict: dict,
+    _JournaledSet: set,
+    _JournaledQueue: lambda queue: list(queue.queue),
+}
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from poke_battle_sim.poke_sim import PokeSim
+
 import poke_battle_sim.conf.global_settings as gs
 
 
 class Move:
     def __init__(self, move_data: list):
+        if not isinstance(move_data, list):
+            move_data = list(move_data)
         self.md = move_data
         self.id = move_data[gs.MOVE_ID]
         self.name = move_data[gs.MOVE_NAME]
@@ -24,6 +28,7 @@ class Move:
         self.pos = None
         self.disabled = 0
         self.encore_blocked = False
+        self.plain = PokeSim.is_plain_move(self.id)
 
     def reset(self):
         self.current_pp = self.max_pp
@@ -4,6 +4,8 @@ from queue import Queue
 
 from poke_battle_sim.poke_sim import PokeSim
 from poke_battle_sim.core.move import Move
+from poke_battle_sim.core.timer_wheel import Countdown
+from poke_battle_sim.core.back_ref import BackRef
 
 import poke_battle_sim.core.battle as bt
 
@@ -16,6 +18,19 @@ import poke_battle_sim.conf.global_data as gd
 
 
 class Pokemon:
+    cur_battle = BackRef()
+    enemy = BackRef()
+    mr_count = Countdown()
+    db_count = Countdown(gs.RES_DESTINY_BOND)
+    perish_count = Countdown(gs.RES_PERISH_SONG)
+    encore_count = Countdown(gs.RES_ENCORE)
+    bide_count = Countdown()
+    embargo_count = Countdown(gs.RES_EMBARGO)
+    heal_block_count = Countdown(gs.RES_HEAL_BLOCK)
+    uproar = Countdown(gs.RES_UPROAR)
+    charged = Countdown()
+    taunt = Countdown()
+
     def __init__(
         self,
         name_or_id: str | int,
@@ -133,6 +148,7 @@ class Pokemon:
             self.nature = nature.lower()
             self.calculate_stats_actual()
 
+        self.o_stats_actual = [stat for stat in self.stats_actual]
         self.max_hp = self.stats_actual[gs.HP]
         if cur_hp and (not isinstance(cur_hp, int) or cur_hp < 0 or cur_hp > self.max_hp):
             raise Exception("Attempted to create Pokemon with invalid hp value")
@@ -151,6 +167,7 @@ class Pokemon:
         for i in range(len(self.moves)):
             self.moves[i].pos = i
         self.original_moves = self.moves
+        self.update_move_slots()
 
         if ability and (
             not isinstance(ability, str) or not PokeSim.check_ability(ability.lower())
@@ -187,11 +204,32 @@ class Pokemon:
             raise Exception("Attempted to create Pokemon with invalid friendship value")
         self.friendship = friendship
 
+        self.o_cur_hp = self.cur_hp
+        self.o_nv_status = self.nv_status
+        self.o_nv_counter = self.nv_counter
         self.is_alive = self.cur_hp != 0
         self.in_battle = False
         self.transformed = False
         self.invulnerable = False
 
+    def reset(self):
+        """
+        Restores the Pokemon to the configuration it was created with, reusing its objects.
+        """
+        self.battle_end_reset()
+        self.moves = self.original_moves
+        for i, move in enumerate(self.moves):
+            move.reset()
+            move.pos = i
+        self.update_move_slots()
+        self.stats_actual[:] = self.o_stats_actual
+        self.max_hp = self.stats_actual[gs.HP]
+        self.cur_hp = self.o_cur_hp
+        self.is_alive = self.cur_hp != 0
+        self.nv_status = self.o_nv_status
+        self.nv_counter = self.o_nv_counter
+        self.invulnerable = False
+
     def calculate_stats_actual(self):
         stats_actual = []
         nature_stat_changes = [1.0 for _ in range(6)]
@@ -233,6 +271,8 @@ class Pokemon:
             self.stats_effective[gs.SPD] //= 4
 
     def reset_stats(self):
+        self.countdowns = {}
+        self.residuals = set()
         self.v_status = [0 for _ in range(gs.V_STATUS_NUM)]
         self.stat_stages = [0 for _ in range(gs.STAT_NUM)]
         self.accuracy_stage = 0
@@ -310,6 +350,7 @@ class Pokemon:
         self.ability = self.original_ability
         if self.transformed:
             self.reset_transform()
+        self.update_move_slots()
         self.item = self.o_item
         self.h_item = self.item
         self.old_pp = [move.current_pp for move in self.moves]
@@ -415,9 +456,32 @@ class Pokemon:
     def get_move_data(self, move_name: str) -> Move:
         if self.copied and move_name == self.copied.name:
             return self.copied
-        for move in self.moves:
+        slot = self.move_slot(move_name)
+        if slot is not None:
+            return self.moves[slot]
+
+    def update_move_slots(self):
+        """
+        Indexes the current moves by name, call it whenever self.moves is replaced or changed.
+        """
+        self.move_slots = {}
+        for i, move in enumerate(self.moves):
+            self.move_slots.setdefault(move.name, i)
+
+    def move_slot(self, move_name: str) -> int | None:
+        """
+        Position of the move in self.moves, rebuilding the index if it is out of date.
+        """
+        if not isinstance(move_name, str):
+            return None
+        slot = self.move_slots.get(move_name)
+        if slot is not None and slot < len(self.moves) and self.moves[slot].name == move_name:
+            return slot
+        for i, move in enumerate(self.moves):
             if move.name == move_name:
-                return move
+                self.update_move_slots()
+                return i
+        return None
 
     def is_move(self, move_name: str) -> bool:
         if self.copied and self.copied.current_pp:
@@ -425,37 +489,70 @@ class Pokemon:
                 return True
             if move_name == "mimic":
                 return False
-        av_moves = self.get_available_moves()
-        for move in av_moves:
-            if move.name == move_name:
+        return self._slot_available(move_name, self.available_mask())
+
+    def is_available_move(self, move_name: str) -> bool:
+        """
+        Whether a move with this name is among get_available_moves(), without building the list.
+        """
+        mask = self.available_mask()
+        if self.copied and self.copied.current_pp:
+            if move_name == "mimic":
+                return False
+            if move_name == self.copied.name and self._slot_available("mimic", mask):
                 return True
-        return False
+        return self._slot_available(move_name, mask)
 
-    def get_available_moves(self) -> list | None:
+    def _slot_available(self, move_name: str, mask: int | None) -> bool:
+        slot = self.move_slot(move_name)
+        if not mask or slot is None:
+            return False
+        if len(self.move_slots) == len(self.moves):
+            return bool(mask >> slot & 1)
+        return any(mask >> i & 1 for i, move in enumerate(self.moves) if move.name == move_name)
+
+    def available_mask(self) -> int | None:
+        """
+        Bitmask of the slots of self.moves that can be selected this turn, or None if the
+        Pokemon can't select a move. A set mimic slot stands for the copied move.
+        """
         if not self.next_moves.empty() or self.recharging:
+            return None
+        copied = self.copied if self.copied and self.copied.current_pp else None
+        last_move = (
+            self.last_move.name
+            if self.last_move and (self.tormented or self.has_ability("truant"))
+            else None
+        )
+        imprisoner = self.trainer.imprisoned_poke
+        if not imprisoner or imprisoner is not self.enemy.current_poke:
+            imprisoner = None
+        mask = 0
+        for i, move in enumerate(self.moves):
+            if move.disabled or not move.current_pp:
+                continue
+            if copied and move.name == "mimic":
+                move = copied
+            if (
+                move.name == last_move
+                or self.taunt and move.category == gs.STATUS
+                or self.grounded and move in gd.GROUNDED_CHECK
+                or imprisoner and imprisoner.move_slot(move.name) is not None
+                or self.locked_move and move.name != self.locked_move
+            ):
+                continue
+            mask |= 1 << i
+        return mask
+
+    def get_available_moves(self) -> list | None:
+        mask = self.available_mask()
+        if mask is None:
             return
-        av_moves = [move for move in self.moves if not move.disabled and move.current_pp]
-        if self.copied and self.copied.current_pp:
-            for i in range(len(av_moves)):
-                if av_moves[i].name == "mimic":
-                    av_moves[i] = self.copied
-        if self.tormented and av_moves and self.last_move:
-            av_moves = [move for move in av_moves if move.name != self.last_move.name]
-        if self.taunt and av_moves:
-            av_moves = [move for move in av_moves if move.category != gs.STATUS]
-        if self.grounded and av_moves:
-            av_moves = [move for move in av_moves if move not in gd.GROUNDED_CHECK]
-        if (
-            self.trainer.imprisoned_poke
-            and self.trainer.imprisoned_poke is self.enemy.current_poke
-            and av_moves
-        ):
-            i_moves = [move.name for move in self.trainer.imprisoned_poke.moves]
-            av_moves = [move for move in av_moves if move.name not in i_moves]
-        if self.has_ability("truant") and self.last_move and av_moves:
-            av_moves = [move for move in av_moves if move.name != self.last_move.name]
-        if self.locked_move:
-            av_moves = [move for move in av_moves if move.name == self.locked_move]
+        copied = self.copied if self.copied and self.copied.current_pp else None
+        av_moves = []
+        for i, move in enumerate(self.moves):
+            if mask >> i & 1:
+                av_moves.append(copied if copied and move.name == "mimic" else move)
         return av_moves
 
     def transform(self, target: Pokemon):
@@ -488,6 +585,7 @@ class Pokemon:
         for move in self.moves:
             move.max_pp = min(5, move.max_pp)
             move.current_pp = move.max_pp
+        self.update_move_slots()
         self.stats_actual = target.stats_actual
         self.stat_stages = target.stat_stages
         self.accuracy_stage = target.accuracy_stage
@@ -513,6 +611,7 @@ class Pokemon:
         self.nature = self.original[10]
         self.nature_effect = self.original[11]
         self.moves = self.original[12]
+        self.update_move_slots()
         self.stats_actual = self.original[13]
         self.original = None
         self.transformed = False
@@ -539,6 +638,25 @@ class Pokemon:
         if self.has_ability("natural-cure") and self.nv_status:
             pm.cure_nv_status(self.nv_status, self, self.cur_battle)
 
+    def add_residual(self, residual: int):
+        if residual in self.residuals:
+            return
+        self.residuals.add(residual)
+
+    def sync_residuals(self):
+        for residual, is_active in (
+            (gs.RES_INGRAIN, self.v_status[gs.INGRAIN]),
+            (gs.RES_AQUA_RING, self.v_status[gs.AQUA_RING]),
+            (gs.RES_BINDING, self.v_status[gs.BINDING_COUNT]),
+            (gs.RES_LEECH_SEED, self.v_status[gs.LEECH_SEED]),
+            (gs.RES_NIGHTMARE, self.v_status[gs.NIGHTMARE]),
+            (gs.RES_CURSE, self.v_status[gs.CURSE]),
+            (gs.RES_FLINCH, self.v_status[gs.FLINCHED]),
+            (gs.RES_YAWN, self.v_status[gs.DROWSY]),
+        ):
+            if is_active:
+                self.add_residual(residual)
+
     def update_last_moves(self):
         if self.last_move_next:
             self.last_move = self.last_move_next
@@ -610,7 +728,7 @@ class Pokemon:
         return False
 
     def _focus_band_check(self) -> bool:
-        if self.item == "focus-band" and randrange(10) < 1:
+        if self.item == "focus-band" and self.cur_battle.rng.randrange(10) < 1:
             self.cur_battle.add_text(self.nickname + " hung on using its Focus Band!")
             return True
         return False
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import json
+from time import perf_counter_ns
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Aggregates the events sent by a Battle created with profiler=Profiler().
+
+        - phases: phase name -> [calls, total ns], nested phases are included in their parent
+        - effects: move effect id -> [calls, total ns] of the move effect dispatch
+        - handlers: (handler, item or ability) -> number of times the handler ran for the held
+        item or ability, whether or not it had an effect
+
+        Any object with the same enter, exit, effect and count methods can be used instead.
+        """
+        self.phases = {}
+        self.effects = {}
+        self.handlers = {}
+        self._starts = []
+
+    def enter(self, phase: str, t: int):
+        self._starts.append(t)
+
+    def exit(self, phase: str, t: int):
+        entry = self.phases.setdefault(phase, [0, 0])
+        entry[0] += 1
+        entry[1] += t - self._starts.pop()
+
+    def effect(self, ef_id: int, ns: int):
+        entry = self.effects.setdefault(ef_id, [0, 0])
+        entry[0] += 1
+        entry[1] += ns
+
+    def count(self, handler: str, name: str):
+        key = (handler, name)
+        self.handlers[key] = self.handlers.get(key, 0) + 1
+
+    def report(self, top: int = 10) -> str:
+        lines = ["phase                        calls     total ms     mean us"]
+        for phase, (calls, ns) in sorted(self.phases.items(), key=lambda e: -e[1][1]):
+            lines.append(f"{phase:<24} {calls:>9} {ns / 1e6:>12.3f} {ns / calls / 1e3:>11.3f}")
+        lines.append("")
+        lines.append("move effect                  calls     total ms     mean us")
+        effects = sorted(self.effects.items(), key=lambda e: -e[1][1])[:top]
+        for ef_id, (calls, ns) in effects:
+            lines.append(f"{ef_id:<24} {calls:>9} {ns / 1e6:>12.3f} {ns / calls / 1e3:>11.3f}")
+        lines.append("")
+        lines.append("handler                                         calls")
+        handlers = sorted(self.handlers.items(), key=lambda e: -e[1])[:top]
+        for (handler, name), calls in handlers:
+            lines.append(f"{handler + ':' + str(name):<44} {calls:>9}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "phases": self.phases,
+                    "effects": {str(ef_id): entry for ef_id, entry in self.effects.items()},
+                    "handlers": [[h, n, calls] for (h, n), calls in self.handlers.items()],
+                },
+                file,
+                indent=2,
+            )
+
+
+def profile_phases(obj: object, names: tuple[str, ...], profiler: object, prefix: str = ""):
+    """
+    Shadows the given methods of obj with wrappers sending enter and exit events to profiler,
+    so objects created without a profiler run the plain methods.
+    """
+    for name in names:
+        phase = prefix + name.strip("_")
+        setattr(obj, name, _profiled(getattr(obj, name), phase, profiler))
+
+
+def _profiled(func: callable, phase: str, profiler: object) -> callable:
+    def wrapper(*args, **kwargs):
+        profiler.enter(phase, perf_counter_ns())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.exit(phase, perf_counter_ns())
+
+    return wrapper
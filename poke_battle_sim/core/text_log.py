@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+
+class TextLog:
+    def __init__(self, keep: int = 1000, stream: object = None, batch: int = 100):
+        """
+        Keeps the text of a Battle created with text_log=TextLog(...) using bounded memory.
+
+        Only the last keep lines stay in memory. Older lines are dropped, or sent to stream in
+        batches of batch lines if one is given: stream is either a text file only used by this
+        log or a callable receiving lists of lines.
+
+        If stream is a readable and seekable file, the whole text is read back from it when
+        requested, otherwise only the lines still in memory are returned.
+
+        Lines from hold on are neither sent nor dropped, so that they can still be removed: a
+        battle with a journal holds its text from its first marker until it is undone to it.
+        """
+        if not isinstance(keep, int) or keep < 1:
+            raise Exception("Attempted to create TextLog with invalid number of kept lines")
+        if not isinstance(batch, int) or batch < 1:
+            raise Exception("Attempted to create TextLog with invalid batch size")
+        if stream is not None and not callable(stream) and not hasattr(stream, "write"):
+            raise Exception("Attempted to create TextLog with invalid stream")
+        self.keep = keep
+        self.stream = stream
+        self.batch = batch
+        self.count = 0
+        self.sent = 0
+        self.cursor = 0
+        self.hold = None
+        self._lines = []
+        readable = getattr(stream, "readable", None)
+        seekable = getattr(stream, "seekable", None)
+        self._start = (
+            stream.tell()
+            if not callable(stream) and readable and readable() and seekable and seekable()
+            else None
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, line: str):
+        if self.stream is not None and self.count - self.sent >= self.batch:
+            self.flush()
+        self._lines.append(line)
+        self.count += 1
+        if len(self._lines) > self.keep + self.batch:
+            first = self.count - len(self._lines)
+            removable = (self.sent if self.stream is not None else self.count) - first
+            if self.hold is not None:
+                removable = min(removable, self.hold - first)
+            del self._lines[:min(len(self._lines) - self.keep, removable)]
+
+    def pop(self) -> str:
+        line = self._lines[-1] if self._lines else None
+        self._truncate(self.count - 1)
+        return line
+
+    def __delitem__(self, key: slice):
+        if not isinstance(key, slice) or key.stop is not None or key.step is not None:
+            raise Exception("Attempted to remove lines from the middle of TextLog")
+        self._truncate(key.start or 0)
+
+    def clear(self):
+        if self._start is not None:
+            self.stream.seek(self._start)
+            self.stream.truncate()
+        self.count = 0
+        self.sent = 0
+        self.cursor = 0
+        self.hold = None
+        self._lines = []
+
+    def flush(self):
+        end = self.count if self.hold is None else min(self.count, self.hold)
+        if self.stream is None or end <= self.sent:
+            return
+        first = self.count - len(self._lines)
+        lines = self._lines[self.sent - first:end - first]
+        if callable(self.stream):
+            self.stream(lines)
+        else:
+            self.stream.write("".join(line + "\n" for line in lines))
+            if hasattr(self.stream, "flush"):
+                self.stream.flush()
+        self.sent = end
+
+    def read_all(self) -> list[str]:
+        """
+        The whole text, or only the lines kept in memory if it can't be read back from the stream.
+        """
+        first = self.count - len(self._lines)
+        if not first or self._start is None:
+            return list(self._lines)
+        end = self.stream.tell()
+        self.stream.seek(self._start)
+        lines = self.stream.read().split("\n")[:first]
+        self.stream.seek(end)
+        return lines + self._lines
+
+    def read_new(self) -> list[str]:
+        """
+        The lines added since the previous call, as Battle.get_cur_text returns them.
+        """
+        first = self.count - len(self._lines)
+        if self.cursor >= first or self._start is None:
+            lines = self._lines[max(self.cursor - first, 0):]
+        else:
+            lines = self.read_all()[self.cursor:]
+        self.cursor = self.count
+        return lines
+
+    def _truncate(self, count: int):
+        first = self.count - len(self._lines)
+        if count < 0 or count < first or self.stream is not None and count < self.sent:
+            raise Exception("Attempted to remove text no longer held by TextLog")
+        del self._lines[count - first:]
+        self.count = count
+        self.cursor = min(self.cursor, count)
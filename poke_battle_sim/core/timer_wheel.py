@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+
+class TimerWheel:
+    def __init__(self):
+        """
+        A TimerWheel holds the expirations of a battle's countdowns indexed by end of turn.
+
+        The tick is the number of ends of turn processed. A countdown set to n turns is scheduled
+        once for tick + n and fires on that end of turn instead of being decremented every turn.
+        """
+        self.tick = 0
+        self.slots = {}
+        self.fired = []
+
+    def reset(self):
+        self.tick = 0
+        self.slots.clear()
+        self.fired = []
+
+    def schedule(self, obj: object, name: str, key, turns: int) -> int:
+        end = self.tick + turns
+        if key is not None:
+            self.slots.setdefault(end, []).append((obj, name, key))
+        return end
+
+    def advance(self) -> dict:
+        self.tick += 1
+        expiring = {}
+        self.fired = []
+        for obj, name, key in self.slots.pop(self.tick, ()):
+            if obj.countdowns.get(name) == self.tick:
+                expiring.setdefault(obj, set()).add(key)
+                self.fired.append((obj, name, key))
+        return expiring
+
+    def postpone(self, obj: object):
+        """
+        Moves the countdowns of obj that expired on this end of turn to the next one, so that
+        they are still running until their expiration is processed.
+        """
+        for entry_obj, name, key in self.fired:
+            if entry_obj is obj:
+                obj.countdowns[name] = self.schedule(obj, name, key, 1)
+
+
+class Countdown:
+    def __init__(self, key=None):
+        """
+        Descriptor for a turn countdown stored as its end tick in the owner's countdowns dict.
+
+        Reading it gives the number of remaining turns, as the former decremented counters did.
+        Negative values are kept as is and never expire. If a key is given, it is delivered by
+        TimerWheel.advance() on the end of turn the countdown expires.
+        """
+        self.key = key
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, obj: object, objtype: type = None) -> int:
+        if obj is None:
+            return self
+        end = obj.countdowns.get(self.name)
+        if end is None:
+            return 0
+        if end < 0:
+            return end
+        return max(0, end - obj.cur_battle.timer_wheel.tick)
+
+    def __set__(self, obj: object, value: int):
+        if not value and self.name not in obj.countdowns:
+            return
+        if not value:
+            del obj.countdowns[self.name]
+        elif value < 0:
+            obj.countdowns[self.name] = value
+        else:
+            obj.countdowns[self.name] = obj.cur_battle.timer_wheel.schedule(
+                obj, self.name, self.key, value
+            )
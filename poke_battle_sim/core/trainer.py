@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+from poke_battle_sim.core.timer_wheel import Countdown
+from poke_battle_sim.core.back_ref import BackRef
+
 import poke_battle_sim.core.pokemon as pk
 import poke_battle_sim.core.battle as bt
 
 import poke_battle_sim.util.process_item as pi
+import poke_battle_sim.util.serialize as sz
 
 import poke_battle_sim.conf.global_settings as gs
 import poke_battle_sim.conf.global_data as gd
 
 
 class Trainer:
+    cur_battle = BackRef()
+    light_screen = Countdown(gs.RES_LIGHT_SCREEN)
+    safeguard = Countdown(gs.RES_SAFEGUARD)
+    reflect = Countdown()
+    mist = Countdown(gs.RES_MIST)
+    fs_count = Countdown(gs.RES_FUTURE_SIGHT)
+    dd_count = Countdown(gs.RES_DOOM_DESIRE)
+    tailwind_count = Countdown(gs.RES_TAILWIND)
+    wish = Countdown(gs.RES_WISH)
+    lucky_chant = Countdown(gs.RES_LUCKY_CHANT)
+
     def __init__(
         self, name: str, poke_list: list[pk.Pokemon], selection: callable = None
     ):
@@ -60,9 +75,12 @@ class Trainer:
         self.in_battle = False
 
     def start(self, battle: bt.Battle):
+        self.cur_battle = battle
         for poke in self.poke_list:
             poke.start_battle(battle)
         self.current_poke = self.poke_list[0]
+        self.residuals = set()
+        self.countdowns = {}
         self.light_screen = 0
         self.safeguard = 0
         self.reflect = 0
@@ -83,6 +101,28 @@ class Trainer:
         self.in_battle = True
         self.has_moved = False
 
+    def reset(self):
+        for poke in self.poke_list:
+            poke.reset()
+        self.in_battle = False
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the team in a compact versioned format: one fixed-width record per Pokemon with
+        its species, ability, nature, item and move ids, stats, current hp, status and pp.
+        The selection function is not encoded.
+        """
+        return sz.encode_trainer(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, selection: callable = None) -> Trainer:
+        return sz.decode_trainer(data, selection)
+
+    def add_residual(self, residual: int):
+        if residual in self.residuals:
+            return
+        self.residuals.add(residual)
+
     def is_valid_action(self, action: list[str]) -> bool:
         if not isinstance(action, list) or len(action) < 2:
             return False
@@ -132,12 +172,7 @@ class Trainer:
         ):
             return False
         if len(move_action) == 2:
-            return any(
-                [
-                    move_action[gs.ACTION_VALUE] == move.name
-                    for move in self.current_poke.get_available_moves()
-                ]
-            )
+            return self.current_poke.is_available_move(move_action[gs.ACTION_VALUE])
         return False
 
     def _must_be_in_battle(self):
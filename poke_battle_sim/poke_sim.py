@@ -1,8 +1,16 @@
 import csv
+import gc
+import multiprocessing
 import random
+import sys
+import threading
 import importlib.resources
+from array import array
+
+from poke_battle_sim.util.packed_table import PackedTable
 
 import poke_battle_sim.conf.global_settings as gs
+import poke_battle_sim.conf.global_data as gd
 
 
 class PokeSim:
@@ -12,34 +20,66 @@ class PokeSim:
     _nature_list = []
     _move_list = []
     _move_name_to_id = {}
-    _type_effectives = []
+    _type_effectives = array("d")
     _type_to_id = {}
+    _type_num = 0
     _ability_list = []
     _abilities = {}
+    _ability_data = []
     _item_list = []
     _items = {}
+    _item_data = []
+    _moves_by_type = {}
+    _moves_by_category = {}
+    _moves_by_effect = {}
+    _moves_by_power = {}
+    _moves_by_gen = {}
+    _pokemon_by_type = {}
+    _pokemon_by_type_pair = {}
+    _pokemon_by_gen = {}
+    _items_by_pocket = {}
+    _usable_items = 0
+    _all_moves = 0
+    _plain_moves = 0
+    _all_pokemon = 0
+    _all_items = 0
+    _started = False
+    _lock = threading.Lock()
 
     @classmethod
     def start(cls):
-        if len(cls._pokemon_stats):
+        """
+        Loads the static data once, behind a lock so that threads starting at the same time wait
+        for it. The tables are never modified afterwards and are read by all threads without locking.
+        """
+        if cls._started:
             return
+        with cls._lock:
+            if not cls._started:
+                cls._load()
+                cls._started = True
 
+    @classmethod
+    def _load(cls):
+        pokemon_stats = []
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.POKEMON_STATS_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
             next(csv_reader)
             for row in csv_reader:
                 for num in gs.POKEMON_STATS_NUMS:
                     row[num] = int(row[num])
-                cls._pokemon_stats.append(row)
-                cls._name_to_id[row[1]] = row[0]
+                pokemon_stats.append(row)
+                cls._name_to_id[sys.intern(row[1])] = row[0]
+        cls._pokemon_stats = PackedTable(pokemon_stats)
 
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.NATURES_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
             next(csv_reader)
             for row in csv_reader:
-                cls._natures[row[0]] = (int(row[1]), int(row[2]))
+                cls._natures[sys.intern(row[0])] = (int(row[1]), int(row[2]))
                 cls._nature_list.append(row[0])
 
+        move_list = []
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.MOVES_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
             next(csv_reader)
@@ -47,8 +87,9 @@ class PokeSim:
                 for num in gs.MOVES_NUM:
                     if row[num]:
                         row[num] = int(row[num])
-                cls._move_list.append(row)
-                cls._move_name_to_id[row[1]] = row[0]
+                move_list.append(row)
+                cls._move_name_to_id[sys.intern(row[1])] = row[0]
+        cls._move_list = PackedTable(move_list)
 
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.TYPE_EF_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
@@ -56,23 +97,95 @@ class PokeSim:
             line_count = 0
             for row in csv_reader:
                 cls._type_to_id[row[0]] = line_count
-                row = [float(row[i]) for i in range(1, len(row))]
-                cls._type_effectives.append(row)
+                cls._type_effectives.extend(float(row[i]) for i in range(1, len(row)))
                 line_count += 1
+            cls._type_num = line_count
 
+        ability_data = []
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.ABILITIES_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
             next(csv_reader)
             for row in csv_reader:
-                cls._abilities[row[1]] = (row[0], row[2])
+                cls._abilities[sys.intern(row[1])] = len(ability_data)
                 cls._ability_list.append(row[1])
+                ability_data.append(row)
+        cls._ability_data = PackedTable(ability_data)
 
+        item_data = []
         with open(importlib.resources.files(gs.DATA_DIR).joinpath(gs.ITEMS_CSV)) as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=",")
             next(csv_reader)
             for row in csv_reader:
-                cls._items[row[1]] = (row[0], row[2])
+                cls._items[sys.intern(row[1])] = len(item_data)
                 cls._item_list.append(row[1])
+                item_data.append(row)
+        cls._item_data = PackedTable(item_data)
+        cls._nature_list = tuple(cls._nature_list)
+        cls._ability_list = tuple(cls._ability_list)
+        cls._item_list = tuple(cls._item_list)
+        cls._build_indexes(move_list, pokemon_stats, item_data)
+
+    @classmethod
+    def _build_indexes(cls, move_list: list[list], pokemon_stats: list[list], item_data: list[list]):
+        """
+        Builds the indexes from the rows read from the CSV files, so that the packed tables don't
+        build back every row of the process starting.
+        """
+        for move in move_list:
+            bit = 1 << move[gs.MOVE_ID]
+            cls._all_moves |= bit
+            _add(cls._moves_by_type, move[gs.MOVE_TYPE], bit)
+            _add(cls._moves_by_category, move[gs.MOVE_CATEGORY], bit)
+            _add(cls._moves_by_effect, move[gs.MOVE_EFFECT_ID], bit)
+            _add(cls._moves_by_gen, move[gs.MOVE_GEN], bit)
+            if move[gs.MOVE_POWER] != "":
+                _add(cls._moves_by_power, move[gs.MOVE_POWER] // gs.POWER_BUCKET, bit)
+                if (
+                    move[gs.MOVE_EFFECT_ID] == 1
+                    and move[gs.MOVE_CATEGORY] != gs.STATUS
+                    and move[gs.MOVE_ACC] != -1
+                    and move[gs.MOVE_NAME] not in gd.PLAIN_MOVE_EXCLUDED
+                    and move[gs.MOVE_NAME] not in gd.GROUNDED_CHECK
+                ):
+                    cls._plain_moves |= bit
+
+        for poke in pokemon_stats:
+            bit = 1 << poke[gs.NDEX]
+            cls._all_pokemon |= bit
+            _add(cls._pokemon_by_type, poke[gs.TYPE1], bit)
+            if poke[gs.TYPE2]:
+                _add(cls._pokemon_by_type, poke[gs.TYPE2], bit)
+            _add(cls._pokemon_by_type_pair, (poke[gs.TYPE1], poke[gs.TYPE2]), bit)
+            _add(cls._pokemon_by_gen, poke[gs.GEN], bit)
+
+        for item_id, item in enumerate(item_data):
+            bit = 1 << item_id
+            cls._all_items |= bit
+            _add(cls._items_by_pocket, item[gs.ITEM_POCKET], bit)
+            if item[gs.ITEM_NAME] in gd.USABLE_ITEM_CHECK:
+                cls._usable_items |= bit
+
+    @classmethod
+    def freeze(cls):
+        """
+        Loads the static data and moves every object tracked by the garbage collector to its
+        permanent generation. Call it in the parent process right before forking workers: the
+        collector then never writes to these objects and their pages stay shared between workers.
+        """
+        cls.start()
+        gc.collect()
+        gc.freeze()
+
+    @classmethod
+    def freeze_for_workers(cls) -> bool:
+        """
+        Calls freeze() if worker processes are started with fork and nothing is frozen yet, and
+        returns whether it did. The caller then calls gc.unfreeze() once the workers are forked.
+        """
+        if multiprocessing.get_start_method() != "fork" or gc.get_freeze_count():
+            return False
+        cls.freeze()
+        return True
 
     @classmethod
     def _convert_name_to_id(cls, name: str) -> int:
@@ -86,7 +199,9 @@ class PokeSim:
             return None
         p_id = name_or_id
         if isinstance(name_or_id, str):
-            p_id = cls._convert_name_to_id(name_or_id.lower())
+            p_id = cls._name_to_id.get(name_or_id)
+            if p_id is None:
+                p_id = cls._convert_name_to_id(name_or_id.lower())
         if 0 < p_id < len(cls._pokemon_stats):
             return p_id
         return None
@@ -127,12 +242,20 @@ class PokeSim:
     def check_status(cls, status: str):
         return
 
+    @classmethod
+    def is_plain_move(cls, move_id: int) -> bool:
+        """
+        Whether a move only deals damage, with no effect or special case in the engine
+        besides the damage formula: such moves can take the lean path of process_move.
+        """
+        return bool(cls._plain_moves >> move_id & 1)
+
     @classmethod
     def get_type_ef(cls, move_type: str, def_type: str) -> float | None:
         if move_type not in cls._type_to_id or def_type not in cls._type_to_id:
             raise Exception
-        return cls._type_effectives[cls._type_to_id[move_type]][
-            cls._type_to_id[def_type]
+        return cls._type_effectives[
+            cls._type_to_id[move_type] * cls._type_num + cls._type_to_id[def_type]
         ]
 
     @classmethod
@@ -148,8 +271,219 @@ class PokeSim:
         return [type for type in types if type in cls._type_to_id]
 
     @classmethod
-    def get_rand_move(cls) -> list:
-        return random.choice(cls._move_list)
+    def query_moves(
+        cls,
+        type: str = None,
+        category: int = None,
+        ef_id: int = None,
+        min_power: int = None,
+        max_power: int = None,
+        gen: int = None,
+        bitmap: bool = False,
+    ) -> array | int:
+        """
+        Ids of the moves matching every given filter, sorted, looked up in the indexes built
+        by start. Power filters only match moves with a power.
+
+        With bitmap=True, returns an int with the bit of each matching id set instead, so
+        queries can be combined with & and | and converted back with bitmap_ids.
+        """
+        result = cls._all_moves
+        if type is not None:
+            result &= cls._moves_by_type.get(type, 0)
+        if category is not None:
+            result &= cls._moves_by_category.get(category, 0)
+        if ef_id is not None:
+            result &= cls._moves_by_effect.get(ef_id, 0)
+        if gen is not None:
+            result &= cls._moves_by_gen.get(gen, 0)
+        if min_power is not None or max_power is not None:
+            result &= cls._moves_by_power_range(min_power, max_power)
+        return result if bitmap else cls.bitmap_ids(result)
+
+    @classmethod
+    def query_pokemon(
+        cls,
+        type: str = None,
+        types: tuple[str, str] = None,
+        gen: int = None,
+        immune_to: str = None,
+        bitmap: bool = False,
+    ) -> array | int:
+        """
+        Pokedex numbers of the Pokemon matching every given filter, sorted.
+
+        - type: having the type as either of their types
+        - types: having exactly these two types in any order, use "" for a single type
+        - immune_to: taking no damage from moves of this type because of their types
+        """
+        result = cls._all_pokemon
+        if type is not None:
+            result &= cls._pokemon_by_type.get(type, 0)
+        if types is not None:
+            type1, type2 = types
+            pairs = cls._pokemon_by_type_pair
+            result &= pairs.get((type1, type2), 0) | pairs.get((type2, type1), 0)
+        if gen is not None:
+            result &= cls._pokemon_by_gen.get(gen, 0)
+        if immune_to is not None:
+            immune = 0
+            if immune_to in cls._type_to_id:
+                for (type1, type2), bits in cls._pokemon_by_type_pair.items():
+                    if any(t and not cls.get_type_ef(immune_to, t) for t in (type1, type2)):
+                        immune |= bits
+            result &= immune
+        return result if bitmap else cls.bitmap_ids(result)
+
+    @classmethod
+    def query_items(cls, pocket: str = None, usable: bool = None, bitmap: bool = False) -> array | int:
+        """
+        Ids of the items matching every given filter, sorted; usable selects the items a Trainer
+        can use in battle. An item's id is its position in the item list.
+        """
+        result = cls._all_items
+        if pocket is not None:
+            result &= cls._items_by_pocket.get(pocket, 0)
+        if usable is not None:
+            result &= cls._usable_items if usable else ~cls._usable_items
+        return result if bitmap else cls.bitmap_ids(result)
+
+    @staticmethod
+    def bitmap_ids(bitmap: int) -> array:
+        ids = array("i")
+        while bitmap:
+            low = bitmap & -bitmap
+            ids.append(low.bit_length() - 1)
+            bitmap ^= low
+        return ids
+
+    @classmethod
+    def get_item_name(cls, item_id: int) -> str:
+        return cls._item_list[item_id]
+
+    @classmethod
+    def _moves_by_power_range(cls, min_power: int | None, max_power: int | None) -> int:
+        buckets = cls._moves_by_power
+        low = 0 if min_power is None else max(min_power, 0)
+        high = max(buckets) * gs.POWER_BUCKET + gs.POWER_BUCKET - 1 if max_power is None else max_power
+        result = 0
+        for bucket in range(low // gs.POWER_BUCKET, high // gs.POWER_BUCKET + 1):
+            bits = buckets.get(bucket, 0)
+            if bucket * gs.POWER_BUCKET < low or (bucket + 1) * gs.POWER_BUCKET - 1 > high:
+                for move_id in cls.bitmap_ids(bits):
+                    if not low <= cls._move_list[move_id - 1][gs.MOVE_POWER] <= high:
+                        bits ^= 1 << move_id
+            result |= bits
+        return result
+
+    @classmethod
+    def random_teams(
+        cls,
+        n: int,
+        party_size: int = gs.POKE_NUM_MAX,
+        seed: int = None,
+        constraints: dict = None,
+        trainers: bool = False,
+    ) -> list:
+        """
+        Samples n random legal teams of party_size Pokemon from a generator seeded with seed,
+        drawing each field for every Pokemon of the batch at once.
+
+        Each team is a list of Pokemon keyword arguments, or a Trainer named 'Trainer i' with
+        trainers=True. Optional constraints:
+
+        - species: Pokedex numbers to draw from, such as the result of query_pokemon
+        - moves: move ids to draw from, such as the result of query_moves
+        - abilities, items: names to draw from
+        - level: a level or an inclusive (min, max) range
+        - ev_total: maximum sum of the evs of each Pokemon, at most EV_TOTAL_MAX
+        - unique_species: whether a team can't have the same species twice, False by default
+        """
+        cls.start()
+        constraints = constraints or {}
+        if not isinstance(n, int) or n < 0:
+            raise Exception("Attempted to generate random teams with invalid number of teams")
+        if not isinstance(party_size, int) or not gs.POKE_NUM_MIN <= party_size <= gs.POKE_NUM_MAX:
+            raise Exception("Attempted to generate random teams with invalid party size")
+        if any(key not in _TEAM_CONSTRAINTS for key in constraints):
+            raise Exception("Attempted to generate random teams with invalid constraints")
+
+        species = list(constraints.get("species", range(1, len(cls._pokemon_stats))))
+        moves = [
+            cls._move_list[move_id - 1][gs.MOVE_NAME]
+            for move_id in constraints.get("moves", range(1, len(cls._move_list) + 1))
+        ]
+        moves = [move for move in moves if move != "struggle"]
+        abilities = list(constraints.get("abilities", cls._ability_list))
+        items = list(constraints.get("items", cls._item_list))
+        level = constraints.get("level", (gs.LEVEL_MIN, gs.LEVEL_MAX))
+        levels = range(level, level + 1) if isinstance(level, int) else range(level[0], level[1] + 1)
+        ev_total = constraints.get("ev_total", gs.EV_TOTAL_MAX)
+        unique_species = constraints.get("unique_species", False)
+        if (
+            not species
+            or any(cls.get_pokemon_id(p_id) != p_id for p_id in species)
+            or unique_species and len(species) < party_size
+            or len(moves) < gs.MOVES_MAX
+            or not abilities
+            or any(not cls.check_ability(ability) for ability in abilities)
+            or not items
+            or any(not cls.check_item(item) for item in items)
+            or not levels
+            or levels[0] < gs.LEVEL_MIN
+            or levels[-1] > gs.LEVEL_MAX
+            or not 0 <= ev_total <= gs.EV_TOTAL_MAX
+        ):
+            raise Exception("Attempted to generate random teams with invalid constraints")
+
+        rng = random.Random(seed)
+        total = n * party_size
+        if unique_species:
+            drawn = [p_id for _ in range(n) for p_id in rng.sample(species, party_size)]
+        else:
+            drawn = rng.choices(species, k=total)
+        drawn_levels = rng.choices(levels, k=total)
+        genders = rng.choices(gs.POSSIBLE_GENDERS, k=total)
+        natures = rng.choices(cls._nature_list, k=total)
+        drawn_abilities = rng.choices(abilities, k=total)
+        drawn_items = rng.choices(items, k=total)
+        ivs = rng.choices(range(gs.IV_MIN, gs.IV_MAX + 1), k=total * gs.STAT_NUM)
+        evs = rng.choices(range(gs.EV_MIN, gs.EV_MAX + 1), k=total * gs.STAT_NUM)
+
+        teams = []
+        for i in range(n):
+            team = []
+            for j in range(i * party_size, (i + 1) * party_size):
+                poke_evs = evs[j * gs.STAT_NUM:(j + 1) * gs.STAT_NUM]
+                ev_sum = sum(poke_evs)
+                if ev_sum > ev_total:
+                    poke_evs = [ev * ev_total // ev_sum for ev in poke_evs]
+                team.append({
+                    "name_or_id": drawn[j],
+                    "level": drawn_levels[j],
+                    "moves": rng.sample(moves, gs.MOVES_MAX),
+                    "gender": genders[j],
+                    "ability": drawn_abilities[j],
+                    "nature": natures[j],
+                    "ivs": ivs[j * gs.STAT_NUM:(j + 1) * gs.STAT_NUM],
+                    "evs": poke_evs,
+                    "item": drawn_items[j],
+                })
+            teams.append(team)
+        if not trainers:
+            return teams
+
+        from poke_battle_sim.core.pokemon import Pokemon
+        from poke_battle_sim.core.trainer import Trainer
+
+        return [
+            Trainer(f"Trainer {i + 1}", [Pokemon(**kwargs) for kwargs in team])
+            for i, team in enumerate(teams)
+        ]
+
+    @classmethod
+    def get_rand_move(cls, rng: random.Random = random) -> list:
+        return rng.choice(cls._move_list)
 
     @classmethod
     def get_rand_ability(cls) -> str:
@@ -186,3 +520,10 @@ class PokeSim:
     @classmethod
     def check_item(cls, item: str) -> bool:
         return item in cls._items
+
+
+_TEAM_CONSTRAINTS = {"species", "moves", "abilities", "items", "level", "ev_total", "unique_species"}
+
+
+def _add(index: dict, key, bit: int):
+    index[key] = index.get(key, 0) | bit
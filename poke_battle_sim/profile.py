@@ -0,0 +1,243 @@
+from __future__ import annotations
+import argparse
+import cProfile
+import gc
+import os
+import pstats
+import random
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from poke_battle_sim.poke_sim import PokeSim
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.pokemon import Pokemon
+from poke_battle_sim.core.trainer import Trainer
+from poke_battle_sim.core.battle import Battle
+
+import poke_battle_sim.conf.global_settings as gs
+
+
+def random_pokemon() -> Pokemon:
+    moves = []
+    while len(moves) < gs.MOVES_MAX:
+        move = PokeSim.get_rand_move()[gs.MOVE_NAME]
+        if move not in moves and move != "struggle":
+            moves.append(move)
+    return Pokemon(
+        PokeSim.get_rand_poke_id(),
+        50,
+        moves,
+        PokeSim.get_rand_gender(),
+        ability=PokeSim.get_rand_ability(),
+        nature=PokeSim.get_rand_nature(),
+        ivs=[random.randrange(gs.IV_MIN, gs.IV_MAX + 1) for _ in range(gs.STAT_NUM)],
+        evs=[0] * gs.STAT_NUM,
+        item=PokeSim.get_rand_item(),
+    )
+
+
+def run_workload(battles: int, team_size: int, seed: int, max_turns: int) -> dict:
+    """
+    Plays random battles between random teams with random legal moves. The teams and the seeds
+    of the battles' random number generators are drawn from the random module seeded with seed,
+    so that the workload is reproducible.
+
+    Battles raising an exception are counted as errors, so that a profile can still be taken
+    while a mechanic is broken. The number of full garbage collections run meanwhile is
+    reported as gc_collections.
+    """
+    random.seed(seed)
+    stats = {"battles": 0, "turns": 0, "errors": 0, "seconds": 0.0}
+    collections = gc.get_stats()[2]["collections"]
+    for _ in range(battles):
+        t1 = Trainer("Trainer 1", [random_pokemon() for _ in range(team_size)])
+        t2 = Trainer("Trainer 2", [random_pokemon() for _ in range(team_size)])
+        with Battle(t1, t2, rng=random.Random(random.getrandbits(64))) as battle:
+            start = perf_counter()
+            try:
+                battle.start()
+                while not battle.is_finished() and battle.turn_count < max_turns:
+                    battle.turn(random_policy(battle, t1), random_policy(battle, t2))
+            except Exception:
+                stats["errors"] += 1
+            stats["seconds"] += perf_counter() - start
+            stats["battles"] += 1
+            stats["turns"] += battle.turn_count
+    stats["gc_collections"] = gc.get_stats()[2]["collections"] - collections
+    return stats
+
+
+def thread_scaling(battles: int, team_size: int, seed: int, max_turns: int, max_threads: int) -> list[dict]:
+    """
+    Plays the same seeded random battles on thread pools of 1 to max_threads threads and reports
+    the seconds taken by each pool. Every battle draws from its own random.Random, so the turns
+    played are the same whatever the number of threads; the battles only run in parallel on
+    free-threaded builds of Python.
+    """
+    PokeSim.start()
+    results = []
+    for threads in range(1, max_threads + 1):
+        start = perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            turns = sum(executor.map(_play_seeded, [(seed + i, team_size, max_turns) for i in range(battles)]))
+        results.append({"threads": threads, "battles": battles, "turns": turns, "seconds": perf_counter() - start})
+    return results
+
+
+def _play_seeded(task: tuple[int, int, int]) -> int:
+    seed, team_size, max_turns = task
+    t1, t2 = PokeSim.random_teams(2, team_size, seed=seed, trainers=True)
+    battle = Battle(t1, t2, text=False, max_turns=max_turns, rng=random.Random(seed))
+    try:
+        battle.start()
+        while not battle.is_finished():
+            battle.turn(random_policy(battle, t1), random_policy(battle, t2))
+    except Exception:
+        pass
+    return battle.turn_count
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.001):
+        """
+        Samples the Python stack on a CPU time timer and counts collapsed stacks, as read by
+        flamegraph.pl or speedscope. Only available where signal.setitimer is.
+        """
+        if not hasattr(signal, "setitimer"):
+            raise Exception("Attempted to create StackSampler on a platform without setitimer")
+        self.interval = interval
+        self.stacks = {}
+
+    def __enter__(self) -> StackSampler:
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *exc):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def _sample(self, signum: int, frame):
+        names = []
+        while frame:
+            code = frame.f_code
+            names.append(frame.f_globals.get("__name__", "?") + ":" + code.co_name)
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.stacks.items()))
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        own = {}
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            own[leaf] = own.get(leaf, 0) + count
+        return sorted(own.items(), key=lambda e: -e[1])[:n]
+
+
+def cprofile_collapsed(profiler: cProfile.Profile, unit: float = 1e-6) -> str:
+    """
+    Collapsed stacks built from the call graph of a cProfile run, counted in units of unit
+    seconds. cProfile keeps no full stacks, so the time of a function called from several
+    places is split between its callers in proportion to the time each call edge took.
+    Recursive calls are folded into their first occurrence on a stack.
+    """
+    entries = pstats.Stats(profiler).stats
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    counts = {}
+    stack = [((func,), entry[3]) for func, entry in entries.items() if not entry[4]]
+    while stack:
+        path, seconds = stack.pop()
+        func = path[-1]
+        total = entries[func][3]
+        share = seconds / total if total else 0.0
+        own = round(entries[func][2] * share / unit)
+        if own:
+            key = ";".join(_frame_name(f) for f in path)
+            counts[key] = counts.get(key, 0) + own
+        for child, edge_seconds in children.get(func, ()):
+            child_seconds = edge_seconds * share
+            if child not in path and child_seconds >= unit:
+                stack.append((path + (child,), child_seconds))
+    return "\n".join(f"{key} {count}" for key, count in sorted(counts.items()))
+
+
+def _frame_name(func: tuple[str, int, str]) -> str:
+    file, _, name = func
+    if file == "~":
+        return name
+    return os.path.splitext(os.path.basename(file))[0] + ":" + name
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m poke_battle_sim.profile")
+    parser.add_argument("--battles", type=int, default=200)
+    parser.add_argument("--team-size", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--mode", choices=["sample", "cprofile", "none"], default="sample")
+    parser.add_argument("--interval", type=float, default=0.001, help="sampling interval in seconds")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--collapsed", help="file to write the collapsed stacks to")
+    parser.add_argument("--threads", type=int, help="run the workload on 1 to THREADS threads instead of profiling")
+    args = parser.parse_args(argv)
+    if args.battles < 1:
+        parser.error("--battles must be at least 1")
+    if args.threads is not None and args.threads < 1:
+        parser.error("--threads must be at least 1")
+    if args.collapsed and (args.threads or args.mode == "none"):
+        parser.error("--collapsed requires --mode sample or cprofile")
+
+    PokeSim.start()
+    if args.threads:
+        gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+        print(f"python {sys.version.split()[0]}, {'GIL enabled' if gil else 'free-threaded'}, seed {args.seed}")
+        print("threads   battles/sec   speedup")
+        results = thread_scaling(args.battles, args.team_size, args.seed, args.max_turns, args.threads)
+        for result in results:
+            rate = result["battles"] / result["seconds"]
+            print(f"{result['threads']:>7} {rate:>13.1f} {results[0]['seconds'] / result['seconds']:>9.2f}")
+        return
+    if args.mode == "cprofile":
+        profiler = cProfile.Profile()
+        stats = profiler.runcall(run_workload, args.battles, args.team_size, args.seed, args.max_turns)
+    elif args.mode == "sample":
+        with StackSampler(args.interval) as sampler:
+            stats = run_workload(args.battles, args.team_size, args.seed, args.max_turns)
+    else:
+        stats = run_workload(args.battles, args.team_size, args.seed, args.max_turns)
+
+    print(f"python {sys.version.split()[0]}, seed {args.seed}, team size {args.team_size}")
+    print(
+        f"battles: {stats['battles']}, turns: {stats['turns']}, errors: {stats['errors']}, "
+        f"seconds: {stats['seconds']:.3f}, full gc collections: {stats['gc_collections']}"
+    )
+    print(
+        f"battles/sec: {stats['battles'] / stats['seconds']:.1f}, "
+        f"turns/sec: {stats['turns'] / stats['seconds']:.1f}"
+    )
+    if args.mode == "cprofile":
+        print()
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("tottime").print_stats(args.top)
+        collapsed = cprofile_collapsed(profiler) if args.collapsed else None
+    elif args.mode == "sample":
+        print()
+        print("samples  function")
+        for name, count in sampler.top(args.top):
+            print(f"{count:>7}  {name}")
+        collapsed = sampler.collapsed() if args.collapsed else None
+    if args.collapsed:
+        with open(args.collapsed, "w") as file:
+            file.write(collapsed + "\n")
+        print(f"\ncollapsed stacks written to {args.collapsed}")
+
+
+if __name__ == "__main__":
+    main()
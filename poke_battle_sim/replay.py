@@ -0,0 +1,279 @@
+from __future__ import annotations
+import json
+import random
+import struct
+from contextlib import contextmanager
+
+from poke_battle_sim.core.trainer import Trainer
+from poke_battle_sim.core.battle import Battle
+import poke_battle_sim.util.serialize as sz
+
+_MAGIC = b"PBR"
+VERSION = 1
+
+_HEADER = struct.Struct("<3sB")
+_RECORD = struct.Struct("<BI")
+_TURN = struct.Struct("<I")
+
+_INIT = 0
+_ACTIONS = 1
+_KEYFRAME = 2
+
+
+class ReplayRecorder:
+    def __init__(self, battle: Battle, path: str, seed: int = None, keyframe_interval: int = 50):
+        """
+        Records a battle that has not started to an append-only replay file: the initial teams,
+        the seed of the battle's random numbers, then every turn's actions and the positions
+        picked by the Trainers' selection functions during the turn.
+
+        Every keyframe_interval turns, a keyframe with the battle state and random state is
+        appended so that a ReplayPlayer can jump to late turns without replaying from the start.
+
+        During start and turn, the battle draws its random numbers from a random.Random seeded
+        with seed, drawn from the battle's generator if not given, which is swapped in as the
+        battle's rng. Between turns and in selection functions the battle's own generator is
+        back, so policies drawing from it don't change the replay, and no random state outside
+        the battle is touched. The seed of the battle's random streams, if enabled before start,
+        is recorded as well.
+        """
+        if not isinstance(battle, Battle):
+            raise Exception("Attempted to create ReplayRecorder with invalid Battle")
+        if battle.battle_started:
+            raise Exception("Attempted to record Battle that has already started")
+        if not isinstance(keyframe_interval, int) or keyframe_interval < 1:
+            raise Exception("Attempted to create ReplayRecorder with invalid keyframe interval")
+        self.battle = battle
+        self.seed = battle.rng.getrandbits(63) if seed is None else seed
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(_MAGIC, VERSION))
+        self._selections = []
+        self._random = _RandomStream(battle, self.seed)
+        self._streams = None
+
+    def __enter__(self) -> ReplayRecorder:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        battle = self.battle
+        self._streams = battle.streams.seed if battle.streams else None
+        info = {
+            "seed": self.seed,
+            "terrain": battle.battlefield.get_terrain(),
+            "weather": battle.battlefield.weather,
+            "streams": self._streams,
+            "max_turns": battle.max_turns,
+            "stall_turns": battle.stall_turns,
+        }
+        self._write(
+            _INIT,
+            _blob(json.dumps(info).encode()) + _blob(battle.t1.to_bytes()) + _blob(battle.t2.to_bytes()),
+        )
+        with self._random:
+            battle.start()
+        self._file.flush()
+
+    def turn(self, t1_turn: list, t2_turn: list):
+        battle = self.battle
+        if (battle.streams.seed if battle.streams else None) != self._streams:
+            raise Exception("Attempted to record Battle with random streams changed after start")
+        selections = battle.t1.selection, battle.t2.selection
+        for i, trainer in enumerate((battle.t1, battle.t2)):
+            if trainer.selection:
+                trainer.selection = self._recording_selection(i, trainer.selection)
+        self._selections = []
+        try:
+            with self._random:
+                battle.turn(t1_turn, t2_turn)
+        finally:
+            battle.t1.selection, battle.t2.selection = selections
+        record = {"a": [t1_turn, t2_turn]}
+        if self._selections:
+            record["s"] = self._selections
+        self._write(_ACTIONS, _TURN.pack(battle.turn_count) + json.dumps(record, separators=(",", ":")).encode())
+        if battle.turn_count % self.keyframe_interval == 0 and not battle.is_finished():
+            self._write(
+                _KEYFRAME,
+                _TURN.pack(battle.turn_count) + sz.pack_random_state(self._random.rng.getstate()) + battle.to_bytes(text=False),
+            )
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _recording_selection(self, index: int, selection: callable) -> callable:
+        def select(trainer: Trainer):
+            with self._random.outside():
+                selection(trainer)
+            self._selections.append([index, trainer.poke_list.index(trainer.current_poke)])
+
+        return select
+
+    def _write(self, kind: int, payload: bytes):
+        self._file.write(_RECORD.pack(kind, len(payload)) + payload)
+
+
+class ReplayPlayer:
+    def __init__(self, path: str, text: bool = False):
+        """
+        Re-simulates a battle recorded by a ReplayRecorder, with the battle text disabled by
+        default. A replay cut short by a crash is played up to its last complete turn.
+
+        - turns: number of recorded turns
+        - battle: the battle being replayed, set by start and replaced when seeking to a keyframe
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < _HEADER.size or _HEADER.unpack_from(data)[0] != _MAGIC:
+            raise Exception("Attempted to load invalid replay file")
+        if _HEADER.unpack_from(data)[1] != VERSION:
+            raise Exception("Attempted to load replay file of unsupported version")
+        self.text = text
+        self.battle = None
+        self._init = None
+        self._actions = []
+        self._keyframes = {}
+        pos = _HEADER.size
+        while pos + _RECORD.size <= len(data):
+            kind, length = _RECORD.unpack_from(data, pos)
+            pos += _RECORD.size
+            payload = data[pos:pos + length]
+            if len(payload) < length:
+                break
+            pos += length
+            if kind == _INIT:
+                self._init = payload
+            elif kind == _ACTIONS:
+                self._actions.append(json.loads(payload[_TURN.size:]))
+            elif kind == _KEYFRAME:
+                self._keyframes[_TURN.unpack_from(payload)[0]] = payload
+        if self._init is None:
+            raise Exception("Attempted to load invalid replay file")
+        self.turns = len(self._actions)
+        self._random = None
+        self._streams = json.loads(_read_blob(self._init, 0)[0]).get("streams")
+
+    def start(self) -> Battle:
+        info, pos = _read_blob(self._init, 0)
+        t1, pos = _read_blob(self._init, pos)
+        t2, pos = _read_blob(self._init, pos)
+        info = json.loads(info)
+        self.battle = Battle(
+            Trainer.from_bytes(t1),
+            Trainer.from_bytes(t2),
+            terrain=info["terrain"],
+            weather=info["weather"],
+            text=self.text,
+            max_turns=info.get("max_turns"),
+            stall_turns=info.get("stall_turns"),
+        )
+        if self._streams is not None:
+            self.battle.enable_random_streams(self._streams)
+        self._random = _RandomStream(self.battle, info["seed"])
+        with self._random:
+            self.battle.start()
+        return self.battle
+
+    def step(self) -> bool:
+        """
+        Plays the next recorded turn, returns False once every recorded turn has been played.
+        """
+        if not self.battle:
+            self.start()
+        battle = self.battle
+        if battle.turn_count >= self.turns:
+            return False
+        record = self._actions[battle.turn_count]
+        selections = {0: [], 1: []}
+        for index, pos in record.get("s", ()):
+            selections[index].append(pos)
+        originals = battle.t1.selection, battle.t2.selection
+        battle.t1.selection = _replayed_selection(selections[0])
+        battle.t2.selection = _replayed_selection(selections[1])
+        try:
+            with self._random:
+                battle.turn(*record["a"])
+        finally:
+            battle.t1.selection, battle.t2.selection = originals
+        return True
+
+    def seek(self, turn: int) -> Battle:
+        """
+        Brings the battle to its state after the given number of turns, starting from the
+        closest keyframe at or before it unless the battle is already between the two.
+        """
+        if not isinstance(turn, int) or not 0 <= turn <= self.turns:
+            raise Exception("Attempted to seek replay to invalid turn")
+        keyframe = max((t for t in self._keyframes if t <= turn), default=None)
+        current = self.battle.turn_count if self.battle else None
+        if current is None or current > turn or keyframe is not None and keyframe > current:
+            if keyframe is None:
+                self.start()
+            else:
+                self._load_keyframe(keyframe)
+        while self.battle.turn_count < turn:
+            self.step()
+        return self.battle
+
+    def play(self) -> Battle:
+        self.seek(self.turns)
+        return self.battle
+
+    def _load_keyframe(self, turn: int):
+        payload = self._keyframes[turn]
+        pos = _TURN.size
+        state = sz.unpack_random_state(payload[pos:pos + sz.RANDOM_STATE_SIZE])
+        self.battle = Battle.from_bytes(payload[pos + sz.RANDOM_STATE_SIZE:])
+        self.battle.text_enabled = self.text
+        if self._streams is not None:
+            self.battle.enable_random_streams(self._streams)
+        self._random = _RandomStream(self.battle, state=state)
+
+
+class _RandomStream:
+    def __init__(self, battle: Battle, seed: int = None, state: tuple = None):
+        """
+        Random number generator swapped in as the battle's rng for the duration of a with block.
+        """
+        self.battle = battle
+        self.rng = random.Random(seed)
+        if state is not None:
+            self.rng.setstate(state)
+        self._outer = None
+
+    def __enter__(self):
+        self._outer = self.battle.rng
+        self.battle.rng = self.rng
+
+    def __exit__(self, *exc):
+        self.battle.rng = self._outer
+
+    @contextmanager
+    def outside(self):
+        self.battle.rng = self._outer
+        try:
+            yield
+        finally:
+            self.battle.rng = self.rng
+
+
+def _replayed_selection(positions: list[int]) -> callable:
+    def select(trainer: Trainer):
+        if positions:
+            trainer.current_poke = trainer.poke_list[positions.pop(0)]
+
+    return select
+
+
+def _blob(data: bytes) -> bytes:
+    return _TURN.pack(len(data)) + data
+
+
+def _read_blob(data: bytes, pos: int) -> tuple[bytes, int]:
+    length = _TURN.unpack_from(data, pos)[0]
+    pos += _TURN.size
+    return data[pos:pos + length], pos + length
@@ -0,0 +1,324 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.pokemon import Pokemon
+from poke_battle_sim.core.trainer import Trainer
+from poke_battle_sim.core.battle import Battle
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def random_batch_policy(decisions: list[tuple[Battle, Trainer]]) -> list[list[str]]:
+    return [random_policy(battle, trainer) for battle, trainer in decisions]
+
+
+class BattleServer:
+    def __init__(self, policy: callable = random_batch_policy, tick: float = 0.005, fmt: str = "json"):
+        """
+        Hosts battles for many clients over asyncio streams.
+
+        Each request is a message with an id and an op, answered by a message with the same id;
+        a connection can have many requests in flight and battles are shared between connections.
+
+        - create: {"teams": [team_1, team_2]} where a team is {"name": ..., "pokemon": [kwargs]}
+        and kwargs are Pokemon's arguments, answers {"battle": battle_id}
+        - turn: {"battle": battle_id, "actions": [action_1, action_2]}, answers the turn's text
+        and winner; a null action is decided by the policy
+        - valid: {"battle": battle_id, "trainer": 0 or 1, "action": action}
+        - close: {"battle": battle_id}, closes the battle
+
+        Turns of a battle are processed one at a time, a turn whose battle is closed or finished
+        while its actions are decided fails. The policy is called with every decision pending
+        across battles once per tick, so a model can batch its inference. It returns one action
+        per (battle, trainer) pair.
+        """
+        if fmt not in ("json", "msgpack"):
+            raise Exception("Attempted to create BattleServer with invalid format")
+        if fmt == "msgpack" and not msgpack:
+            raise Exception("Attempted to create BattleServer with msgpack format without msgpack installed")
+        self.policy = policy
+        self.tick = tick
+        self.fmt = fmt
+        self.battles = {}
+        self._turn_locks = {}
+        self._battle_ids = itertools.count(1)
+        self._pending = []
+        self._wakeup = None
+        self._ticker = None
+        self._server = None
+        self._handlers = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str = None):
+        self._wakeup = asyncio.Event()
+        self._ticker = asyncio.create_task(self._run_policy())
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        return self._server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 0, path: str = None):
+        """
+        Starts the server and serves until cancelled, then closes it.
+        """
+        await self.start(host=host, port=port, path=path)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1)
+        if self._ticker:
+            self._ticker.cancel()
+
+    async def decide(self, battle: Battle, trainer: Trainer) -> list[str]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((battle, trainer, future))
+        self._wakeup.set()
+        return await future
+
+    async def handle(self, request: dict) -> dict:
+        if isinstance(request, Exception):
+            return {"id": None, "error": str(request)}
+        if not isinstance(request, dict):
+            return {"id": None, "error": "Attempted to handle request that is not an object"}
+        response = {"id": request.get("id")}
+        try:
+            response.update(await self._dispatch(request))
+        except Exception as e:
+            response["error"] = str(e)
+        return response
+
+    async def _dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "create":
+            return self._create(request)
+        battle_id = request.get("battle")
+        battle = self.battles.get(battle_id)
+        if not battle:
+            raise Exception("Attempted to use invalid battle id")
+        if op == "turn":
+            async with self._turn_locks[battle_id]:
+                return await self._turn(battle_id, battle, request.get("actions"))
+        if op == "valid":
+            trainer = (battle.t1, battle.t2)[request.get("trainer")]
+            return {"valid": trainer.is_valid_action(request.get("action"))}
+        if op == "close":
+            del self.battles[battle_id]
+            del self._turn_locks[battle_id]
+            battle.close()
+            return {}
+        raise Exception("Attempted to use invalid op")
+
+    def _create(self, request: dict) -> dict:
+        teams = request.get("teams")
+        if not isinstance(teams, list) or len(teams) != 2:
+            raise Exception("Attempted to create battle with invalid teams")
+        trainers = [
+            Trainer(team["name"], [Pokemon(**kwargs) for kwargs in team["pokemon"]])
+            for team in teams
+        ]
+        battle = Battle(*trainers, **request.get("options", {}))
+        battle.start()
+        battle_id = next(self._battle_ids)
+        self.battles[battle_id] = battle
+        self._turn_locks[battle_id] = asyncio.Lock()
+        return {"battle": battle_id, "text": battle.get_cur_text()}
+
+    async def _turn(self, battle_id: int, battle: Battle, actions: list) -> dict:
+        if not isinstance(actions, list) or len(actions) != 2:
+            raise Exception("Attempted to process turn with invalid actions")
+        self._check_turn(battle_id, battle)
+        actions = list(actions)
+        decisions = [
+            self.decide(battle, trainer)
+            for trainer, action in zip((battle.t1, battle.t2), actions)
+            if action is None
+        ]
+        decided = iter(await asyncio.gather(*decisions))
+        actions = [next(decided) if action is None else action for action in actions]
+        self._check_turn(battle_id, battle)
+        battle.turn(*actions)
+        winner = battle.get_winner()
+        return {
+            "text": battle.get_cur_text(),
+            "finished": battle.is_finished(),
+            "winner": winner.name if winner else None,
+            "draw_reason": battle.draw_reason,
+        }
+
+    def _check_turn(self, battle_id: int, battle: Battle):
+        if self.battles.get(battle_id) is not battle:
+            raise Exception("Attempted to process turn of closed battle")
+        if battle.is_finished():
+            raise Exception("Attempted to process turn of finished battle")
+
+    async def _run_policy(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.tick)
+            self._wakeup.clear()
+            pending, self._pending = self._pending, []
+            pending = [entry for entry in pending if not entry[2].done()]
+            if not pending:
+                continue
+            try:
+                actions = list(self.policy([(battle, trainer) for battle, trainer, _ in pending]))
+            except Exception as e:
+                actions = []
+                error = e
+            else:
+                error = Exception("Attempted to decide actions with policy returning too few actions")
+            for i, (_, _, future) in enumerate(pending):
+                if future.done():
+                    continue
+                if i < len(actions):
+                    future.set_result(actions[i])
+                else:
+                    future.set_exception(error)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        tasks = set()
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+
+        async def respond(request: dict):
+            response = await self.handle(request)
+            async with lock:
+                writer.write(_encode(response, self.fmt))
+                await writer.drain()
+
+        try:
+            async for request in _decode_stream(reader, self.fmt):
+                task = asyncio.create_task(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+
+class BattleClient:
+    def __init__(self, pool_size: int = 1, fmt: str = "json"):
+        """
+        Client for a BattleServer keeping a pool of connections; requests are spread over the
+        pool and matched to their responses by id, so many can be awaited concurrently.
+        """
+        if fmt == "msgpack" and not msgpack:
+            raise Exception("Attempted to create BattleClient with msgpack format without msgpack installed")
+        self.pool_size = pool_size
+        self.fmt = fmt
+        self._connections = []
+        self._futures = {}
+        self._ids = itertools.count(1)
+        self._next = itertools.cycle(range(pool_size))
+        self._readers = []
+
+    async def connect(self, host: str = "127.0.0.1", port: int = None, path: str = None):
+        for _ in range(self.pool_size):
+            if path:
+                reader, writer = await asyncio.open_unix_connection(path)
+            else:
+                reader, writer = await asyncio.open_connection(host, port)
+            self._connections.append(writer)
+            self._readers.append(asyncio.create_task(self._read(reader)))
+
+    async def close(self):
+        for writer in self._connections:
+            writer.close()
+            await writer.wait_closed()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+
+    async def request(self, op: str, **kwargs) -> dict:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = future
+        writer = self._connections[next(self._next)]
+        writer.write(_encode({"id": request_id, "op": op, **kwargs}, self.fmt))
+        await writer.drain()
+        response = await future
+        if "error" in response:
+            raise Exception(response["error"])
+        return response
+
+    async def _read(self, reader: asyncio.StreamReader):
+        async for response in _decode_stream(reader, self.fmt):
+            if not isinstance(response, dict):
+                continue
+            future = self._futures.pop(response.get("id"), None)
+            if future and not future.done():
+                future.set_result(response)
+
+
+def _encode(message: dict, fmt: str) -> bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(message)
+    return json.dumps(message).encode() + b"\n"
+
+
+async def _decode_stream(reader: asyncio.StreamReader, fmt: str):
+    """
+    Yields the decoded messages, and an Exception in place of each message that can't be
+    decoded so that one bad message doesn't end the stream. Malformed msgpack data also drops
+    the rest of the data buffered with it.
+    """
+    if fmt == "msgpack":
+        unpacker = msgpack.Unpacker()
+        while data := await reader.read(65536):
+            unpacker.feed(data)
+            try:
+                for message in unpacker:
+                    yield message
+            except ValueError:
+                unpacker = msgpack.Unpacker()
+                yield Exception("Attempted to decode invalid message")
+        return
+    while line := await reader.readline():
+        if line.strip():
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = Exception("Attempted to decode invalid message")
+            yield message
+
+
+def _load_policy(name: str) -> callable:
+    module, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+async def _serve(args: argparse.Namespace):
+    policy = _load_policy(args.policy) if args.policy else random_batch_policy
+    server = BattleServer(policy=policy, tick=args.tick, fmt=args.format)
+    await server.serve_forever(host=args.host, port=args.port, path=args.unix)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m poke_battle_sim.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="path of a unix socket to listen on instead of tcp")
+    parser.add_argument("--format", choices=["json", "msgpack"], default="json")
+    parser.add_argument("--policy", help="batched policy as module:function")
+    parser.add_argument("--tick", type=float, default=0.005, help="seconds between policy calls")
+    asyncio.run(_serve(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import csv
+import json
+import os
+
+import poke_battle_sim.core.battle as bt
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+COLUMNS = (
+    "chunk",
+    "game",
+    "seed",
+    "t1_team",
+    "t2_team",
+    "winner",
+    "turns",
+    "draw_reason",
+    "t1_hp",
+    "t2_hp",
+    "t1_pp_used",
+    "t2_pp_used",
+)
+
+
+def battle_row(battle: bt.Battle, chunk: int = 0, game: int = 0, seed: int = None) -> dict:
+    """
+    Summary of a finished battle. Teams are lists of Pokedex ids, hp lists hold the remaining hp
+    of each Pokemon and pp_used lists hold [move id, pp spent] per Pokemon move. seed is the
+    seed the battle was reset with, so that the game can be replayed from its row.
+    """
+    winner = battle.get_winner()
+    row = {
+        "chunk": chunk,
+        "game": game,
+        "seed": seed,
+        "winner": 1 if winner is battle.t1 else 2 if winner is battle.t2 else 0,
+        "turns": battle.turn_count,
+        "draw_reason": battle.draw_reason,
+    }
+    for side, trainer in (("t1", battle.t1), ("t2", battle.t2)):
+        row[side + "_team"] = [poke.id for poke in trainer.poke_list]
+        row[side + "_hp"] = [poke.cur_hp for poke in trainer.poke_list]
+        row[side + "_pp_used"] = [
+            [move.id, move.max_pp - move.current_pp]
+            for poke in trainer.poke_list
+            for move in poke.original_moves
+            if move.current_pp != move.max_pp
+        ]
+    return {column: row[column] for column in COLUMNS}
+
+
+class ResultSink:
+    def __init__(self, path: str, buffer_rows: int = 1000):
+        """
+        Writes battle rows to a file in chunks of buffer_rows rows, so memory stays bounded
+        however many battles are written. Use open_sink to pick the format from the file name.
+        """
+        if not isinstance(buffer_rows, int) or buffer_rows < 1:
+            raise Exception("Attempted to create result sink with invalid buffer size")
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.rows_written = 0
+        self._rows = []
+
+    def __enter__(self) -> ResultSink:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, row: dict):
+        self._rows.append(row)
+        if len(self._rows) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._write(self._rows)
+            self.rows_written += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def _write(self, rows: list[dict]):
+        raise NotImplementedError
+
+
+class CsvSink(ResultSink):
+    def __init__(self, path: str, buffer_rows: int = 1000):
+        """
+        Appends rows to a CSV file, writing the header if the file is new. List cells are
+        written as ';' separated values and move entries as 'move_id:pp'.
+        """
+        super().__init__(path, buffer_rows)
+        new = not os.path.exists(path) or not os.path.getsize(path)
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(COLUMNS)
+
+    def _write(self, rows: list[dict]):
+        self._writer.writerows([_csv_cell(row[column]) for column in COLUMNS] for row in rows)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class JsonlSink(ResultSink):
+    def __init__(self, path: str, buffer_rows: int = 1000):
+        super().__init__(path, buffer_rows)
+        self._file = open(path, "a")
+
+    def _write(self, rows: list[dict]):
+        self._file.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    def __init__(self, path: str, buffer_rows: int = 1000):
+        """
+        Writes each chunk of rows as a row group of a new Parquet file. Requires pyarrow.
+        """
+        if not pyarrow:
+            raise Exception("Attempted to create Parquet sink without pyarrow installed")
+        super().__init__(path, buffer_rows)
+        self._writer = pyarrow.parquet.ParquetWriter(path, _parquet_schema())
+
+    def _write(self, rows: list[dict]):
+        self._writer.write_table(pyarrow.Table.from_pylist(rows, schema=self._writer.schema))
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+def open_sink(path: str, buffer_rows: int = 1000) -> ResultSink:
+    """
+    Opens the sink matching the extension of path: .csv, .jsonl or .parquet.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _SINKS:
+        raise Exception("Attempted to open result sink with unsupported file extension")
+    return _SINKS[ext](path, buffer_rows)
+
+
+def _csv_cell(value) -> str | int:
+    if isinstance(value, list):
+        return ";".join(":".join(map(str, v)) if isinstance(v, list) else str(v) for v in value)
+    return "" if value is None else value
+
+
+def _parquet_schema():
+    ints = pyarrow.list_(pyarrow.int32())
+    return pyarrow.schema([
+        ("chunk", pyarrow.int64()),
+        ("game", pyarrow.int64()),
+        ("seed", pyarrow.int64()),
+        ("t1_team", ints),
+        ("t2_team", ints),
+        ("winner", pyarrow.int8()),
+        ("turns", pyarrow.int32()),
+        ("draw_reason", pyarrow.string()),
+        ("t1_hp", ints),
+        ("t2_hp", ints),
+        ("t1_pp_used", pyarrow.list_(ints)),
+        ("t2_pp_used", pyarrow.list_(ints)),
+    ])
+
+
+_SINKS = {".csv": CsvSink, ".jsonl": JsonlSink, ".parquet": ParquetSink}
@@ -0,0 +1,347 @@
+from __future__ import annotations
+import gc
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from math import log10, sqrt
+from statistics import NormalDist, fmean, variance
+
+from poke_battle_sim.poke_sim import PokeSim
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.pokemon import Pokemon
+from poke_battle_sim.core.trainer import Trainer
+from poke_battle_sim.core.battle import Battle
+
+
+class Tournament:
+    def __init__(
+        self,
+        teams: list[list[dict]] = (),
+        policies: list[callable] = None,
+        games: int = 10,
+        workers: int = 1,
+        seed: int = None,
+        max_turns: int = 1000,
+    ):
+        """
+        Round robin between teams, every pair of teams playing games battles with sides swapped
+        every battle since the order of the Trainers breaks some ties.
+
+        - teams: lists of Pokemon keyword arguments, such as the teams of PokeSim.random_teams
+        - policies: function (battle, trainer) choosing the actions of each team, random by default
+        - workers: number of processes playing pairings in parallel; policies must be picklable
+        (module level functions) when it is more than 1
+        - seed: if provided, every pairing is seeded from it and its teams, which makes results
+        independent of the scheduling
+        - max_turns: turns after which a battle is stopped and counted as a draw
+
+        Each process builds a team's Trainer and each pairing's Battle once and resets them
+        between battles. Teams can be added after a run; the next run only plays new pairings.
+        """
+        if not isinstance(games, int) or games < 1:
+            raise Exception("Attempted to create Tournament with invalid number of games")
+        if not isinstance(workers, int) or workers < 1:
+            raise Exception("Attempted to create Tournament with invalid number of workers")
+        self.games = games
+        self.workers = workers
+        self.seed = seed
+        self.max_turns = max_turns
+        self.teams = []
+        self.policies = []
+        self.results = {}
+        self._token = uuid.uuid4().hex
+        if policies is None:
+            policies = [random_policy] * len(teams)
+        if len(policies) != len(teams):
+            raise Exception("Attempted to create Tournament with invalid number of policies")
+        for team, policy in zip(teams, policies):
+            self.add_team(team, policy)
+
+    def add_team(self, team: list[dict], policy: callable = random_policy) -> int:
+        if not isinstance(team, list) or not team or not all(isinstance(kwargs, dict) for kwargs in team):
+            raise Exception("Attempted to add invalid team to Tournament")
+        if not callable(policy):
+            raise Exception("Attempted to add team to Tournament with invalid policy")
+        self.teams.append(team)
+        self.policies.append(policy)
+        return len(self.teams) - 1
+
+    def pending(self) -> list[tuple[int, int]]:
+        n = len(self.teams)
+        return [(i, j) for i in range(n) for j in range(i + 1, n) if (i, j) not in self.results]
+
+    def run(self, callback: callable = None) -> Tournament:
+        """
+        Plays every pairing not played yet. results maps each pairing (i, j) with i < j to
+        [wins of i, wins of j, draws, errors], errors being battles that raised an exception;
+        they are left out of the rates and ratings. callback is called with (i, j, result)
+        after each pairing.
+        """
+        tasks = [
+            (
+                self._token, i, j, self.teams[i], self.teams[j], self.policies[i], self.policies[j],
+                self.games, self._pairing_seed(i, j), self.max_turns,
+            )
+            for i, j in self.pending()
+        ]
+        if self.workers > 1 and len(tasks) > 1:
+            frozen = PokeSim.freeze_for_workers()
+            with ProcessPoolExecutor(self.workers) as executor:
+                chunksize = max(1, len(tasks) // (self.workers * 4))
+                try:
+                    results = executor.map(_play_pairing, tasks, chunksize=chunksize)
+                finally:
+                    if frozen:
+                        # map submitted every task, so every worker is forked
+                        gc.unfreeze()
+                for (_, i, j, *_), result in zip(tasks, results):
+                    self._add_result(i, j, result, callback)
+        else:
+            for task in tasks:
+                self._add_result(task[1], task[2], _play_pairing(task), callback)
+        return self
+
+    def win_rate_matrix(self) -> list[list[float | None]]:
+        """
+        Matrix of the rate of battles won by the row team against the column team, draws counting
+        as half a win, None on the diagonal and for pairings not played yet.
+        """
+        n = len(self.teams)
+        matrix = [[None] * n for _ in range(n)]
+        for (i, j), (wins_i, wins_j, draws, _) in self.results.items():
+            games = wins_i + wins_j + draws
+            if not games:
+                continue
+            matrix[i][j] = (wins_i + draws / 2) / games
+            matrix[j][i] = (wins_j + draws / 2) / games
+        return matrix
+
+    def bradley_terry(self, iterations: int = 200, prior: float = 1.0) -> list[float]:
+        """
+        Bradley-Terry strengths fitted with minorization-maximization, normalized to a geometric
+        mean of 1. Every played pairing gets prior virtual battles split evenly between both teams,
+        so undefeated and winless teams still get finite strengths.
+        """
+        n = len(self.teams)
+        wins = [0.0] * n
+        pairs = []
+        for (i, j), (wins_i, wins_j, draws, _) in self.results.items():
+            wins[i] += wins_i + (draws + prior) / 2
+            wins[j] += wins_j + (draws + prior) / 2
+            pairs.append((i, j, wins_i + wins_j + draws + prior))
+        strengths = [1.0] * n
+        for _ in range(iterations):
+            denominators = [0.0] * n
+            for i, j, games in pairs:
+                d = games / (strengths[i] + strengths[j])
+                denominators[i] += d
+                denominators[j] += d
+            strengths = [
+                wins[i] / denominators[i] if denominators[i] else strengths[i] for i in range(n)
+            ]
+            mean = sum(log10(s) for s in strengths) / n if n else 0.0
+            strengths = [s / 10**mean for s in strengths]
+        return strengths
+
+    def elo_ratings(self, base: float = 1500.0, **kwargs) -> list[float]:
+        """
+        Bradley-Terry strengths on the Elo scale, where 400 points of difference mean 10 to 1 odds.
+        """
+        return [base + 400 * log10(s) for s in self.bradley_terry(**kwargs)]
+
+    def _pairing_seed(self, i: int, j: int) -> int | None:
+        if self.seed is None:
+            return None
+        return random.Random(f"{self.seed}:{i}:{j}").randrange(2**63)
+
+    def _add_result(self, i: int, j: int, result: list[int], callback: callable):
+        self.results[(i, j)] = result
+        if callback:
+            callback(i, j, result)
+
+
+class PairedComparison:
+    def __init__(self, common: bool):
+        """
+        Scores of two team variants over the same seeded battles, 1 for a win, 0.5 for a draw
+        and 0 for a loss, with statistics on the difference of their mean scores.
+
+        - common: whether the variants shared their random streams
+        - errors: battle pairs left out because one of the battles raised an exception
+        """
+        self.common = common
+        self.a_scores = []
+        self.b_scores = []
+        self.errors = 0
+
+    def add(self, a_score: float, b_score: float):
+        self.a_scores.append(a_score)
+        self.b_scores.append(b_score)
+
+    @property
+    def games(self) -> int:
+        return len(self.a_scores)
+
+    @property
+    def a_score(self) -> float:
+        return fmean(self.a_scores) if self.a_scores else 0.0
+
+    @property
+    def b_score(self) -> float:
+        return fmean(self.b_scores) if self.b_scores else 0.0
+
+    @property
+    def difference(self) -> float:
+        return self.a_score - self.b_score
+
+    @property
+    def paired_variance(self) -> float:
+        """
+        Variance of the mean score difference estimated from the per battle differences.
+        """
+        if self.games < 2:
+            return float("inf")
+        return variance([a - b for a, b in zip(self.a_scores, self.b_scores)]) / self.games
+
+    @property
+    def independent_variance(self) -> float:
+        """
+        Variance the mean score difference would have if both variants played independent battles.
+        """
+        if self.games < 2:
+            return float("inf")
+        return (variance(self.a_scores) + variance(self.b_scores)) / self.games
+
+    @property
+    def variance_reduction(self) -> float:
+        """
+        Share of the independent variance removed by pairing the battles, 1 when the variants
+        always score the same and negative when pairing hurts.
+        """
+        if self.games < 2 or not self.independent_variance:
+            return 0.0
+        return 1 - self.paired_variance / self.independent_variance
+
+    def difference_interval(self, confidence: float = 0.95) -> tuple[float, float]:
+        half = NormalDist().inv_cdf((1 + confidence) / 2) * sqrt(self.paired_variance)
+        return self.difference - half, self.difference + half
+
+    def report(self, confidence: float = 0.95) -> str:
+        low, high = self.difference_interval(confidence)
+        return "\n".join((
+            f"games: {self.games}, errors: {self.errors}, common random streams: {self.common}",
+            f"score a: {self.a_score:.3f}, score b: {self.b_score:.3f}",
+            f"difference: {self.difference:+.3f}, {confidence:.0%} interval: [{low:+.3f}, {high:+.3f}]",
+            f"variance paired: {self.paired_variance:.6f}, independent: {self.independent_variance:.6f}, "
+            f"reduction: {self.variance_reduction:.1%}",
+        ))
+
+
+def paired_comparison(
+    variant_a: list[dict],
+    variant_b: list[dict],
+    opponents: list[list[dict]],
+    games: int = 100,
+    seed: int = None,
+    policy: callable = random_policy,
+    max_turns: int = 1000,
+    common: bool = True,
+) -> PairedComparison:
+    """
+    Plays both variants of a team against every opponent games times, each battle of variant a
+    paired with a battle of variant b seeded the same. With common, both battles also draw damage
+    rolls, critical hits, accuracy, secondary effects and speed ties from the same random streams
+    (see Battle.enable_random_streams), so they share their luck wherever their decisions
+    coincide; without it, battles of variant b get seeds of their own.
+
+    Teams are lists of Pokemon keyword arguments, the variants playing as the first Trainer and
+    every side choosing its actions with policy.
+    """
+    if not isinstance(games, int) or games < 1:
+        raise Exception("Attempted to run paired comparison with invalid number of games")
+    if not opponents:
+        raise Exception("Attempted to run paired comparison without opponents")
+    rng = random.Random(seed)
+    result = PairedComparison(common)
+    scores = {None: None, 0: 0.5, 1: 1.0, 2: 0.0}
+    for k, opponent in enumerate(opponents):
+        battles = [
+            Battle(
+                Trainer(name, [Pokemon(**kwargs) for kwargs in variant]),
+                Trainer(f"Opponent {k}", [Pokemon(**kwargs) for kwargs in opponent]),
+                text=False,
+            )
+            for name, variant in (("Variant a", variant_a), ("Variant b", variant_b))
+        ]
+        if common:
+            for battle in battles:
+                battle.enable_random_streams(0)
+        for _ in range(games):
+            a_seed = rng.randrange(2**63)
+            b_seed = a_seed if common else rng.randrange(2**63)
+            a_score = scores[_play(battles[0], policy, policy, a_seed, max_turns)]
+            b_score = scores[_play(battles[1], policy, policy, b_seed, max_turns)]
+            if a_score is None or b_score is None:
+                result.errors += 1
+            else:
+                result.add(a_score, b_score)
+    return result
+
+
+_worker_cache = {"token": None, "trainers": {}, "battles": {}}
+
+
+def _play_pairing(task: tuple) -> list[int]:
+    token, i, j, team_i, team_j, policy_i, policy_j, games, seed, max_turns = task
+    if _worker_cache["token"] != token:
+        _worker_cache.update(token=token, trainers={}, battles={})
+    policies = {i: policy_i, j: policy_j}
+    result = [0, 0, 0, 0]
+    for game in range(games):
+        first, second = (i, j) if game % 2 == 0 else (j, i)
+        battle = _battle(first, second, {i: team_i, j: team_j})
+        winner = _play(
+            battle, policies[first], policies[second], seed + game if seed is not None else None, max_turns
+        )
+        if winner is None:
+            result[3] += 1
+        elif not winner:
+            result[2] += 1
+        elif (winner == 1) == (first == i):
+            result[0] += 1
+        else:
+            result[1] += 1
+    return result
+
+
+def _play(battle: Battle, t1_policy: callable, t2_policy: callable, seed: int | None, max_turns: int) -> int | None:
+    """
+    Plays a battle from its reset state, returns 1 or 2 for the winning side, 0 for a draw and
+    None if the battle raised an exception. Unfinished battles are reset before returning.
+    """
+    battle.reset(seed=seed)
+    battle.start()
+    try:
+        while not battle.is_finished() and battle.turn_count < max_turns:
+            battle.turn(t1_policy(battle, battle.t1), t2_policy(battle, battle.t2))
+    except Exception:
+        battle.reset()
+        return None
+    winner = battle.get_winner()
+    if winner is None:
+        battle.reset()
+        return 0
+    return 1 if winner is battle.t1 else 2
+
+
+def _battle(first: int, second: int, teams: dict) -> Battle:
+    battles = _worker_cache["battles"]
+    if (first, second) not in battles:
+        trainers = _worker_cache["trainers"]
+        for index in (first, second):
+            if index not in trainers:
+                trainers[index] = Trainer(
+                    f"Team {index}", [Pokemon(**kwargs) for kwargs in teams[index]]
+                )
+        battles[(first, second)] = Battle(trainers[first], trainers[second], text=False)
+    return battles[(first, second)]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import sys
+from array import array
+
+_INT = 0
+_STR = 1
+
+
+class PackedTable:
+    def __init__(self, rows: list[list]):
+        """
+        Static rows of ints and strings packed in flat arrays.
+
+        Int cells are stored in an array and string cells as positions in a tuple of the table's
+        distinct strings, interned so that they are the same objects as the keys of the name
+        tables. Rows are read through PackedRow views decoding their cells on access and nothing
+        is cached, so reading the table after a fork allocates no lasting objects and the
+        copy-on-write pages stay shared.
+        """
+        self.width = len(rows[0]) if rows else 0
+        self._len = len(rows)
+        self._kinds = bytearray()
+        self._values = array("q")
+        strings = {}
+        for row in rows:
+            if len(row) != self.width:
+                raise Exception("Attempted to pack table with rows of different lengths")
+            for cell in row:
+                if isinstance(cell, int):
+                    self._kinds.append(_INT)
+                    self._values.append(cell)
+                else:
+                    self._kinds.append(_STR)
+                    self._values.append(strings.setdefault(sys.intern(cell), len(strings)))
+        self._kinds = bytes(self._kinds)
+        self._strings = tuple(strings)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> PackedRow:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("PackedTable index out of range")
+        return PackedRow(self, index * self.width)
+
+
+class PackedRow:
+    __slots__ = ("_table", "_start")
+
+    def __init__(self, table: PackedTable, start: int):
+        """
+        Read-only view of a row of a PackedTable, indexed like the list it was packed from.
+        """
+        self._table = table
+        self._start = start
+
+    def __getitem__(self, column: int | slice):
+        table = self._table
+        if column.__class__ is slice:
+            return list(self)[column]
+        if column < 0:
+            column += table.width
+        if not 0 <= column < table.width:
+            raise IndexError("PackedRow index out of range")
+        cell = self._start + column
+        value = table._values[cell]
+        return table._strings[value] if table._kinds[cell] else value
+
+    def __len__(self) -> int:
+        return self._table.width
+
+    def __iter__(self):
+        table = self._table
+        end = self._start + table.width
+        strings = table._strings
+        return iter([
+            strings[value] if kind else value
+            for value, kind in zip(table._values[self._start:end].tolist(), table._kinds[self._start:end])
+        ])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (PackedRow, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
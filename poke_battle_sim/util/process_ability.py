@@ -1,5 +1,4 @@
 from __future__ import annotations
-from random import randrange
 
 from poke_battle_sim.poke_sim import PokeSim
 from poke_battle_sim.core.move import Move
@@ -17,6 +16,8 @@ import poke_battle_sim.conf.global_data as gd
 def selection_abilities(
     poke: pk.Pokemon, battlefield: bf.Battlefield, battle: bt.Battle
 ):
+    if battle.profiler and poke.ability:
+        battle.profiler.count("selection_abilities", poke.ability)
     if poke.has_ability("drizzle") and battlefield.weather != gs.RAIN:
         battlefield.change_weather(gs.RAIN)
         battlefield.weather_count = -1
@@ -166,6 +167,8 @@ def enemy_selection_abilities(
 
 
 def end_turn_abilities(poke: pk.Pokemon, battle: bt.Battle):
+    if battle.profiler and poke.ability:
+        battle.profiler.count("end_turn_abilities", poke.ability)
     if poke.has_ability("speed-boost"):
         pm.give_stat_change(poke, battle, gs.SPD, 1)
     elif poke.has_ability("slow-start"):
@@ -206,14 +209,16 @@ def type_protection_abilities(
 def on_hit_abilities(
     attacker: pk.Pokemon, defender: pk.Pokemon, battle: bt.Battle, move_data: Move
 ) -> bool:
+    if battle.profiler and defender.ability:
+        battle.profiler.count("on_hit_abilities", defender.ability)
     made_contact = move_data.name in gd.CONTACT_CHECK
-    if defender.has_ability("static") and made_contact and randrange(10) < 3:
+    if defender.has_ability("static") and made_contact and battle.rng.randrange(10) < 3:
         pm.paralyze(attacker, battle)
     elif defender.has_ability("rough-skin") and made_contact:
         attacker.take_damage(max(1, attacker.max_hp // 16))
         battle.add_text(attacker.nickname + " was hurt!")
-    elif defender.has_ability("effect-spore") and made_contact and randrange(10) < 3:
-        pm.give_nv_status(randrange(3, 6), attacker, battle)
+    elif defender.has_ability("effect-spore") and made_contact and battle.rng.randrange(10) < 3:
+        pm.give_nv_status(battle.rng.randrange(3, 6), attacker, battle)
     elif (
         defender.has_ability("color-change")
         and move_data.type not in defender.types
@@ -232,17 +237,17 @@ def on_hit_abilities(
     ):
         battle.add_text("It doesn't affect " + defender.nickname)
         return True
-    elif defender.has_ability("flame-body") and made_contact and randrange(10) < 3:
+    elif defender.has_ability("flame-body") and made_contact and battle.rng.randrange(10) < 3:
         pm.burn(attacker, battle)
     elif (
         defender.has_ability("poison-point")
         and made_contact
         and "steel" not in attacker.types
         and "poison" not in attacker.types
-        and randrange(10) < 3
+        and battle.rng.randrange(10) < 3
     ):
         pm.poison(attacker, battle)
-    elif defender.has_ability("cute-charm") and made_contact and randrange(10) < 3:
+    elif defender.has_ability("cute-charm") and made_contact and battle.rng.randrange(10) < 3:
         pm.infatuate(defender, attacker, battle)
     elif defender.has_ability("motor-drive") and move_data.type == "electric":
         pm.give_stat_change(defender, battle, gs.SPD, 1)
@@ -412,4 +417,4 @@ def _rand_max_power(poke: pk.Pokemon) -> Move:
             p_moves = [move]
         elif move.power == p_max:
             p_moves.append(move)
-    return p_moves[randrange(len(p_moves))]
+    return p_moves[poke.cur_battle.rng.randrange(len(p_moves))]
@@ -1,5 +1,4 @@
 from __future__ import annotations
-from random import randrange
 
 from poke_battle_sim.core.move import Move
 
@@ -35,6 +34,8 @@ def use_item(
         if can_skip:
             return
         raise Exception("Trainer attempted to use invalid item on Pokemon")
+    if battle.profiler:
+        battle.profiler.count("use_item", item)
 
     poke = trainer.current_poke
     move = None
@@ -208,6 +209,8 @@ def damage_calc_items(
         return
 
     item = attacker.item
+    if battle.profiler:
+        battle.profiler.count("damage_calc_items", item)
 
     if item == "griseous-orb":
         if attacker.name == "giratina" and (
@@ -370,6 +373,8 @@ def on_damage_items(poke: pk.Pokemon, battle: bt.Battle, move_data: Move):
         return
 
     item = poke.item
+    if battle.profiler:
+        battle.profiler.count("on_damage_items", item)
     _eat_item(poke, battle)
 
     if item == "liechi-berry":
@@ -386,7 +391,7 @@ def on_damage_items(poke: pk.Pokemon, battle: bt.Battle, move_data: Move):
         poke.crit_stage = min(4, poke.crit_stage + 1)
         battle.add_text(poke.nickname + " is getting pumped!")
     elif item == "starf-berry":
-        pm.give_stat_change(poke, battle, randrange(1, 6), 2)
+        pm.give_stat_change(poke, battle, battle.rng.randrange(1, 6), 2)
     elif item == "micle-berry":
         poke.next_will_hit = True
     elif item == "custap-berry":
@@ -409,7 +414,7 @@ def pre_move_items(poke: pk.Pokemon):
     item = poke.item
 
     if item == "quick-claw":
-        if randrange(5) < 1:
+        if poke.cur_battle.rng.randrange(5) < 1:
             poke.prio_boost = True
 
 
@@ -470,6 +475,8 @@ def status_items(poke: pk.Pokemon, battle: bt.Battle):
         return
 
     item = poke.item
+    if battle.profiler:
+        battle.profiler.count("status_items", item)
 
     if item == "cheri-berry":
         if poke.nv_status == gs.PARALYZED:
@@ -525,6 +532,8 @@ def on_hit_items(
         return
 
     item = defender.item
+    if battle.profiler:
+        battle.profiler.count("on_hit_items", item)
 
     if item == "jaboca-berry":
         if move_data.category == gs.PHYSICAL and attacker.is_alive:
@@ -580,6 +589,8 @@ def end_turn_items(poke: pk.Pokemon, battle: bt.Battle):
         return
 
     item = poke.item
+    if battle.profiler:
+        battle.profiler.count("end_turn_items", item)
 
     if item == "oran-berry":
         if poke.cur_hp < poke.max_hp * gs.BERRY_THRESHOLD:
@@ -657,6 +668,8 @@ def post_damage_items(attacker: pk.Pokemon, battle: bt.Battle, dmg: int):
         or attacker.embargo_count
     ):
         return
+    if battle.profiler:
+        battle.profiler.count("post_damage_items", attacker.item)
 
     if attacker.item == "shell-bell":
         if attacker.is_alive and dmg:
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from random import randrange
+from time import perf_counter_ns
 
 from poke_battle_sim.poke_sim import PokeSim
 from poke_battle_sim.core.move import Move
@@ -10,6 +10,7 @@ import poke_battle_sim.core.battlefield as bf
 
 import poke_battle_sim.util.process_ability as pa
 import poke_battle_sim.util.process_item as pi
+import poke_battle_sim.util.random_streams as rs
 
 import poke_battle_sim.conf.global_settings as gs
 import poke_battle_sim.conf.global_data as gd
@@ -27,6 +28,9 @@ def process_move(
         return
     battle.add_text(attacker.nickname + " used " + cap_name(move_data.name) + "!")
     battle.last_move_next = attacker.last_move_next = move_data
+    if move_data.plain and _plain_context(attacker, defender):
+        _process_plain_move(attacker, defender, battlefield, battle, move_data)
+        return
     if not _calculate_hit_or_miss(
         attacker, defender, battlefield, battle, move_data, is_first
     ):
@@ -39,6 +43,159 @@ def process_move(
     battle._faint_check()
 
 
+def _plain_context(attacker: pk.Pokemon, defender: pk.Pokemon) -> bool:
+    """
+    Whether none of the abilities, items and volatile conditions skipped by the lean path of
+    plain moves applies to the attacker and defender.
+    """
+    return not (
+        attacker.ability in gd.PLAIN_ABILITY_EXCLUDED
+        or defender.ability in gd.PLAIN_ABILITY_EXCLUDED
+        or attacker.item in gd.PLAIN_ITEM_EXCLUDED
+        or defender.item in gd.PLAIN_ITEM_EXCLUDED
+        or attacker.next_will_hit
+        or attacker.charged
+        or attacker.mud_sport
+        or attacker.water_sport
+        or defender.mud_sport
+        or defender.water_sport
+        or defender.mr_count
+        or defender.foresight_target
+        or defender.me_target
+        or defender.invulnerable
+    )
+
+
+def _process_plain_move(
+    attacker: pk.Pokemon,
+    defender: pk.Pokemon,
+    battlefield: bf.Battlefield,
+    battle: bt.Battle,
+    move_data: Move,
+):
+    """
+    The rest of process_move for a plain move in a plain context: same text, random draws and
+    results, without the meta effect checks, effect dispatch and hooks known not to apply.
+    """
+    if move_data.acc:
+        stage = attacker.accuracy_stage - defender.evasion_stage
+        stage_mult = max(3, 3 + stage) / max(3, 3 - stage)
+        if get_move_precision(battle, attacker) > move_data.acc * stage_mult * battlefield.acc_modifier:
+            if defender.evasion_stage > 0:
+                _avoided(battle, defender)
+            else:
+                _missed(attacker, battle)
+            return
+    attacker.last_successful_move_next = move_data
+    if battle.profiler:
+        start = perf_counter_ns()
+        _calculate_plain_damage(attacker, defender, battlefield, battle, move_data)
+        battle.profiler.effect(move_data.ef_id, perf_counter_ns() - start)
+    else:
+        _calculate_plain_damage(attacker, defender, battlefield, battle, move_data)
+    battle._faint_check()
+
+
+def _calculate_plain_damage(
+    attacker: pk.Pokemon,
+    defender: pk.Pokemon,
+    battlefield: bf.Battlefield,
+    battle: bt.Battle,
+    move_data: Move,
+):
+    if battle.winner:
+        return
+    if not defender.is_alive:
+        _missed(attacker, battle)
+        return
+    if _protect_check(defender, battle, move_data):
+        return
+
+    type_multiplier = calculate_type_efficiency(defender, move_data)
+    if not type_multiplier:
+        _not_affected(battle, defender)
+        return
+
+    if not defender.trainer.lucky_chant and _calculate_is_critical(attacker.crit_stage, battle, attacker):
+        critical_multiplier = 2
+        battle.add_text("A critical hit!")
+    else:
+        critical_multiplier = 1
+
+    if type_multiplier < 1:
+        battle.add_text("It's not very effective...")
+    elif type_multiplier > 1:
+        battle.add_text("It's super effective!")
+
+    attacker.calculate_stats_effective()
+    defender.calculate_stats_effective()
+
+    if move_data.category == gs.PHYSICAL:
+        a_stat, d_stat = gs.ATK, gs.DEF
+    else:
+        a_stat, d_stat = gs.SP_ATK, gs.SP_DEF
+    if critical_multiplier == 1:
+        atk_ig = attacker.stats_effective[a_stat]
+        def_ig = defender.stats_effective[d_stat]
+    else:
+        def_ig = min(defender.stats_actual[d_stat], defender.stats_effective[d_stat])
+        atk_ig = max(attacker.stats_actual[a_stat], attacker.stats_effective[a_stat])
+    attack_defense_ratio = atk_ig / def_ig
+
+    if attacker.nv_status == gs.BURNED and move_data.category == gs.PHYSICAL:
+        burn_multiplier = 0.5
+    else:
+        burn_multiplier = 1
+    if attacker.ability in gd.DMG_CALC_ABILITY_CHECK or defender.ability in gd.DMG_CALC_ABILITY_CHECK:
+        pa.damage_calc_abilities(attacker, defender, battle, move_data, type_multiplier)
+    if attacker.item in gd.DMG_ITEM_CHECK:
+        pi.damage_calc_items(attacker, defender, battle, move_data)
+
+    if (
+        type_multiplier <= 1
+        and (move_data.category == gs.PHYSICAL and defender.trainer.reflect)
+        or (move_data.category == gs.SPECIAL and defender.trainer.light_screen)
+    ):
+        screen_multiplier = 0.5
+    else:
+        screen_multiplier = 1
+    weather_multiplier = 1
+    if battlefield.weather == gs.HARSH_SUNLIGHT:
+        if move_data.type == "fire":
+            weather_multiplier = 1.5
+        elif move_data.type == "water":
+            weather_multiplier = 0.5
+    elif battlefield.weather == gs.RAIN:
+        if move_data.type == "fire":
+            weather_multiplier = 0.5
+        elif move_data.type == "water":
+            weather_multiplier = 1.5
+
+    if move_data.type == attacker.types[0] or move_data.type == attacker.types[1]:
+        stab = 1.5 if not attacker.has_ability("adaptability") else 2
+    else:
+        stab = 1
+    random_multiplier = _calculate_random_multiplier_damage(battle, attacker)
+
+    berry_multiplier = 1
+    if defender.item in gd.PRE_HIT_BERRIES:
+        berry_multiplier = pi.pre_hit_berries(attacker, defender, battle, move_data, type_multiplier)
+    item_multiplier = 1
+    if attacker.item in gd.DMG_MULT_ITEM_CHECK:
+        item_multiplier = pi.damage_mult_items(attacker, defender, battle, move_data, type_multiplier)
+
+    damage = (
+        (0.4 * attacker.level + 2) * move_data.power * attack_defense_ratio
+    ) / 50 * burn_multiplier * screen_multiplier * weather_multiplier + 2
+    damage *= critical_multiplier * item_multiplier * random_multiplier * stab * type_multiplier * berry_multiplier
+    damage = int(damage)
+
+    damage_done = defender.take_damage(damage, move_data)
+    battle._faint_check()
+    if attacker.item in gd.POST_DAMAGE_ITEM_CHECK:
+        pi.post_damage_items(attacker, battle, damage_done)
+
+
 def calculate_type_efficiency(defender: pk.Pokemon, move_data: Move) -> float:
     if move_data.type == "typeless":
         return 1
@@ -74,8 +231,8 @@ def calculate_type_efficiency(defender: pk.Pokemon, move_data: Move) -> float:
     return type_multiplier
 
 
-def _calculate_random_multiplier_damage() -> float:
-    return randrange(85, 101) / 100
+def _calculate_random_multiplier_damage(battle: bt.Battle = None, attacker: pk.Pokemon = None) -> float:
+    return rs.draw(battle, gs.STREAM_DAMAGE, attacker, 85, 101) / 100
 
 
 def _calculate_damage(
@@ -176,7 +333,7 @@ def _calculate_damage(
             stab = 1.5 if not attacker.has_ability("adaptability") else 2
         else:
             stab = 1
-        random_multiplier = _calculate_random_multiplier_damage()
+        random_multiplier = _calculate_random_multiplier_damage(battle, attacker)
 
         berry_multiplier = pi.pre_hit_berries(attacker, defender, battle, move_data, type_multiplier)
         item_multiplier = pi.damage_mult_items(attacker, defender, battle, move_data, type_multiplier)
@@ -246,7 +403,7 @@ def _calculate_hit_or_miss(
         attacker.next_will_hit = False
         return True
 
-    precision_result = get_move_precision()
+    precision_result = get_move_precision(battle, attacker)
     if move_accuracy == -1:
         result_hit = precision_result <= attacker.level - defender.level + 30
     else:
@@ -301,6 +458,13 @@ def _process_effect(
     crit_chance = None
     inv_bypass = False
     cc_ib = [crit_chance, inv_bypass]
+    if battle.profiler:
+        start = perf_counter_ns()
+        _MOVE_EFFECTS[ef_id](
+            attacker, defender, battlefield, battle, move_data, is_first, cc_ib
+        )
+        battle.profiler.effect(ef_id, perf_counter_ns() - start)
+        return
     _MOVE_EFFECTS[ef_id](
         attacker, defender, battlefield, battle, move_data, is_first, cc_ib
     )
@@ -323,7 +487,7 @@ def _calculate_critical_multiplier(
             not defender.trainer.lucky_chant
             and not defender.has_ability("battle-armor")
             and not defender.has_ability("shell-armor")
-            and _calculate_is_critical(cc)
+            and _calculate_is_critical(cc, battle, attacker)
     ):
         critical_multiplier = 2 if not attacker.has_ability("sniper") else 3
         battle.add_text("A critical hit!")
@@ -332,19 +496,21 @@ def _calculate_critical_multiplier(
     return critical_multiplier
 
 
-def _calculate_is_critical(crit_chance: int = None) -> bool:
+def _calculate_is_critical(
+    crit_chance: int = None, battle: bt.Battle = None, attacker: pk.Pokemon = None
+) -> bool:
     if not crit_chance:
-        return randrange(16) < 1
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 16) < 1
     elif crit_chance == 1:
-        return randrange(9) < 1
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 9) < 1
     elif crit_chance == 2:
-        return randrange(5) < 1
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 5) < 1
     elif crit_chance == 3:
-        return randrange(4) < 1
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 4) < 1
     elif crit_chance == 4:
-        return randrange(3) < 1
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 3) < 1
     else:
-        return randrange(1000) < crit_chance
+        return rs.draw(battle, gs.STREAM_CRIT, attacker, 1000) < crit_chance
 
 
 def _invulnerability_check(
@@ -389,7 +555,7 @@ def _pre_process_status(
     if attacker.prio_boost:
         attacker.prio_boost = False
     if attacker.nv_status == gs.FROZEN:
-        if move_data.name in gd.FREEZE_CHECK or randrange(5) < 1:
+        if move_data.name in gd.FREEZE_CHECK or battle.rng.randrange(5) < 1:
             cure_nv_status(gs.FROZEN, attacker, battle)
         else:
             battle.add_text(attacker.nickname + " is frozen solid!")
@@ -413,21 +579,21 @@ def _pre_process_status(
             give_stat_change(attacker, battle, gs.ATK, 1)
         return True
     if attacker.nv_status == gs.PARALYZED:
-        if randrange(4) < 1:
+        if battle.rng.randrange(4) < 1:
             battle.add_text(attacker.nickname + " is paralyzed! It can't move!")
             return True
     if attacker.infatuation:
         if attacker.infatuation is not defender:
             attacker.infatuation = None
             battle.add_text(attacker.nickname + " got over its infatuation!")
-        elif randrange(2) < 1:
+        elif battle.rng.randrange(2) < 1:
             battle.add_text(attacker.nickname + " is immobilized by love!")
             return True
     if attacker.v_status[gs.CONFUSED]:
         attacker.v_status[gs.CONFUSED] -= 1
         if attacker.v_status[gs.CONFUSED]:
             battle.add_text(attacker.nickname + " is confused!")
-            if randrange(2) < 1:
+            if battle.rng.randrange(2) < 1:
                 battle.add_text("It hurt itself in its confusion!")
                 self_attack = Move(
                     [0, "self-attack", 1, "typeless", 40, 1, 999, 0, 10, 2, 1, "", "", ""]
@@ -451,8 +617,8 @@ def _post_process_status(
     _mold_breaker_check(attacker, defender)
 
 
-def _generate_2_to_5() -> int:
-    n = randrange(8)
+def _generate_2_to_5(battle: bt.Battle) -> int:
+    n = battle.rng.randrange(8)
     if n < 3:
         num_hits = 2
     elif n < 6:
@@ -464,8 +630,8 @@ def _generate_2_to_5() -> int:
     return num_hits
 
 
-def get_move_precision() -> int:
-    return randrange(1, 101)
+def get_move_precision(battle: bt.Battle = None, attacker: pk.Pokemon = None) -> int:
+    return rs.draw(battle, gs.STREAM_ACCURACY, attacker, 1, 101)
 
 
 def confuse(
@@ -486,7 +652,7 @@ def confuse(
     if forced and recipient.v_status[gs.CONFUSED]:
         battle.add_text(recipient.nickname + " is already confused!")
         return
-    recipient.v_status[gs.CONFUSED] = _generate_2_to_5()
+    recipient.v_status[gs.CONFUSED] = _generate_2_to_5(battle)
     battle.add_text(recipient.nickname + " became confused!")
     pi.status_items(recipient, battle)
 
@@ -503,6 +669,7 @@ def _flinch(
     if is_first and recipient.is_alive and not recipient.v_status[gs.FLINCHED]:
         if not recipient.has_ability("inner-focus"):
             recipient.v_status[gs.FLINCHED] = 1
+            recipient.add_residual(gs.RES_FLINCH)
         elif forced:
             battle.add_text(
                 recipient.nickname + " won't flinch because of its Inner Focus!"
@@ -786,7 +953,7 @@ def sleep(recipient: pk.Pokemon, battle: bt.Battle, forced: bool = False):
         battle.add_text(recipient.nickname + " is already asleep!")
     elif not recipient.nv_status:
         recipient.nv_status = gs.ASLEEP
-        recipient.nv_counter = randrange(2, 6)
+        recipient.nv_counter = battle.rng.randrange(2, 6)
         battle.add_text(recipient.nickname + " fell asleep!")
         if recipient.has_ability("synchronize"):
             sleep(recipient.enemy.current_poke, battle)
@@ -952,7 +1119,7 @@ def _extra_flinch_check(
             move_data in gd.EXTRA_FLINCH_CHECK
             and not defender.v_status[gs.FLINCHED]
             and is_first
-            and randrange(10) < 1
+            and battle.rng.randrange(10) < 1
         ):
             _flinch(defender, battle, is_first)
 
@@ -1069,7 +1236,7 @@ def _ef_002(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if attacker.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if attacker.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         give_stat_change(
             attacker, battle, move_data.ef_stat, move_data.ef_amount, bypass=True
         )
@@ -1086,7 +1253,7 @@ def _ef_003(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if defender.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         give_stat_change(defender, battle, move_data.ef_stat, move_data.ef_amount)
     return True
 
@@ -1101,7 +1268,7 @@ def _ef_004(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if attacker.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if attacker.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         give_nv_status(move_data.ef_stat, attacker, battle)
     return True
 
@@ -1116,7 +1283,7 @@ def _ef_005(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if defender.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         give_nv_status(move_data.ef_stat, defender, battle)
     return True
 
@@ -1131,7 +1298,7 @@ def _ef_006(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if defender.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         confuse(defender, battle)
     return True
 
@@ -1146,7 +1313,7 @@ def _ef_007(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if defender.is_alive and dmg and randrange(1, 101) < move_data.ef_chance:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         _flinch(defender, battle, is_first)
     return True
 
@@ -1193,7 +1360,7 @@ def _ef_010(
     if not defender.is_alive:
         _missed(attacker, battle)
     if not attacker.has_ability("skill-link"):
-        num_hits = _generate_2_to_5()
+        num_hits = _generate_2_to_5(battle)
     else:
         num_hits = 5
     nh = num_hits
@@ -1315,7 +1482,7 @@ def _ef_019(
     if defender.minimized:
         move_data.power *= 2
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(10) < 3:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 3:
         _flinch(defender, battle, is_first)
 
 
@@ -1413,7 +1580,8 @@ def _ef_024(
         and not defender.substitute
         and not defender.v_status[gs.BINDING_COUNT]
     ):
-        defender.v_status[gs.BINDING_COUNT] = _generate_2_to_5() if attacker.item != "grip-claw" else 5
+        defender.v_status[gs.BINDING_COUNT] = _generate_2_to_5(battle) if attacker.item != "grip-claw" else 5
+        defender.add_residual(gs.RES_BINDING)
         defender.binding_poke = attacker
 
         if move_data.ef_stat == gs.BIND:
@@ -1505,7 +1673,7 @@ def _ef_028(
     cc_ib: list,
 ) -> bool:
     if not move_data.ef_stat:
-        num_turns = randrange(1, 3)
+        num_turns = battle.rng.randrange(1, 3)
         move_data.ef_stat = num_turns
         attacker.next_moves.put(move_data)
     else:
@@ -1546,10 +1714,10 @@ def _ef_030(
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if not defender.is_alive or not dmg:
         return True
-    if randrange(1, 6) < 2:
+    if battle.rng.randrange(1, 6) < 2:
         poison(defender, battle)
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(5) < 1:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 5) < 1:
         poison(defender, battle)
     return True
 
@@ -1584,7 +1752,7 @@ def _ef_032(
         failed(battle)
     else:
         disabled_move = defender.last_move
-        disabled_move.disabled = randrange(4, 8)
+        disabled_move.disabled = battle.rng.randrange(4, 8)
         battle.add_text(
             defender.trainer.name
             + "'s "
@@ -1721,6 +1889,7 @@ def _ef_039(
         and not defender.v_status[gs.LEECH_SEED]
     ):
         defender.v_status[gs.LEECH_SEED] = 1
+        defender.add_residual(gs.RES_LEECH_SEED)
         battle.add_text(defender.nickname + " was seeded!")
 
 
@@ -1757,7 +1926,7 @@ def _ef_041_thunder(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(10) < 3:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 3:
         paralyze(defender, battle)
 
 
@@ -1952,7 +2121,7 @@ def _ef_053(
     cc_ib: list,
 ) -> bool:
     move_names = [move.name for move in attacker.moves]
-    rand_move = PokeSim.get_rand_move()
+    rand_move = PokeSim.get_rand_move(battle.rng)
     attempts = 0
     while(
         attempts < 50
@@ -1961,7 +2130,7 @@ def _ef_053(
             or rand_move[gs.MOVE_NAME] in gd.METRONOME_CHECK
         )
     ):
-        rand_move = PokeSim.get_rand_move()
+        rand_move = PokeSim.get_rand_move(battle.rng)
         attempts += 1
     rand_move = Move(rand_move)
     battle.add_text(attacker.nickname + " used " + cap_name(rand_move.name) + "!")
@@ -2070,7 +2239,7 @@ def _ef_058(
         dmg = _calculate_damage(
             attacker, defender, battlefield, battle, move_data, crit_chance=1
         )
-        if dmg and randrange(10) < 3:
+        if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 3:
             _flinch(defender, battle, is_first)
     return True
 
@@ -2101,7 +2270,7 @@ def _ef_060(
     is_first: bool,
     cc_ib: list,
 ) -> bool:
-    dmg = attacker.level * (randrange(0, 11) * 10 + 50) // 100
+    dmg = attacker.level * (battle.rng.randrange(0, 11) * 10 + 50) // 100
     if defender.is_alive:
         defender.take_damage(dmg if dmg != 0 else 1, move_data)
     else:
@@ -2181,7 +2350,7 @@ def _ef_064(
     if not len(move_types):
         failed(battle)
         return True
-    attacker.types = (move_types[randrange(len(move_types))], None)
+    attacker.types = (move_types[battle.rng.randrange(len(move_types))], None)
 
 
 def _ef_065(
@@ -2194,8 +2363,8 @@ def _ef_065(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and defender.is_alive and randrange(1, 101) < move_data.ef_chance:
-        give_nv_status(randrange(1, 4), defender, battle)
+    if dmg and defender.is_alive and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
+        give_nv_status(battle.rng.randrange(1, 4), defender, battle)
     return True
 
 
@@ -2271,6 +2440,7 @@ def _ef_069(
         failed(battle)
         return True
     attacker.moves[move_data.pos] = Move(defender.last_move.md)
+    attacker.update_move_slots()
 
 
 def _ef_070(
@@ -2374,6 +2544,7 @@ def _ef_074(
         and not defender.substitute
     ):
         defender.v_status[gs.NIGHTMARE] = 1
+        defender.add_residual(gs.RES_NIGHTMARE)
         battle.add_text(defender.nickname + " began having a nightmare!")
     else:
         failed(battle)
@@ -2389,7 +2560,7 @@ def _ef_075(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(100) < move_data.ef_amount:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 100) < move_data.ef_amount:
         burn(defender, battle)
     return True
 
@@ -2405,7 +2576,7 @@ def _ef_076(
 ) -> bool:
     if defender.is_alive and attacker.nv_status == gs.ASLEEP:
         dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-        if dmg and randrange(10) < 3:
+        if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 3:
             _flinch(defender, battle, is_first)
     else:
         failed(battle)
@@ -2441,6 +2612,7 @@ def _ef_077(
             return True
         attacker.take_damage(attacker.max_hp // 2)
         defender.v_status[gs.CURSE] = 1
+        defender.add_residual(gs.RES_CURSE)
         battle.add_text(
             attacker.nickname
             + " cut its own HP and laid a curse on "
@@ -2496,7 +2668,7 @@ def _ef_079(
     poss_types = [type for type in poss_types if type not in attacker.types]
     poss_types = PokeSim.filter_valid_types(poss_types)
     if len(poss_types):
-        new_type = poss_types[randrange(len(poss_types))]
+        new_type = poss_types[battle.rng.randrange(len(poss_types))]
         attacker.types = (new_type, None)
         battle.add_text(
             attacker.nickname + " transformed into the " + new_type.upper() + " type!"
@@ -2545,8 +2717,9 @@ def _ef_081(
     if attacker.substitute:
         failed(battle)
     p_chance = min(8, 2**attacker.protect_count)
-    if randrange(p_chance) < 1:
+    if battle.rng.randrange(p_chance) < 1:
         attacker.protect = True
+        attacker.add_residual(gs.RES_PROTECT)
         attacker.protect_count += 1
     else:
         failed(battle)
@@ -2598,6 +2771,7 @@ def _ef_084(
 ) -> bool:
     if defender.is_alive and not defender.foresight_target:
         defender.foresight_target = True
+        defender.add_residual(gs.RES_FORESIGHT)
         battle.add_text(attacker.nickname + " identified " + defender.nickname + "!")
     else:
         failed(battle)
@@ -2661,8 +2835,9 @@ def _ef_088(
     if attacker.substitute:
         failed(battle)
     p_chance = min(8, 2**attacker.protect_count)
-    if randrange(p_chance) < 1:
+    if battle.rng.randrange(p_chance) < 1:
         attacker.endure = True
+        attacker.add_residual(gs.RES_ENDURE)
         attacker.protect_count += 1
     else:
         failed(battle)
@@ -2782,7 +2957,7 @@ def _ef_094(
         failed(battle)
         return True
     pos_moves = [move for move in attacker.moves if move.name != "sleep-talk"]
-    sel_move = Move(pos_moves[randrange(len(pos_moves))].md)
+    sel_move = Move(pos_moves[battle.rng.randrange(len(pos_moves))].md)
     battle.add_text(attacker.nickname + " used " + cap_name(sel_move.name) + "!")
     _process_effect(attacker, defender, battlefield, battle, sel_move, is_first)
     return True
@@ -2827,7 +3002,7 @@ def _ef_097(
     is_first: bool,
     cc_ib: list,
 ) -> bool:
-    res = randrange(10)
+    res = battle.rng.randrange(10)
     if res < 2:
         if not defender.is_alive:
             _missed(attacker, battle)
@@ -2902,7 +3077,7 @@ def _ef_101(
     is_first: bool,
     cc_ib: list,
 ) -> bool:
-    res = randrange(20)
+    res = battle.rng.randrange(20)
     if res < 1:
         mag = 4
         move_data.power = 10
@@ -2952,6 +3127,7 @@ def _ef_102(
     t.current_poke.substitute = attacker.substitute
     t.current_poke.heal_block_count = attacker.heal_block_count
     t.current_poke.power_trick = attacker.power_trick
+    t.current_poke.sync_residuals()
     if not attacker.has_ability("multitype"):
         t.current_poke.ability_supressed = attacker.ability_suppressed
 
@@ -2974,7 +3150,7 @@ def _ef_103(
         and any([move.name == defender.last_move.name for move in defender.moves])
     ):
         defender.next_moves.clear()
-        defender.encore_count = min(randrange(2, 7), defender.last_move.pp)
+        defender.encore_count = min(battle.rng.randrange(2, 7), defender.last_move.pp)
         for move in defender.moves:
             if move.name != defender.last_move.name:
                 move.encore_blocked = True
@@ -3038,7 +3214,7 @@ def _ef_106(
     if hp_stats:
         move_data.type, move_data.power = hp_stats
     else:
-        move_data.power = randrange(30, 71)
+        move_data.power = battle.rng.randrange(30, 71)
         move_data.type = attacker.types[0]
 
 
@@ -3057,7 +3233,7 @@ def _ef_107(
     dmg = _calculate_damage(
         attacker, defender, battlefield, battle, move_data, cc_ib[0], cc_ib[1]
     )
-    if dmg and randrange(5) < 1:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 5) < 1:
         _flinch(defender, battle, is_first)
     return True
 
@@ -3150,7 +3326,7 @@ def _ef_112(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(1, 101) < move_data.ef_chance:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         give_stat_change(attacker, battle, gs.ATK, 1)
         give_stat_change(attacker, battle, gs.DEF, 1)
         give_stat_change(attacker, battle, gs.SP_ATK, 1)
@@ -3220,7 +3396,7 @@ def _ef_115(
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if dmg and not attacker.uproar:
-        attacker.uproar = randrange(1, 5)
+        attacker.uproar = battle.rng.randrange(1, 5)
         battle.add_text(attacker.nickname + " caused an uproar!")
     return True
 
@@ -3470,7 +3646,7 @@ def _ef_128(
         and not defender.taunt
         and not defender.has_ability("oblivious")
     ):
-        defender.taunt = randrange(3, 6)
+        defender.taunt = battle.rng.randrange(3, 6)
         battle.add_text(defender.nickname + " fell for the taunt!")
     else:
         failed(battle)
@@ -3589,7 +3765,7 @@ def _ef_133(
             defender,
             battlefield,
             battle,
-            Move(possible_moves[randrange(len(possible_moves))].md),
+            Move(possible_moves[battle.rng.randrange(len(possible_moves))].md),
             is_first,
         )
     else:
@@ -3609,6 +3785,7 @@ def _ef_134(
     if not attacker.v_status[gs.INGRAIN]:
         battle.add_text(attacker.nickname + " planted its roots!")
         attacker.v_status[gs.INGRAIN] = 1
+        attacker.add_residual(gs.RES_INGRAIN)
         attacker.trapped = True
         attacker.grounded = True
     else:
@@ -3642,6 +3819,7 @@ def _ef_136(
 ) -> bool:
     if is_first:
         attacker.magic_coat = True
+        attacker.add_residual(gs.RES_MAGIC_COAT)
         battle.add_text(attacker.nickname + " shrouded itself with Magic Coat!")
     else:
         failed(battle)
@@ -3725,6 +3903,7 @@ def _ef_140(
         and not (defender.uproar and not defender.has_ability("soundproof"))
     ):
         defender.v_status[gs.DROWSY] = 2
+        defender.add_residual(gs.RES_YAWN)
         battle.add_text(attacker.nickname + " made " + defender.nickname + " drowsy!")
     else:
         failed(battle)
@@ -3825,6 +4004,7 @@ def _ef_145(
     ):
         battle.add_text(attacker.nickname + " sealed the opponent's move(s)!")
         t.imprisoned_poke = attacker
+        t.add_residual(gs.RES_IMPRISON)
     else:
         failed(battle)
 
@@ -3874,6 +4054,7 @@ def _ef_148(
 ) -> bool:
     if is_first:
         attacker.snatch = True
+        attacker.add_residual(gs.RES_SNATCH)
         battle.add_text(attacker.nickname + " waits for a target to make a move!")
     else:
         failed(battle)
@@ -3889,7 +4070,7 @@ def _ef_149(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(1, 101) < move_data.ef_chance:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
         paralyze(defender, battle)
     return True
 
@@ -3945,7 +4126,7 @@ def _ef_152(
     dmg = _calculate_damage(
         attacker, defender, battlefield, battle, move_data, crit_chance=1
     )
-    if dmg and randrange(10) < 1:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 1:
         burn(defender, battle)
     return True
 
@@ -4084,7 +4265,7 @@ def _ef_161_bounce(
         battle.add_text(attacker.nickname + " sprang up!")
     else:
         dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-        if dmg and randrange(10) < 3:
+        if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 3:
             paralyze(defender, battle)
 
 
@@ -4100,7 +4281,7 @@ def _ef_162(
     dmg = _calculate_damage(
         attacker, defender, battlefield, battle, move_data, crit_chance=1
     )
-    if dmg and randrange(10) < 1:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 1:
         poison(defender, battle)
     return True
 
@@ -4115,7 +4296,7 @@ def _ef_163(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if dmg and randrange(10) < 1:
+    if dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 1:
         paralyze(defender, battle)
     if dmg:
         _recoil(attacker, battle, max(1, dmg // 3), move_data)
@@ -4211,6 +4392,7 @@ def _ef_168(
     if not is_first or "flying" not in attacker.types:
         return True
     attacker.r_types = attacker.types
+    attacker.add_residual(gs.RES_ROOST)
     other_type = [type for type in attacker.types if type != "flying"]
     if len(other_type) > 0:
         attacker.types = (other_type[0], None)
@@ -4390,7 +4572,7 @@ def _ef_177(
                 battle,
                 defender.item,
                 attacker,
-                randrange(len(attacker.moves)),
+                battle.rng.randrange(len(attacker.moves)),
                 text_skip=True,
                 can_skip=True
             )
@@ -4430,7 +4612,7 @@ def _ef_179(
     ef_stats = attacker.stat_stages + [attacker.accuracy_stage, attacker.evasion_stage]
     ef_stats = [stat_i for stat_i in range(len(ef_stats)) if ef_stats[stat_i] < 6]
     if len(ef_stats):
-        give_stat_change(attacker, battle, randrange(len(ef_stats)), 2)
+        give_stat_change(attacker, battle, battle.rng.randrange(len(ef_stats)), 2)
     else:
         failed(battle)
 
@@ -4882,6 +5064,7 @@ def _ef_204(
     if not attacker.v_status[gs.AQUA_RING]:
         battle.add_text(attacker.nickname + " surrounded itself with a veil of water!")
         attacker.v_status[gs.AQUA_RING] = 1
+        attacker.add_residual(gs.RES_AQUA_RING)
     else:
         failed(battle)
 
@@ -4914,7 +5097,7 @@ def _ef_206(
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if dmg:
         _recoil(attacker, battle, max(1, dmg // 3), move_data)
-    if defender.is_alive and dmg and randrange(10) < 1:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 10) < 1:
         burn(defender, battle)
     return True
 
@@ -4944,9 +5127,9 @@ def _ef_208(
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if defender.is_alive and dmg:
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             paralyze(defender, battle)
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             _flinch(defender, battle, is_first)
     return True
 
@@ -4962,9 +5145,9 @@ def _ef_209(
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if defender.is_alive and dmg:
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             freeze(defender, battle)
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             _flinch(defender, battle, is_first)
     return True
 
@@ -4980,9 +5163,9 @@ def _ef_210(
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
     if defender.is_alive and dmg:
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             burn(defender, battle)
-        if randrange(1, 101) < move_data.ef_chance:
+        if rs.draw(battle, gs.STREAM_SECONDARY, attacker, 1, 101) < move_data.ef_chance:
             _flinch(defender, battle, is_first)
     return True
 
@@ -5077,7 +5260,7 @@ def _ef_215(
     cc_ib: list,
 ) -> bool:
     dmg = _calculate_damage(attacker, defender, battlefield, battle, move_data)
-    if defender.is_alive and dmg and randrange(100) < 1:
+    if defender.is_alive and dmg and rs.draw(battle, gs.STREAM_SECONDARY, attacker, 100) < 1:
         confuse(defender, battle)
     return True
 
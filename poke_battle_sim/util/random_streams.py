@@ -0,0 +1,59 @@
+from __future__ import annotations
+import random
+
+import poke_battle_sim.core.battle as bt
+import poke_battle_sim.core.pokemon as pk
+
+
+class RandomStreams:
+    def __init__(self, seed: int):
+        """
+        Seeded random substreams, one per purpose (damage roll, critical hit, accuracy,
+        secondary effect, speed tie), turn and side of the Pokemon drawing.
+
+        Two battles with the same seed draw the same numbers for a purpose on a turn whatever
+        happened elsewhere, so variants of a matchup share their luck wherever their
+        decisions coincide.
+        """
+        self.seed = seed
+        self._turn = None
+        self._generators = {}
+
+    def randrange(self, turn: int, stream: int, side: int, start: int, stop: int = None) -> int:
+        if turn != self._turn:
+            self._turn = turn
+            self._generators = {}
+        generator = self._generators.get((stream, side))
+        if generator is None:
+            generator = self._generators[(stream, side)] = random.Random(
+                f"{self.seed}:{turn}:{stream}:{side}"
+            )
+        return generator.randrange(start, stop)
+
+    def getstate(self) -> tuple:
+        return self._turn, {key: generator.getstate() for key, generator in self._generators.items()}
+
+    def setstate(self, state: tuple):
+        self._turn = state[0]
+        self._generators = {}
+        for key, generator_state in state[1].items():
+            self._generators[key] = random.Random()
+            self._generators[key].setstate(generator_state)
+
+    def reseed(self, seed: int):
+        self.seed = seed
+        self._turn = None
+        self._generators = {}
+
+
+def draw(battle: bt.Battle, stream: int, poke: pk.Pokemon | None, start: int, stop: int = None) -> int:
+    """
+    randrange(start, stop) drawn from the battle's substream for stream and the side of poke,
+    or from the battle's random number generator if it has no random streams.
+    """
+    if battle is None:
+        return random.randrange(start, stop)
+    if battle.streams is None:
+        return battle.rng.randrange(start, stop)
+    side = 0 if poke is None else 1 if poke.trainer is battle.t1 else 2
+    return battle.streams.randrange(battle.turn_count, stream, side, start, stop)
@@ -0,0 +1,626 @@
+from __future__ import annotations
+import random
+import struct
+from operator import attrgetter
+from queue import Queue
+
+from poke_battle_sim.poke_sim import PokeSim
+from poke_battle_sim.core.move import Move
+from poke_battle_sim.core.timer_wheel import TimerWheel
+
+import poke_battle_sim.core.pokemon as pk
+import poke_battle_sim.core.trainer as tr
+import poke_battle_sim.core.battle as bt
+import poke_battle_sim.core.battlefield as bf
+
+import poke_battle_sim.conf.global_settings as gs
+
+
+VERSION = 3
+
+_MAGIC = b"PBS"
+_HEADER = struct.Struct("<3sBB")
+_KIND_TRAINER = 1
+_KIND_BATTLE = 2
+
+_POKEMON = struct.Struct("<HBBHBHBB6H6B6BHBH" + "HB" * gs.MOVES_MAX)
+_HAS_IVS = 1
+_HAS_TEXT = 1
+_HAS_RANDOM_STATE = 2
+_RANDOM_STATE = struct.Struct("<625I?d")
+RANDOM_STATE_SIZE = _RANDOM_STATE.size
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_STR_REF = 6
+_LIST = 7
+_TUPLE = 8
+_SET = 9
+_DICT = 10
+_QUEUE = 11
+_REF = 12
+_NEW_MOVE = 13
+_MISSING = 14
+
+_FLOAT_FORMAT = struct.Struct("<d")
+
+
+class _Layout:
+    def __init__(self, scalars: tuple, values: tuple, optional: tuple = ()):
+        """
+        Record layout of an object of a battle: a fixed-width struct of the int and bool
+        attributes in scalars, given as (name, struct format) pairs, followed by the tagged
+        values of the attributes in values and of the attributes in optional, which may be
+        missing. Changing a layout requires a new VERSION.
+        """
+        self.scalar_names = tuple(name for name, _ in scalars)
+        self.struct = struct.Struct("<" + "".join(fmt for _, fmt in scalars))
+        self.values = values
+        self.optional = optional
+        if len(scalars) > 1:
+            self.get_scalars = attrgetter(*self.scalar_names)
+        else:
+            self.get_scalars = lambda obj: tuple(getattr(obj, name) for name in self.scalar_names)
+
+
+_BATTLE = _Layout(
+    (
+        ("battle_started", "?"),
+        ("text_enabled", "?"),
+        ("t1_faint", "?"),
+        ("t2_faint", "?"),
+        ("turn_count", "i"),
+        ("stall_count", "i"),
+    ),
+    (
+        "max_turns",
+        "stall_turns",
+        "draw_reason",
+        "stall_state",
+        "winner",
+        "last_move",
+        "last_move_next",
+        "expiring",
+    ),
+    ("t1_fainted", "t2_fainted"),
+)
+_BATTLEFIELD = _Layout(
+    (),
+    ("cur_battle", "_terrain", "o_weather", "weather", "acc_modifier", "gravity_stats", "countdowns"),
+)
+_TIMER_WHEEL = _Layout((("tick", "i"),), ("slots", "fired"))
+_TRAINER = _Layout(
+    (
+        ("in_battle", "?"),
+        ("has_moved", "?"),
+        ("stealth_rock", "h"),
+        ("spikes", "h"),
+        ("toxic_spikes", "h"),
+        ("num_fainted", "h"),
+    ),
+    ("cur_battle", "current_poke", "fs_dmg", "dd_dmg", "wish_poke", "imprisoned_poke", "residuals", "countdowns"),
+)
+_POKEMON_STATE = _Layout(
+    (
+        ("height", "i"),
+        ("weight", "i"),
+        ("base_exp", "i"),
+        ("gen", "h"),
+        ("cur_hp", "i"),
+        ("o_cur_hp", "i"),
+        ("nv_status", "h"),
+        ("nv_counter", "h"),
+        ("o_nv_status", "h"),
+        ("o_nv_counter", "h"),
+        ("accuracy_stage", "h"),
+        ("evasion_stage", "h"),
+        ("crit_stage", "h"),
+        ("substitute", "i"),
+        ("bide_dmg", "i"),
+        ("protect_count", "h"),
+        ("stockpile", "h"),
+        ("invulnerability_count", "h"),
+        ("ability_count", "h"),
+        ("metronome_count", "h"),
+        ("last_damage_taken", "i"),
+        ("move_in_a_row", "h"),
+        ("is_alive", "?"),
+        ("in_battle", "?"),
+        ("transformed", "?"),
+        ("invulnerable", "?"),
+        ("in_air", "?"),
+        ("in_ground", "?"),
+        ("in_water", "?"),
+        ("grounded", "?"),
+        ("ingrain", "?"),
+        ("trapped", "?"),
+        ("perma_trapped", "?"),
+        ("minimized", "?"),
+        ("rage", "?"),
+        ("recharging", "?"),
+        ("biding", "?"),
+        ("has_defense_curl", "?"),
+        ("protect", "?"),
+        ("endure", "?"),
+        ("tormented", "?"),
+        ("magic_coat", "?"),
+        ("me_target", "?"),
+        ("snatch", "?"),
+        ("mud_sport", "?"),
+        ("water_sport", "?"),
+        ("power_trick", "?"),
+        ("ability_suppressed", "?"),
+        ("ability_activated", "?"),
+        ("item_activated", "?"),
+        ("sucker_punch_check", "?"),
+        ("magnet_rise", "?"),
+        ("has_moved", "?"),
+        ("prio_boost", "?"),
+        ("next_will_hit", "?"),
+        ("unburden", "?"),
+        ("turn_damage", "?"),
+    ),
+    (
+        "cur_battle",
+        "enemy",
+        "trainer",
+        "name",
+        "types",
+        "ability",
+        "item",
+        "h_item",
+        "ivs",
+        "evs",
+        "nature",
+        "nature_effect",
+        "stats_actual",
+        "stats_effective",
+        "stat_stages",
+        "v_status",
+        "original_moves",
+        "moves",
+        "move_slots",
+        "old_pp",
+        "next_moves",
+        "original",
+        "countdowns",
+        "residuals",
+        "foresight_target",
+        "last_move",
+        "last_successful_move",
+        "last_move_next",
+        "last_successful_move_next",
+        "last_move_hit_by",
+        "last_consumed_item",
+        "copied",
+        "binding_type",
+        "binding_poke",
+        "encore_move",
+        "mr_target",
+        "infatuation",
+        "r_types",
+        "mf_move",
+        "locked_move",
+    ),
+    # written by baton pass and conversion under misspelled names, never read
+    ("type", "magnetic_rise", "ability_supressed"),
+)
+_MOVE = _Layout(
+    (
+        ("current_pp", "h"),
+        ("prio", "h"),
+        ("target", "h"),
+        ("category", "h"),
+        ("ef_id", "h"),
+        ("encore_blocked", "?"),
+    ),
+    (
+        "name",
+        "type",
+        "original_power",
+        "power",
+        "max_pp",
+        "acc",
+        "ef_chance",
+        "ef_amount",
+        "ef_stat",
+        "pos",
+        "disabled",
+    ),
+)
+_LAYOUTS = {
+    "Battle": _BATTLE,
+    "Battlefield": _BATTLEFIELD,
+    "TimerWheel": _TIMER_WHEEL,
+    "Trainer": _TRAINER,
+    "Pokemon": _POKEMON_STATE,
+    "Move": _MOVE,
+}
+# attributes left out of the layouts: restored from the team records, derived from the species
+# or move data, or not part of the battle state
+_UNENCODED = {
+    "Battle": ("t1", "t2", "battlefield", "timer_wheel", "all_text", "cur_text", "text_log", "journal",
+               "profiler", "streams", "rng"),
+    "Battlefield": ("update",),
+    "TimerWheel": (),
+    "Trainer": ("poke_list", "name", "selection"),
+    "Pokemon": ("stats_base", "id", "base", "level", "gender", "friendship", "nickname", "original_ability",
+                "o_item", "o_stats_actual", "max_hp"),
+    "Move": ("md", "id", "plain"),
+}
+
+
+def encode_trainer(trainer: tr.Trainer) -> bytes:
+    out = bytearray(_HEADER.pack(_MAGIC, VERSION, _KIND_TRAINER))
+    _write_team(out, trainer)
+    return bytes(out)
+
+
+def decode_trainer(data: bytes, selection: callable = None) -> tr.Trainer:
+    reader = _Reader(data, _KIND_TRAINER)
+    trainer = _read_team(reader)
+    trainer.selection = selection
+    return trainer
+
+
+def encode_battle(battle: bt.Battle, text: bool = True) -> bytes:
+    if not battle.battle_started:
+        raise Exception("Attempted to serialize Battle that has not started")
+    if text and battle.text_log is not None:
+        raise Exception("Attempted to serialize text of Battle kept in a text log")
+    out = bytearray(_HEADER.pack(_MAGIC, VERSION, _KIND_BATTLE))
+    _write_team(out, battle.t1)
+    _write_team(out, battle.t2)
+    has_state = type(battle.rng) is random.Random
+    out.append((_HAS_TEXT if text else 0) | (_HAS_RANDOM_STATE if has_state else 0))
+    if has_state:
+        out += pack_random_state(battle.rng.getstate())
+    writer = _Writer(out)
+    for obj in _battle_objects(battle):
+        writer.register(obj)
+    for obj in list(writer.objects):
+        writer.write_state(obj)
+    if text:
+        writer.write(battle.all_text)
+        writer.write(battle.cur_text)
+    return bytes(out)
+
+
+def decode_battle(data: bytes) -> bt.Battle:
+    reader = _Reader(data, _KIND_BATTLE)
+    t1 = _read_team(reader)
+    t2 = _read_team(reader)
+    flags = reader.read_byte()
+    battle = bt.Battle.__new__(bt.Battle)
+    battle.t1 = t1
+    battle.t2 = t2
+    battle.battlefield = bf.Battlefield.__new__(bf.Battlefield)
+    battle.timer_wheel = TimerWheel.__new__(TimerWheel)
+    battle.rng = random.Random()
+    if flags & _HAS_RANDOM_STATE:
+        battle.rng.setstate(unpack_random_state(reader.data[reader.pos:reader.pos + _RANDOM_STATE.size]))
+        reader.pos += _RANDOM_STATE.size
+    battle.text_log = None
+    battle.journal = None
+    battle.profiler = None
+    battle.streams = None
+    objects = _battle_objects(battle)
+    reader.objects.extend(objects)
+    for obj in objects:
+        reader.read_state(obj)
+    if flags & _HAS_TEXT:
+        battle.all_text = reader.read()
+        battle.cur_text = reader.read()
+    else:
+        battle.all_text = []
+        battle.cur_text = []
+    return battle
+
+
+def pack_random_state(state: tuple) -> bytes:
+    """
+    The state of a random.Random, as returned by getstate(), in a fixed-width record.
+    """
+    _, internal, gauss_next = state
+    return _RANDOM_STATE.pack(*internal, gauss_next is not None, gauss_next or 0.0)
+
+
+def unpack_random_state(data: bytes) -> tuple:
+    values = _RANDOM_STATE.unpack(data)
+    return 3, values[:625], values[626] if values[625] else None
+
+
+def _battle_objects(battle: bt.Battle) -> list:
+    objects = [battle, battle.battlefield, battle.timer_wheel, battle.t1, battle.t2]
+    pokes = battle.t1.poke_list + battle.t2.poke_list
+    objects.extend(pokes)
+    for poke in pokes:
+        objects.extend(poke.original_moves)
+    return objects
+
+
+def _write_team(out: bytearray, trainer: tr.Trainer):
+    _write_bytes(out, trainer.name.encode())
+    out.append(len(trainer.poke_list))
+    for poke in trainer.poke_list:
+        moves = []
+        for move in poke.original_moves:
+            moves += (move.id, move.current_pp)
+        moves += (0, 0) * (gs.MOVES_MAX - len(poke.original_moves))
+        has_ivs = poke.ivs is not None
+        out += _POKEMON.pack(
+            poke.id,
+            poke.level,
+            gs.POSSIBLE_GENDERS.index(poke.gender.lower()),
+            PokeSim._abilities[poke.original_ability] + 1 if poke.original_ability else 0,
+            PokeSim._nature_list.index(poke.nature) + 1 if poke.nature else 0,
+            PokeSim._items[poke.o_item] + 1 if poke.o_item else 0,
+            poke.friendship,
+            _HAS_IVS if has_ivs else 0,
+            *poke.o_stats_actual,
+            *(poke.ivs if has_ivs else [0] * gs.STAT_NUM),
+            *(poke.evs if has_ivs else [0] * gs.STAT_NUM),
+            poke.cur_hp,
+            poke.nv_status,
+            poke.nv_counter,
+            *moves,
+        )
+        _write_bytes(out, b"" if poke.nickname == poke.name.upper() else poke.nickname.encode())
+
+
+def _read_team(reader: _Reader) -> tr.Trainer:
+    name = reader.read_bytes().decode()
+    pokes = []
+    for _ in range(reader.read_byte()):
+        values = _POKEMON.unpack_from(reader.data, reader.pos)
+        reader.pos += _POKEMON.size
+        (
+            p_id, level, gender, ability, nature, item, friendship, flags
+        ) = values[:8]
+        stats = list(values[8:14])
+        ivs = list(values[14:20])
+        evs = list(values[20:26])
+        cur_hp, nv_status, nv_counter = values[26:29]
+        move_ids = values[29::2]
+        move_pps = values[30::2]
+        moves = [PokeSim._move_list[m_id - 1][gs.MOVE_NAME] for m_id in move_ids if m_id]
+        nickname = reader.read_bytes().decode()
+        stats_kwargs = (
+            {"ivs": ivs, "evs": evs, "nature": PokeSim._nature_list[nature - 1]}
+            if flags & _HAS_IVS
+            else {"stats_actual": stats}
+        )
+        poke = pk.Pokemon(
+            p_id,
+            level,
+            moves,
+            gs.POSSIBLE_GENDERS[gender],
+            ability=PokeSim._ability_list[ability - 1] if ability else None,
+            item=PokeSim._item_list[item - 1] if item else None,
+            nickname=nickname or None,
+            friendship=friendship,
+            **stats_kwargs,
+        )
+        poke.stats_actual = stats
+        poke.o_stats_actual = list(stats)
+        poke.max_hp = stats[gs.HP]
+        poke.cur_hp = poke.o_cur_hp = cur_hp
+        poke.is_alive = cur_hp != 0
+        poke.nv_status = poke.o_nv_status = nv_status
+        poke.nv_counter = poke.o_nv_counter = nv_counter
+        for move, pp in zip(poke.original_moves, move_pps):
+            move.current_pp = pp
+        pokes.append(poke)
+    return tr.Trainer(name, pokes)
+
+
+class _Writer:
+    def __init__(self, out: bytearray):
+        self.out = out
+        self.objects = []
+        self.indexes = {}
+        self.strings = {}
+
+    def register(self, obj: object):
+        self.indexes[id(obj)] = len(self.objects)
+        self.objects.append(obj)
+
+    def write_state(self, obj: object):
+        layout = _LAYOUTS[type(obj).__name__]
+        try:
+            self.out += layout.struct.pack(*layout.get_scalars(obj))
+        except (AttributeError, struct.error):
+            raise Exception("Attempted to serialize Battle with invalid state")
+        for name in layout.values:
+            self.write(getattr(obj, name))
+        for name in layout.optional:
+            if name in obj.__dict__:
+                self.write(obj.__dict__[name])
+            else:
+                self.out.append(_MISSING)
+
+    def write_str(self, value: str):
+        index = self.strings.get(value)
+        if index is None:
+            self.strings[value] = len(self.strings)
+            self.out.append(_STR)
+            _write_bytes(self.out, value.encode())
+        else:
+            self.out.append(_STR_REF)
+            _write_uint(self.out, index)
+
+    def write(self, value):
+        out = self.out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif type(value) is int:
+            out.append(_INT)
+            _write_uint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif type(value) is float:
+            out.append(_FLOAT)
+            out += _FLOAT_FORMAT.pack(value)
+        elif type(value) is str:
+            self.write_str(value)
+        elif type(value) is tuple:
+            out.append(_TUPLE)
+            _write_uint(out, len(value))
+            for item in value:
+                self.write(item)
+        elif id(value) in self.indexes:
+            out.append(_REF)
+            _write_uint(out, self.indexes[id(value)])
+        elif isinstance(value, (list, set, Queue)):
+            # subclasses are the recording containers of a journaled battle
+            items = value.queue if isinstance(value, Queue) else value
+            if isinstance(value, set):
+                # the iteration order of a set depends on its history, so equal sets are sorted
+                items = sorted(value, key=_set_order)
+            out.append(_LIST if isinstance(value, list) else _SET if isinstance(value, set) else _QUEUE)
+            _write_uint(out, len(items))
+            self.register(value)
+            for item in items:
+                self.write(item)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            _write_uint(out, len(value))
+            self.register(value)
+            for k, v in value.items():
+                self.write(k)
+                self.write(v)
+        elif isinstance(value, Move):
+            out.append(_NEW_MOVE)
+            _write_uint(out, value.id)
+            if not value.id:
+                # moves built outside the move table, such as the confusion self-attack
+                self.write(tuple(value.md))
+            self.register(value)
+            self.write_state(value)
+        else:
+            raise Exception("Attempted to serialize Battle with unsupported value")
+
+
+class _Reader:
+    def __init__(self, data: bytes, kind: int):
+        if not isinstance(data, (bytes, bytearray, memoryview)) or len(data) < _HEADER.size:
+            raise Exception("Attempted to deserialize invalid data")
+        magic, version, data_kind = _HEADER.unpack_from(data)
+        if magic != _MAGIC or data_kind != kind:
+            raise Exception("Attempted to deserialize invalid data")
+        if version != VERSION:
+            raise Exception("Attempted to deserialize data of unsupported version")
+        self.data = data
+        self.pos = _HEADER.size
+        self.objects = []
+        self.strings = []
+
+    def read_byte(self) -> int:
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def read_uint(self) -> int:
+        result = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_bytes(self) -> bytes:
+        length = self.read_uint()
+        self.pos += length
+        return bytes(self.data[self.pos - length:self.pos])
+
+    def read_state(self, obj: object):
+        layout = _LAYOUTS[type(obj).__name__]
+        obj.__dict__.update(zip(layout.scalar_names, layout.struct.unpack_from(self.data, self.pos)))
+        self.pos += layout.struct.size
+        for name in layout.values:
+            setattr(obj, name, self.read())
+        for name in layout.optional:
+            if self.data[self.pos] == _MISSING:
+                self.pos += 1
+                obj.__dict__.pop(name, None)
+            else:
+                obj.__dict__[name] = self.read()
+
+    def read(self):
+        tag = self.read_byte()
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            value = self.read_uint()
+            return value >> 1 if not value & 1 else -((value + 1) >> 1)
+        if tag == _FLOAT:
+            self.pos += _FLOAT_FORMAT.size
+            return _FLOAT_FORMAT.unpack_from(self.data, self.pos - _FLOAT_FORMAT.size)[0]
+        if tag == _STR:
+            self.strings.append(self.read_bytes().decode())
+            return self.strings[-1]
+        if tag == _STR_REF:
+            return self.strings[self.read_uint()]
+        if tag == _TUPLE:
+            return tuple([self.read() for _ in range(self.read_uint())])
+        if tag == _LIST:
+            value = []
+            self.objects.append(value)
+            for _ in range(self.read_uint()):
+                value.append(self.read())
+            return value
+        if tag == _SET:
+            value = set()
+            self.objects.append(value)
+            for _ in range(self.read_uint()):
+                value.add(self.read())
+            return value
+        if tag == _QUEUE:
+            value = Queue()
+            self.objects.append(value)
+            for _ in range(self.read_uint()):
+                value.queue.append(self.read())
+            return value
+        if tag == _DICT:
+            value = {}
+            self.objects.append(value)
+            for _ in range(self.read_uint()):
+                k = self.read()
+                value[k] = self.read()
+            return value
+        if tag == _REF:
+            return self.objects[self.read_uint()]
+        if tag == _NEW_MOVE:
+            move_id = self.read_uint()
+            move = Move(PokeSim._move_list[move_id - 1] if move_id else list(self.read()))
+            self.objects.append(move)
+            self.read_state(move)
+            return move
+        raise Exception("Attempted to deserialize invalid data")
+
+
+def _set_order(value) -> tuple:
+    return type(value).__name__, value if isinstance(value, (int, str)) else 0
+
+
+def _write_uint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_bytes(out: bytearray, value: bytes):
+    _write_uint(out, len(value))
+    out += value
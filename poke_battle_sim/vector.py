@@ -0,0 +1,578 @@
+from __future__ import annotations
+
+from poke_battle_sim.poke_sim import PokeSim
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.battle import Battle
+
+import poke_battle_sim.conf.global_settings as gs
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Move effects the vector engine implements: plain damage, damage with a chance of a stat change
+# or major status for either Pokemon, major status moves and stat stage moves
+SUPPORTED_EFFECTS = frozenset((1, 2, 3, 4, 5, 13, 16, 17))
+
+_PINCH_ABILITIES = {"overgrow": "grass", "blaze": "fire", "torrent": "water", "swarm": "bug"}
+_INERT_ABILITIES = (
+    "suction-cups",
+    "lightning-rod",
+    "illuminate",
+    "magnet-pull",
+    "run-away",
+    "pickup",
+    "plus",
+    "minus",
+    "storm-drain",
+    "honey-gather",
+)
+SUPPORTED_ABILITIES = frozenset(_PINCH_ABILITIES) | frozenset(_INERT_ABILITIES)
+
+_BOOST_ITEMS = {
+    "silver-powder": "bug",
+    "insect-plate": "bug",
+    "metal-coat": "steel",
+    "iron-plate": "steel",
+    "soft-sand": "ground",
+    "earth-plate": "ground",
+    "hard-stone": "rock",
+    "stone-plate": "rock",
+    "rock-incense": "rock",
+    "miracle-seed": "grass",
+    "meadow-plate": "grass",
+    "rose-incense": "grass",
+    "blackglasses": "dark",
+    "dread-plate": "dark",
+    "black-belt": "fighting",
+    "fist-plate": "fighting",
+    "magnet": "electric",
+    "zap-plate": "electric",
+    "mystic-water": "water",
+    "sea-incense": "water",
+    "wave-incense": "water",
+    "splash-plate": "water",
+    "sharp-beak": "flying",
+    "sky-plate": "flying",
+    "poison-barb": "poison",
+    "toxic-plate": "poison",
+    "nevermeltice": "ice",
+    "icicle-plate": "ice",
+    "spell-tag": "ghost",
+    "spooky-plate": "ghost",
+    "twistedspoon": "psychic",
+    "mind-plate": "psychic",
+    "odd-incense": "psychic",
+    "charcoal": "fire",
+    "flame-plate": "fire",
+    "dragon-fang": "dragon",
+    "draco-plate": "dragon",
+    "silk-scarf": "normal",
+}
+_LEFTOVERS = 1
+_ORAN_BERRY = 2
+_SITRUS_BERRY = 3
+_LIFE_ORB = 4
+_EXPERT_BELT = 5
+_MUSCLE_BAND = 6
+_WISE_GLASSES = 7
+_TYPE_BOOST = 8
+_ITEMS = {
+    "leftovers": _LEFTOVERS,
+    "oran-berry": _ORAN_BERRY,
+    "sitrus-berry": _SITRUS_BERRY,
+    "life-orb": _LIFE_ORB,
+    "expert-belt": _EXPERT_BELT,
+    "muscle-band": _MUSCLE_BAND,
+    "wise-glasses": _WISE_GLASSES,
+}
+SUPPORTED_ITEMS = frozenset(_ITEMS) | frozenset(_BOOST_ITEMS)
+
+_WEATHERS = {
+    gs.CLEAR: 0,
+    gs.HARSH_SUNLIGHT: 1,
+    gs.RAIN: 2,
+    gs.SANDSTORM: 3,
+    gs.HAIL: 4,
+    gs.FOG: 5,
+}
+
+_SAND_IMMUNE = ("ground", "steel", "rock")
+
+
+def is_supported(battle: Battle) -> bool:
+    """
+    Whether an unstarted battle only uses mechanics the vector engine implements: Pokemon that
+    are all able to battle, moves with SUPPORTED_EFFECTS, abilities and items from
+    SUPPORTED_ABILITIES and SUPPORTED_ITEMS and Trainers without selection functions.
+    """
+    if not isinstance(battle, Battle) or battle.battle_started:
+        return False
+    for trainer in (battle.t1, battle.t2):
+        if trainer.selection:
+            return False
+        for poke in trainer.poke_list:
+            if not poke.is_alive or poke.transformed:
+                return False
+            if poke.ability and poke.ability not in SUPPORTED_ABILITIES:
+                return False
+            if poke.o_item and poke.o_item not in SUPPORTED_ITEMS:
+                return False
+            if any(move.ef_id not in SUPPORTED_EFFECTS for move in poke.moves):
+                return False
+    return True
+
+
+class VectorBattles:
+    def __init__(self, battles: list[Battle], seed: int = None, max_turns: int = 1000):
+        """
+        Holds unstarted battles accepted by is_supported as NumPy arrays (hp, stats, stat
+        stages, status, moves and pp of every Pokemon) and advances all of them one turn at a
+        time with vectorized operations. Requires numpy.
+
+        Every Trainer picks a random move with pp left each turn, like batch.random_policy, and
+        sends out its next Pokemon able to battle when its current one faints. The mechanics and
+        the damage formula mirror the object engine so that both give the same distribution of
+        outcomes; the random numbers come from a NumPy generator seeded with seed, so single
+        battles are not reproduced draw for draw.
+
+        The Battle objects are only read.
+
+        - winners: 1 or 2 for the winning Trainer of each battle, 0 while it is not won
+        - turns: number of turns each battle has been played for
+        """
+        if not np:
+            raise Exception("Attempted to create VectorBattles without numpy installed")
+        if not battles or not all(is_supported(battle) for battle in battles):
+            raise Exception("Attempted to create VectorBattles with unsupported Battle")
+        self.max_turns = max_turns
+        self._rng = np.random.default_rng(seed)
+        self._types = {t: i for i, t in enumerate(PokeSim.get_all_types())}
+        self._chart = np.array(
+            [[PokeSim.get_type_ef(a, d) for d in self._types] for a in self._types], dtype=float
+        )
+        self._load_moves(battles)
+        self._load_teams(battles)
+
+    def _load_moves(self, battles: list[Battle]):
+        rows = {}
+        for battle in battles:
+            for trainer in (battle.t1, battle.t2):
+                for poke in trainer.poke_list:
+                    for move in poke.moves:
+                        rows.setdefault(move.id, move.md)
+        struggle = PokeSim.get_single_move("struggle")
+        rows[struggle[gs.MOVE_ID]] = struggle
+        self._move_rows = {move_id: i for i, move_id in enumerate(rows)}
+        self._struggle = self._move_rows[struggle[gs.MOVE_ID]]
+        table = [
+            [
+                md[gs.MOVE_POWER] or 0,
+                self._types[md[gs.MOVE_TYPE]],
+                md[gs.MOVE_ACC] or 0,
+                md[gs.MOVE_PRIORITY],
+                md[gs.MOVE_CATEGORY],
+                md[gs.MOVE_EFFECT_ID],
+                md[gs.MOVE_EFFECT_CHANCE] or 0,
+                md[gs.MOVE_EFFECT_AMT] or 0,
+                md[gs.MOVE_EFFECT_STAT] or 0,
+            ]
+            for md in rows.values()
+        ]
+        (
+            self._power,
+            self._move_type,
+            self._acc,
+            self._prio,
+            self._category,
+            self._ef_id,
+            self._ef_chance,
+            self._ef_amount,
+            self._ef_stat,
+        ) = np.array(table, dtype=np.int64).T.copy()
+
+    def _load_teams(self, battles: list[Battle]):
+        n = len(battles)
+        p = max(len(trainer.poke_list) for battle in battles for trainer in (battle.t1, battle.t2))
+        shape = (n, 2, p)
+        self.n = n
+        self.team_size = np.zeros((n, 2), dtype=np.int64)
+        self.level = np.zeros(shape, dtype=np.int64)
+        self.stats = np.ones(shape + (gs.STAT_NUM,), dtype=np.int64)
+        self.max_hp = np.ones(shape, dtype=np.int64)
+        self.hp = np.zeros(shape, dtype=np.int64)
+        self.poke_types = np.full(shape + (2,), -1, dtype=np.int64)
+        self.status = np.zeros(shape, dtype=np.int64)
+        self.counter = np.zeros(shape, dtype=np.int64)
+        self.item = np.zeros(shape, dtype=np.int64)
+        self.item_type = np.full(shape, -1, dtype=np.int64)
+        self.pinch_type = np.full(shape, -1, dtype=np.int64)
+        self.moves = np.full(shape + (gs.MOVES_MAX,), self._struggle, dtype=np.int64)
+        self.pp = np.zeros(shape + (gs.MOVES_MAX,), dtype=np.int64)
+        self.weather = np.zeros(n, dtype=np.int64)
+        for b, battle in enumerate(battles):
+            self.weather[b] = _WEATHERS[battle.battlefield.weather]
+            for s, trainer in enumerate((battle.t1, battle.t2)):
+                self.team_size[b, s] = len(trainer.poke_list)
+                for i, poke in enumerate(trainer.poke_list):
+                    self.level[b, s, i] = poke.level
+                    self.stats[b, s, i] = poke.stats_actual
+                    self.max_hp[b, s, i] = poke.max_hp
+                    self.hp[b, s, i] = poke.cur_hp
+                    self.poke_types[b, s, i] = [self._types.get(t, -1) for t in poke.types]
+                    self.status[b, s, i] = poke.nv_status
+                    self.counter[b, s, i] = poke.nv_counter
+                    if poke.o_item in _BOOST_ITEMS:
+                        self.item[b, s, i] = _TYPE_BOOST
+                        self.item_type[b, s, i] = self._types[_BOOST_ITEMS[poke.o_item]]
+                    elif poke.o_item:
+                        self.item[b, s, i] = _ITEMS[poke.o_item]
+                    if poke.ability in _PINCH_ABILITIES:
+                        self.pinch_type[b, s, i] = self._types[_PINCH_ABILITIES[poke.ability]]
+                    for j, move in enumerate(poke.moves):
+                        self.moves[b, s, i, j] = self._move_rows[move.id]
+                        self.pp[b, s, i, j] = move.current_pp
+        self.active = np.zeros((n, 2), dtype=np.int64)
+        self.stages = np.zeros((n, 2, 8), dtype=np.int64)
+        self.effective = self.stats[:, :, 0].copy()
+        self.fainted = np.zeros((n, 2), dtype=np.int64)
+        self.winners = np.zeros(n, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.finished = np.zeros(n, dtype=bool)
+        self._move = np.zeros((n, 2), dtype=np.int64)
+        self._slot = np.zeros((n, 2), dtype=np.int64)
+
+    def step(self) -> int:
+        """
+        Plays one turn of every unfinished battle, returns the number of battles still running.
+        """
+        live = np.flatnonzero(~self.finished)
+        if not live.size:
+            return 0
+        self.turns[live] += 1
+        for s in (0, 1):
+            self._choose_moves(live, s)
+
+        prio = self._prio[self._move[live]]
+        speed = self.effective[live, :, gs.SPD]
+        coin = self._rng.integers(2, size=live.size) < 1
+        t1_first = np.where(
+            prio[:, 0] != prio[:, 1],
+            prio[:, 0] > prio[:, 1],
+            np.where(speed[:, 0] != speed[:, 1], speed[:, 0] > speed[:, 1], coin),
+        )
+        for idx, first in ((live[t1_first], 0), (live[~t1_first], 1)):
+            self._half_turn(idx, first)
+            self._half_turn(idx, 1 - first)
+
+        live = live[self.winners[live] == 0]
+        speed = self.effective[live, :, gs.SPD]
+        coin = self._rng.integers(2, size=live.size) < 1
+        t1_faster = np.where(speed[:, 0] != speed[:, 1], speed[:, 0] > speed[:, 1], coin)
+        for idx, faster in ((live[t1_faster], 0), (live[~t1_faster], 1)):
+            for s in (faster, 1 - faster):
+                idx = idx[self.winners[idx] == 0]
+                self._end_turn(idx[self._active_hp(idx, s) > 0], s)
+                idx = idx[self.winners[idx] == 0]
+                self._switch(idx[self._active_hp(idx, s) == 0], s)
+
+        self.finished |= (self.winners != 0) | (self.turns >= self.max_turns)
+        return int((~self.finished).sum())
+
+    def run(self) -> list[tuple[int, int]]:
+        """
+        Plays every battle until it is won or max_turns turns were played, returns the
+        (winner, turns) pair of each battle, winner being 0 for unfinished battles.
+        """
+        while self.step():
+            pass
+        return list(zip(self.winners.tolist(), self.turns.tolist()))
+
+    def _active_hp(self, idx, s: int):
+        return self.hp[idx, s, self.active[idx, s]]
+
+    def _choose_moves(self, live, s: int):
+        p = self.active[live, s]
+        pp = self.pp[live, s, p]
+        keys = self._rng.random(pp.shape)
+        keys[pp <= 0] = -1
+        slot = keys.argmax(axis=1)
+        struggle = keys.max(axis=1) < 0
+        self._slot[live, s] = np.where(struggle, -1, slot)
+        self._move[live, s] = np.where(struggle, self._struggle, self.moves[live, s, p, slot])
+
+    def _half_turn(self, idx, s: int):
+        o = 1 - s
+        idx = idx[(self.winners[idx] == 0) & (self._active_hp(idx, s) > 0)]
+        slot = self._slot[idx, s]
+        uses_pp = slot >= 0
+        self.pp[idx[uses_pp], s, self.active[idx[uses_pp], s], slot[uses_pp]] -= 1
+
+        idx = idx[self._can_move(idx, s)]
+        move = self._move[idx, s]
+        stage = self.stages[idx, s, gs.ACC] - self.stages[idx, o, gs.EVA]
+        stage_mult = np.maximum(3, 3 + stage) / np.maximum(3, 3 - stage)
+        precision = self._rng.integers(1, 101, size=idx.size)
+        acc = self._acc[move]
+        idx = idx[(acc == 0) | (precision <= acc * stage_mult)]
+
+        move = self._move[idx, s]
+        ef_id = self._ef_id[move]
+        damaging = self._category[move] != gs.STATUS
+        hit = idx[damaging]
+        done = self._damage(hit, s)
+        ef_hit = self._ef_id[self._move[hit, s]]
+        chance = self._rng.integers(1, 101, size=hit.size) < self._ef_chance[self._move[hit, s]]
+        secondary = (done > 0) & chance
+        for ef, target, change in ((2, s, True), (3, o, True), (4, s, False), (5, o, False)):
+            b = hit[secondary & (ef_hit == ef)]
+            move = self._move[b, s]
+            if change:
+                self._stage_change(b, target, self._ef_stat[move], self._ef_amount[move])
+            else:
+                self._give_status(b, target, self._ef_stat[move])
+        struggled = hit[self._move[hit, s] == self._struggle]
+        struggled = struggled[self._active_hp(struggled, s) > 0]
+        self._take_damage(
+            struggled, s, np.maximum(1, self.max_hp[struggled, s, self.active[struggled, s]] // 4)
+        )
+
+        b = idx[~damaging & (ef_id == 13)]
+        self._give_status(b, o, self._ef_stat[self._move[b, s]])
+        for ef, target in ((16, s), (17, o)):
+            b = idx[~damaging & (ef_id == ef)]
+            move = self._move[b, s]
+            self._stage_change(b, target, self._ef_stat[move], self._ef_amount[move])
+
+    def _can_move(self, idx, s: int):
+        p = self.active[idx, s]
+        status = self.status[idx, s, p]
+        counter = self.counter[idx, s, p]
+        can_move = np.ones(idx.size, dtype=bool)
+
+        frozen = status == gs.FROZEN
+        thawed = frozen & (self._rng.integers(5, size=idx.size) < 1)
+        can_move &= ~frozen | thawed
+
+        asleep = status == gs.ASLEEP
+        woke = asleep & (counter == 0)
+        counter = np.where(asleep & ~woke, counter - 1, counter)
+        can_move &= ~(asleep & (counter > 0))
+
+        status = np.where(thawed | woke, 0, status)
+        counter = np.where(thawed, 0, counter)
+        self.status[idx, s, p] = status
+        self.counter[idx, s, p] = counter
+
+        paralyzed = status == gs.PARALYZED
+        can_move &= ~(paralyzed & (self._rng.integers(4, size=idx.size) < 1))
+        return can_move
+
+    def _damage(self, idx, s: int):
+        """
+        The damaging part of the object engine's _calculate_damage, returns the damage done to
+        the defending Pokemon of each battle.
+        """
+        o = 1 - s
+        done = np.zeros(idx.size, dtype=np.int64)
+        alive = self._active_hp(idx, o) > 0
+        a = self.active[idx, s]
+        d = self.active[idx, o]
+        move = self._move[idx, s]
+        move_type = self._move_type[move]
+        defender_types = self.poke_types[idx, o, d]
+        type_mult = self._chart[move_type, defender_types[:, 0]] * np.where(
+            defender_types[:, 1] >= 0, self._chart[move_type, defender_types[:, 1]], 1
+        )
+        affected = alive & (type_mult != 0)
+        sel = np.flatnonzero(affected)
+        idx, a, d, move, move_type, type_mult = (
+            idx[sel], a[sel], d[sel], move[sel], move_type[sel], type_mult[sel]
+        )
+        critical = self._rng.integers(16, size=idx.size) < 1
+        self._update_effective(idx, s)
+        self._update_effective(idx, o)
+
+        physical = self._category[move] == gs.PHYSICAL
+        a_stat = np.where(physical, gs.ATK, gs.SP_ATK)
+        d_stat = np.where(physical, gs.DEF, gs.SP_DEF)
+        attack = self.effective[idx, s, a_stat]
+        defense = self.effective[idx, o, d_stat]
+        attack = np.where(critical, np.maximum(self.stats[idx, s, a, a_stat], attack), attack)
+        defense = np.where(critical, np.minimum(self.stats[idx, o, d, d_stat], defense), defense)
+        ratio = attack / defense
+
+        burn = np.where((self.status[idx, s, a] == gs.BURNED) & physical, 0.5, 1)
+        power = self._power[move]
+        hp = self.hp[idx, s, a]
+        pinch = (self.pinch_type[idx, s, a] == move_type) & (hp <= self.max_hp[idx, s, a] // 3)
+        power = np.where(pinch, (power * 1.5).astype(np.int64), power)
+        item = self.item[idx, s, a]
+        boosted = (item == _TYPE_BOOST) & (self.item_type[idx, s, a] == move_type)
+        power = np.where(boosted, (power * 1.2).astype(np.int64), power)
+        boosted = ((item == _MUSCLE_BAND) & physical) | ((item == _WISE_GLASSES) & ~physical)
+        power = np.where(boosted, (power * 1.1).astype(np.int64), power)
+
+        weather = self.weather[idx]
+        fire = move_type == self._types["fire"]
+        water = move_type == self._types["water"]
+        weather_mult = np.where(
+            weather == _WEATHERS[gs.HARSH_SUNLIGHT],
+            np.where(fire, 1.5, np.where(water, 0.5, 1)),
+            np.where(weather == _WEATHERS[gs.RAIN], np.where(fire, 0.5, np.where(water, 1.5, 1)), 1),
+        )
+        attacker_types = self.poke_types[idx, s, a]
+        stab = np.where(
+            (move_type == attacker_types[:, 0]) | (move_type == attacker_types[:, 1]), 1.5, 1
+        )
+        random_mult = self._rng.integers(85, 101, size=idx.size) / 100
+        item_mult = np.where(
+            (item == _EXPERT_BELT) & (type_mult > 1), 1.2, np.where(item == _LIFE_ORB, 1.3, 1)
+        )
+
+        damage = ((0.4 * self.level[idx, s, a] + 2) * power * ratio) / 50 * burn * weather_mult + 2
+        damage *= np.where(critical, 2, 1) * item_mult * random_mult * stab * type_mult
+        done[sel] = self._take_damage(idx, o, damage.astype(np.int64))
+
+        orb = (item == _LIFE_ORB) & (done[sel] > 0) & (self._active_hp(idx, s) > 0)
+        self._take_damage(idx[orb], s, np.maximum(1, self.max_hp[idx[orb], s, a[orb]] // 10))
+        return done
+
+    def _update_effective(self, idx, s: int):
+        p = self.active[idx, s]
+        stages = self.stages[idx, s, 1:gs.STAT_NUM]
+        stats = self.stats[idx, s, p, 1:]
+        effective = np.maximum(
+            1, (stats * np.maximum(2, 2 + stages) / np.maximum(2, 2 - stages)).astype(np.int64)
+        )
+        paralyzed = self.status[idx, s, p] == gs.PARALYZED
+        effective[:, gs.SPD - 1] = np.where(
+            paralyzed, effective[:, gs.SPD - 1] // 4, effective[:, gs.SPD - 1]
+        )
+        self.effective[idx, s, 1:] = effective
+
+    def _take_damage(self, idx, s: int, damage):
+        """
+        Pokemon.take_damage for the current Pokemon of side s, returns the damage done, which
+        like in the object engine is 0 when the Pokemon faints.
+        """
+        damage = np.maximum(damage, 0)
+        p = self.active[idx, s]
+        hp = self.hp[idx, s, p]
+        fainted = (damage > 0) & (hp - damage <= 0)
+        self.hp[idx, s, p] = np.where(fainted, 0, hp - damage)
+        self._faint(idx[fainted], s)
+        return np.where(fainted, 0, damage)
+
+    def _heal(self, idx, s: int, amount):
+        p = self.active[idx, s]
+        self.hp[idx, s, p] = np.minimum(self.max_hp[idx, s, p], self.hp[idx, s, p] + amount)
+
+    def _faint(self, idx, s: int):
+        self.stages[idx, s] = 0
+        self.effective[idx, s] = self.stats[idx, s, self.active[idx, s]]
+        self.fainted[idx, s] += 1
+        lost = idx[(self.fainted[idx, s] == self.team_size[idx, s]) & (self.winners[idx] == 0)]
+        self.winners[lost] = 2 if s == 0 else 1
+
+    def _stage_change(self, idx, s: int, stat, amount):
+        idx, stat, amount = (v[self._active_hp(idx, s) > 0] for v in (idx, stat, amount))
+        self.stages[idx, s, stat] = np.clip(self.stages[idx, s, stat] + amount, -6, 6)
+
+    def _give_status(self, idx, s: int, status):
+        p = self.active[idx, s]
+        types = self.poke_types[idx, s, p]
+        immune = ((status == gs.BURNED) & (types == self._types["fire"]).any(axis=1)) | (
+            (status == gs.FROZEN) & (types == self._types["ice"]).any(axis=1)
+        )
+        ok = (self.hp[idx, s, p] > 0) & (self.status[idx, s, p] == 0) & ~immune
+        idx, p, status = idx[ok], p[ok], status[ok]
+        self.status[idx, s, p] = status
+        self.counter[idx, s, p] = np.where(
+            status == gs.ASLEEP,
+            self._rng.integers(2, 6, size=idx.size),
+            np.where(status == gs.BADLY_POISONED, 1, 0),
+        )
+
+    def _end_turn(self, idx, s: int):
+        """
+        Residual status damage, weather damage and held items of the current Pokemon of side s,
+        in the order of the object engine, stopping at the first that makes it faint.
+        """
+        p = self.active[idx, s]
+        status = self.status[idx, s, p]
+        max_hp = self.max_hp[idx, s, p]
+        badly = status == gs.BADLY_POISONED
+        damage = np.where(
+            (status == gs.BURNED) | (status == gs.POISONED),
+            np.maximum(1, max_hp // 8),
+            np.where(badly, np.maximum(1, max_hp * self.counter[idx, s, p] // 16), 0),
+        )
+        self._take_damage(idx, s, damage)
+        self.counter[idx[badly], s, p[badly]] += 1
+
+        idx = idx[self._active_hp(idx, s) > 0]
+        p = self.active[idx, s]
+        types = self.poke_types[idx, s, p]
+        weather = self.weather[idx]
+        sand = (weather == _WEATHERS[gs.SANDSTORM]) & ~np.isin(
+            types, [self._types[t] for t in _SAND_IMMUNE]
+        ).any(axis=1)
+        hail = (weather == _WEATHERS[gs.HAIL]) & ~(types == self._types["ice"]).any(axis=1)
+        self._take_damage(idx, s, np.where(sand | hail, np.maximum(1, self.max_hp[idx, s, p] // 16), 0))
+
+        idx = idx[self._active_hp(idx, s) > 0]
+        p = self.active[idx, s]
+        item = self.item[idx, s, p]
+        hp = self.hp[idx, s, p]
+        max_hp = self.max_hp[idx, s, p]
+        low = hp < max_hp * gs.BERRY_THRESHOLD
+        heal = np.where(
+            (item == _LEFTOVERS) & (hp != max_hp),
+            np.maximum(1, max_hp // 16),
+            np.where(
+                (item == _ORAN_BERRY) & low,
+                10,
+                np.where((item == _SITRUS_BERRY) & low, np.maximum(1, max_hp // 4), 0),
+            ),
+        )
+        eaten = ((item == _ORAN_BERRY) | (item == _SITRUS_BERRY)) & low
+        self.item[idx[eaten], s, p[eaten]] = 0
+        self._heal(idx, s, heal)
+
+    def _switch(self, idx, s: int):
+        """
+        Sends out the first Pokemon of the party that is able to battle, like the object engine
+        does for Trainers without a selection function.
+        """
+        able = (self.hp[idx, s] > 0) & (np.arange(self.hp.shape[2]) < self.team_size[idx, s, None])
+        p = able.argmax(axis=1)
+        self.active[idx, s] = p
+        self.stages[idx, s] = 0
+        self.effective[idx, s] = self.stats[idx, s, p]
+
+
+def run_battles(battles: list[Battle], max_turns: int = 1000, seed: int = None) -> list[tuple[int, int]]:
+    """
+    Plays unstarted battles with random moves, the battles accepted by is_supported with
+    VectorBattles and the others, or all of them without numpy, with the object engine and
+    batch.random_policy. Returns the (winner, turns) pair of each battle as in BatchResult.add,
+    winner being 1 or 2 for the winning Trainer and 0 for battles stopped after max_turns turns.
+    """
+    outcomes = [None] * len(battles)
+    vectorized = [i for i, battle in enumerate(battles) if np and is_supported(battle)]
+    if vectorized:
+        engine = VectorBattles([battles[i] for i in vectorized], seed=seed, max_turns=max_turns)
+        for i, outcome in zip(vectorized, engine.run()):
+            outcomes[i] = outcome
+    for i, battle in enumerate(battles):
+        if outcomes[i] is not None:
+            continue
+        battle.reset(seed=seed + i if seed is not None else None)
+        battle.start()
+        while not battle.is_finished() and battle.turn_count < max_turns:
+            battle.turn(random_policy(battle, battle.t1), random_policy(battle, battle.t2))
+        winner = battle.get_winner()
+        outcomes[i] = (1 if winner is battle.t1 else 2 if winner is battle.t2 else 0, battle.turn_count)
+    return outcomes
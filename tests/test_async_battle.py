@@ -0,0 +1,165 @@
+import asyncio
+import random
+import unittest
+from random import Random
+
+from poke_battle_sim import PokeSim, Pokemon, Trainer, Battle, AsyncBattle
+
+
+def make_trainer(name, selection=None):
+    pokemon_1 = Pokemon(25, 22, ["tackle", "thunder-shock"], "male", stats_actual=[60, 100, 100, 100, 100, 100])
+    pokemon_2 = Pokemon(4, 22, ["tackle", "ember"], "male", stats_actual=[60, 100, 100, 100, 100, 90])
+    pokemon_3 = Pokemon(7, 22, ["tackle", "bubble"], "male", stats_actual=[60, 100, 100, 100, 100, 80])
+    return Trainer(name, [pokemon_1, pokemon_2, pokemon_3], selection)
+
+
+def select_last(trainer):
+    trainer.current_poke = [p for p in trainer.poke_list if p.is_alive][-1]
+
+
+def choose_move(battle, trainer):
+    if battle.turn_count == 1 and trainer is battle.t1:
+        return ["other", "switch"]
+    return ["move", trainer.current_poke.moves[battle.turn_count % 2].name]
+
+
+class TestAsyncBattle(unittest.TestCase):
+
+    def test_async_battle_matches_battle(self):
+        battle = Battle(make_trainer('Ash', select_last), make_trainer('Misty', select_last), rng=Random(4))
+        battle.start()
+        while not battle.is_finished():
+            battle.turn(choose_move(battle, battle.t1), choose_move(battle, battle.t2))
+        expected = battle.get_all_text()
+
+        async def action(battle, trainer):
+            await asyncio.sleep(0)
+            return choose_move(battle, trainer)
+
+        async def selection(battle, trainer):
+            await asyncio.sleep(0)
+            alive = [p for p in trainer.poke_list if p.is_alive and p is not trainer.current_poke]
+            return trainer.poke_list.index(alive[-1])
+
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'), rng=Random(4))
+        async_battle = AsyncBattle(battle, action, action, selection, selection)
+        winner = asyncio.run(async_battle.run())
+
+        self.assertEqual(expected, battle.get_all_text())
+        self.assertIs(battle.t2, winner)
+        self.assertIsNone(battle.t1.selection)
+        self.assertIsNone(battle.journal)
+
+    def test_async_battle_matches_battle_on_random_teams(self):
+        def choose(battle, trainer):
+            moves = trainer.current_poke.get_available_moves()
+            return ["move", moves[battle.turn_count % len(moves)].name if moves else "struggle"]
+
+        async def action(battle, trainer):
+            await asyncio.sleep(0)
+            return choose(battle, trainer)
+
+        async def selection(battle, trainer):
+            await asyncio.sleep(0)
+            alive = [p for p in trainer.poke_list if p.is_alive and p is not trainer.current_poke]
+            return trainer.poke_list.index(alive[-1])
+
+        for seed in range(12):
+            battles = []
+            for play_async in (False, True):
+                t1, t2 = PokeSim.random_teams(2, 3, seed=seed, trainers=True)
+                battle = Battle(t1, t2, rng=Random(seed))
+                if not play_async:
+                    t1.selection = t2.selection = select_last
+                    battle.start()
+                    try:
+                        while not battle.is_finished() and battle.turn_count < 100:
+                            battle.turn(choose(battle, t1), choose(battle, t2))
+                    except Exception:
+                        # engine errors unrelated to AsyncBattle end the comparison early
+                        pass
+                else:
+                    battle.start()
+                    async_battle = AsyncBattle(battle, action, action, selection, selection)
+                    try:
+                        asyncio.run(async_battle.run(100))
+                    except Exception:
+                        pass
+                battles.append(battle)
+            self.assertEqual(battles[0].get_all_text(), battles[1].get_all_text())
+
+    def test_async_battle_own_random_generator(self):
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'))
+        AsyncBattle(battle, choose_move, choose_move)
+        self.assertIsInstance(battle.rng, Random)
+        self.assertIsNot(random, battle.rng)
+
+        rng = Random(5)
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'), rng=rng)
+        AsyncBattle(battle, choose_move, choose_move)
+        self.assertIs(rng, battle.rng)
+
+    def test_async_battle_journal(self):
+        async def action(battle, trainer):
+            return ["move", "tackle"]
+
+        async def selection(battle, trainer):
+            return 2
+
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'), rng=Random(2))
+        battle.start()
+        asyncio.run(AsyncBattle(battle, action, action).turn())
+        self.assertIsNone(battle.journal)
+
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'), rng=Random(2))
+        battle.start()
+        battle.enable_journal()
+        journal = battle.journal
+        start = battle.to_bytes()
+        state = battle.rng.getstate()
+        first = battle.mark()
+        async_battle = AsyncBattle(battle, action, action, selection, selection)
+        for _ in range(7):
+            asyncio.run(async_battle.turn())
+        self.assertIs(journal, battle.journal)
+        self.assertEqual(battle.t2.poke_list[2], battle.t2.current_poke)
+        battle.undo_to(first)
+        battle.rng.setstate(state)
+        self.assertEqual(start, battle.to_bytes())
+
+    def test_async_battle_timeout_fallback(self):
+        async def slow_action(battle, trainer):
+            await asyncio.sleep(10)
+            return ["move", "ember"]
+
+        async def action(battle, trainer):
+            return ["move", "tackle"]
+
+        battle = Battle(make_trainer('Ash'), make_trainer('Misty'))
+        async_battle = AsyncBattle(battle, action, slow_action, timeout=0.01, default_action=lambda b, t: ["move", "tackle"])
+        battle.start()
+        asyncio.run(async_battle.turn())
+
+        self.assertEqual(2, battle.get_all_text().count("PIKACHU used Tackle!"))
+
+    def test_async_battles_share_event_loop(self):
+        async def action(battle, trainer):
+            await asyncio.sleep(0)
+            return ["move", trainer.current_poke.moves[0].name]
+
+        async def run_all():
+            battles = [AsyncBattle(Battle(make_trainer('Ash'), make_trainer('Misty')), action, action) for _ in range(20)]
+            return await asyncio.gather(*[b.run() for b in battles])
+
+        winners = asyncio.run(run_all())
+        self.assertEqual(20, len(winners))
+        self.assertTrue(all(winner is not None for winner in winners))
+
+    def test_async_battle_invalid_battle(self):
+        with self.assertRaises(Exception) as context:
+            AsyncBattle(None, None, None)
+        self.assertEqual("Attempted to create AsyncBattle with invalid Battle", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
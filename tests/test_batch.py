@@ -0,0 +1,103 @@
+import gc
+import unittest
+
+from poke_battle_sim import Pokemon, Trainer, Battle
+from poke_battle_sim.batch import run_batch, random_policy, BatchResult
+
+
+def make_battle():
+    pokemon_1 = Pokemon(25, 22, ["tackle", "thunder-shock"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+    trainer_1 = Trainer('Ash', [pokemon_1])
+    pokemon_2 = Pokemon(4, 22, ["tackle", "ember"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+    trainer_2 = Trainer('Misty', [pokemon_2])
+    return Battle(trainer_1, trainer_2)
+
+
+def failing_policy(battle, trainer):
+    if battle.turn_count == 2:
+        raise Exception("Policy failed")
+    return random_policy(battle, trainer)
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_run_batch_stops_on_precision(self):
+        results = []
+        result = run_batch(make_battle, width=0.3, chunk_size=20, seed=1, callback=results.append)
+
+        self.assertEqual("precision", result.stop_reason)
+        self.assertEqual(result.battles, result.t1_wins + result.t2_wins + result.draws)
+        low, high = result.win_rate_interval
+        self.assertLessEqual(high - low, 0.3)
+        self.assertLessEqual(low, result.win_rate)
+        self.assertLessEqual(result.win_rate, high)
+        self.assertEqual(result.battles // 20, len(results))
+
+    def test_run_batch_stops_on_budget(self):
+        result = run_batch(make_battle, width=0.01, max_battles=25, chunk_size=10, seed=1)
+
+        self.assertEqual("budget", result.stop_reason)
+        self.assertEqual(25, result.battles)
+
+    def test_run_batch_is_reproducible(self):
+        result_1 = run_batch(make_battle, max_battles=20, chunk_size=10, seed=3)
+        result_2 = run_batch(make_battle, max_battles=20, chunk_size=10, seed=3)
+
+        self.assertEqual(result_1.t1_wins, result_2.t1_wins)
+        self.assertEqual(result_1.turns_sum, result_2.turns_sum)
+
+    def test_run_batch_in_parallel(self):
+        result = run_batch(make_battle, max_battles=40, chunk_size=10, workers=2, seed=1)
+
+        self.assertEqual(40, result.battles)
+        self.assertGreater(result.avg_turns, 0)
+        self.assertEqual(0, gc.get_freeze_count())
+
+    def test_run_batch_in_threads(self):
+        sequential = run_batch(make_battle, max_battles=60, chunk_size=10, seed=5)
+        threaded = run_batch(make_battle, max_battles=60, chunk_size=10, threads=3, seed=5)
+
+        self.assertEqual(60, threaded.battles)
+        self.assertEqual(sequential.t1_wins, threaded.t1_wins)
+        self.assertEqual(sequential.turns_sum, threaded.turns_sum)
+        with self.assertRaises(Exception) as context:
+            run_batch(make_battle, workers=2, threads=2)
+        self.assertEqual("Attempted to run batch with both worker processes and threads", str(context.exception))
+
+    def test_run_batch_counts_errors(self):
+        result = run_batch(make_battle, t1_policy=failing_policy, max_battles=12, chunk_size=5, seed=1)
+
+        self.assertEqual("budget", result.stop_reason)
+        self.assertEqual(12, result.battles + result.errors)
+        self.assertGreater(result.errors, 0)
+        self.assertEqual(result.battles, result.t1_wins + result.t2_wins + result.draws)
+
+    def test_random_policy_struggles_without_available_moves(self):
+        pokemon_1 = Pokemon(25, 22, ["growl", "tail-whip"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        pokemon_2 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        battle = Battle(Trainer('Ash', [pokemon_1]), Trainer('Misty', [pokemon_2]))
+        battle.start()
+        pokemon_1.taunt = 3
+
+        action = random_policy(battle, battle.t1)
+        self.assertEqual(["move", "struggle"], action)
+        battle.turn(action, random_policy(battle, battle.t2))
+        self.assertIn("PIKACHU used Struggle!", battle.get_all_text())
+
+    def test_wilson_interval(self):
+        result = BatchResult(0.95)
+        result.add([(1, 10)] * 8 + [(2, 20)] * 2)
+
+        low, high = result.win_rate_interval
+        self.assertAlmostEqual(0.4902, low, places=4)
+        self.assertAlmostEqual(0.9433, high, places=4)
+        self.assertEqual(12, result.avg_turns)
+
+    def test_run_batch_invalid_width(self):
+        with self.assertRaises(Exception) as context:
+            run_batch(make_battle, width=0)
+        self.assertEqual("Attempted to run batch with invalid interval width", str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
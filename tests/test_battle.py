@@ -1,8 +1,16 @@
+import gc
 import unittest
+import weakref
+from random import Random, SystemRandom, seed as random_seed
 from unittest.mock import patch
 
-from poke_battle_sim import Trainer, Pokemon, Battle
+from poke_battle_sim import PokeSim, Trainer, Pokemon, Battle
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.move import Move
+from poke_battle_sim.core.profiler import Profiler
 from poke_battle_sim.util import process_move
+import poke_battle_sim.util.serialize as sz
+import poke_battle_sim.conf.global_settings as gs
 
 
 class TestBattle(unittest.TestCase):
@@ -3941,6 +3949,441 @@ class TestBattle(unittest.TestCase):
         self.assertEqual(3, battle.turn_count)
         self.assertIsNone(battle.winner)
 
+    def test_journal_undo_replay(self):
+        for seed in range(20):
+            t1, t2 = PokeSim.random_teams(2, 3, seed=seed, trainers=True)
+            battle = Battle(t1, t2, rng=Random(seed))
+            battle.start()
+            battle.enable_journal()
+            start = battle.to_bytes()
+            start_state = battle.rng.getstate()
+            first = battle.mark()
+            while not battle.is_finished() and battle.turn_count < 40:
+                actions = random_policy(battle, t1), random_policy(battle, t2)
+                before = battle.to_bytes()
+                state = battle.rng.getstate()
+                marker = battle.mark()
+                try:
+                    battle.turn(*actions)
+                except Exception:
+                    # engine errors unrelated to journaling end the battle early
+                    battle.undo_to(marker)
+                    battle.rng.setstate(state)
+                    self.assertEqual(before, battle.to_bytes())
+                    break
+                after = battle.to_bytes()
+                battle.undo_to(marker)
+                battle.rng.setstate(state)
+                self.assertEqual(before, battle.to_bytes())
+                battle.turn(*actions)
+                self.assertEqual(after, battle.to_bytes())
+
+            battle.undo_to(first)
+            battle.rng.setstate(start_state)
+            self.assertEqual(start, battle.to_bytes())
+
+    def test_journal_records_writes(self):
+        pokemon_1 = Pokemon(1, 22, ["tackle", "growl"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        pokemon_2 = Pokemon(7, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        poke_list = [pokemon_1, pokemon_2]
+        trainer_1 = Trainer('Ash', poke_list)
+        pokemon_3 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_3])
+        battle = Battle(trainer_1, trainer_2, rng=Random(1))
+        battle.start()
+        battle.enable_journal()
+        first = battle.mark()
+        marker = battle.mark()
+        self.assertEqual(marker + 2, len(battle.journal.entries))
+        self.assertEqual("Pokemon", type(pokemon_1).__name__)
+
+        battle.turn(["move", "growl"], ["move", "tackle"])
+        self.assertEqual(-1, pokemon_3.stat_stages[gs.ATK])
+        battle.undo_to(marker)
+        self.assertEqual(0, pokemon_3.stat_stages[gs.ATK])
+        self.assertEqual(pokemon_3.max_hp, pokemon_3.cur_hp)
+        self.assertEqual(first + 2, len(battle.journal.entries))
+
+        battle.turn(["move", "growl"], ["move", "tackle"])
+        battle.close()
+        self.assertIs(Pokemon, type(pokemon_1))
+        self.assertIs(Trainer, type(trainer_1))
+        self.assertIs(list, type(pokemon_3.stat_stages))
+        self.assertIs(poke_list, trainer_1.poke_list)
+        self.assertIsNone(battle.journal)
+
+    @patch('poke_battle_sim.util.process_move._calculate_is_critical')
+    def test_trainer_expiration_after_faint(self, mock_calculate_crit):
+        mock_calculate_crit.return_value = False
+        pokemon_1 = Pokemon(25, 40, ["tailwind", "tackle", "self-destruct"], "male", stats_actual=[100, 50, 100, 50, 100, 50])
+        pokemon_2 = Pokemon(4, 40, ["tackle"], "male", stats_actual=[100, 50, 100, 50, 100, 50])
+        pokemon_3 = Pokemon(7, 40, ["tackle"], "male", stats_actual=[500, 10, 500, 10, 500, 60])
+        battle = Battle(Trainer("Ash", [pokemon_1, pokemon_2]), Trainer("Misty", [pokemon_3]))
+        battle.start()
+        battle.turn(["move", "tailwind"], ["move", "tackle"])
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        battle.turn(["move", "self-destruct"], ["move", "tackle"])
+        self.assertFalse(pokemon_1.is_alive)
+        self.assertEqual(100, pokemon_2.stats_actual[gs.SPD])
+        self.assertTrue(battle.t1.tailwind_count)
+        self.assertNotIn("Ash's tailwind petered out!", battle.get_all_text())
+
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(50, pokemon_2.stats_actual[gs.SPD])
+        self.assertEqual(0, battle.t1.tailwind_count)
+        self.assertEqual("Ash's tailwind petered out!", battle.get_all_text()[-1])
+
+    def test_undo_without_journal(self):
+        pokemon_1 = Pokemon(1, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        pokemon_2 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        battle = Battle(trainer_1, trainer_2)
+        battle.start()
+
+        with self.assertRaises(Exception) as context:
+            battle.undo_to(0)
+        self.assertEqual("Cannot undo Battle without journal enabled", str(context.exception))
+
+    @patch('poke_battle_sim.util.process_move._calculate_is_critical')
+    def test_residual_effects_registration(self, mock_calculate_crit):
+        pokemon_1 = Pokemon(1, 22, ["tackle", "wish"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        pokemon_2 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        battle = Battle(trainer_1, trainer_2)
+        battle.start()
+
+        mock_calculate_crit.return_value = False
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(set(), trainer_1.residuals)
+        self.assertEqual(set(), pokemon_1.residuals)
+
+        battle.turn(["move", "wish"], ["move", "tackle"])
+        self.assertEqual(set(), trainer_1.residuals)
+        self.assertEqual(1, trainer_1.wish)
+        self.assertEqual({"wish": battle.timer_wheel.tick + 1}, trainer_1.countdowns)
+
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(0, trainer_1.wish)
+        self.assertIn("BULBASAUR's wish came true!", battle.get_all_text())
+
+    @patch('poke_battle_sim.util.process_move._calculate_is_critical')
+    def test_timer_wheel_expirations(self, mock_calculate_crit):
+        pokemon_1 = Pokemon(1, 22, ["tackle", "light-screen"], "male", stats_actual=[500, 100, 100, 100, 100, 100])
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        pokemon_2 = Pokemon(4, 22, ["tackle", "sandstorm"], "male", stats_actual=[500, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        battle = Battle(trainer_1, trainer_2)
+        battle.start()
+
+        mock_calculate_crit.return_value = False
+        battle.turn(["move", "light-screen"], ["move", "sandstorm"])
+        self.assertEqual(4, trainer_1.light_screen)
+        self.assertEqual(4, battle.battlefield.weather_count)
+        for _ in range(4):
+            battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(0, trainer_1.light_screen)
+        self.assertEqual(0, battle.battlefield.weather_count)
+        self.assertEqual(gs.SANDSTORM, battle.battlefield.weather)
+        self.assertEqual(1, battle.get_all_text().count("Ash's Light Screen wore off."))
+        self.assertEqual(1, battle.get_all_text().count("The sandstorm subsided."))
+        self.assertEqual({}, battle.timer_wheel.slots)
+
+
+    def test_reset(self):
+        pokemon_1 = Pokemon(1, 22, ["tackle", "growl"], "male", stats_actual=[100, 100, 100, 100, 100, 100], item="oran-berry")
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        pokemon_2 = Pokemon(4, 22, ["tackle", "ember"], "male", stats_actual=[100, 100, 100, 100, 100, 1], status="poisoned")
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        battle = Battle(trainer_1, trainer_2)
+
+        battle.reset(seed=1)
+        battle.start()
+        while not battle.is_finished():
+            battle.turn(["move", "tackle"], ["move", "ember"])
+        first_text = list(battle.get_all_text())
+        first_winner = battle.get_winner()
+
+        battle.reset(seed=1)
+        self.assertFalse(battle.battle_started)
+        self.assertEqual([], battle.get_all_text())
+        self.assertEqual(100, pokemon_1.cur_hp)
+        self.assertTrue(pokemon_2.is_alive)
+        self.assertEqual(gs.POISONED, pokemon_2.nv_status)
+        self.assertEqual("oran-berry", pokemon_1.item)
+        self.assertEqual(35, pokemon_1.moves[0].current_pp)
+        self.assertFalse(trainer_1.in_battle)
+
+        battle.start()
+        while not battle.is_finished():
+            battle.turn(["move", "tackle"], ["move", "ember"])
+        self.assertEqual(first_text, battle.get_all_text())
+        self.assertIs(first_winner, battle.get_winner())
+
+    def test_random_streams(self):
+        hps = []
+        for moves, other_seed in ((["tackle"], 1), (["tackle", "growl"], 2)):
+            pokemon_1 = Pokemon(25, 22, moves, "male", stats_actual=[100, 100, 100, 100, 100, 100])
+            pokemon_2 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+            battle = Battle(Trainer('Ash', [pokemon_1]), Trainer('Misty', [pokemon_2]), rng=Random(other_seed))
+            battle.enable_random_streams(3)
+            battle.start()
+            hp = []
+            while not battle.is_finished():
+                battle.turn(["move", "tackle"], ["move", "tackle"])
+                hp.append((pokemon_1.cur_hp, pokemon_2.cur_hp))
+            hps.append(hp)
+
+        self.assertEqual(hps[0], hps[1])
+        with self.assertRaises(Exception):
+            battle.enable_random_streams("3")
+
+    def test_plain_move_path(self):
+        moves = sorted(set(PokeSim.query_moves(ef_id=1)) | set(PokeSim.query_moves(category=gs.PHYSICAL)[:60]))
+
+        def play():
+            outcomes = []
+            for seed in range(15):
+                t1, t2 = PokeSim.random_teams(2, 3, seed=seed, constraints={"moves": moves}, trainers=True)
+                battle = Battle(t1, t2, rng=Random(seed))
+                battle.start()
+                while not battle.is_finished() and battle.turn_count < 60:
+                    battle.turn(random_policy(battle, t1), random_policy(battle, t2))
+                pokes = t1.poke_list + t2.poke_list
+                outcomes.append((battle.get_all_text(), [(p.cur_hp, p.nv_status, p.stat_stages) for p in pokes]))
+            return outcomes
+
+        with patch.object(process_move, "_process_plain_move", wraps=process_move._process_plain_move) as lean:
+            fast = play()
+        self.assertTrue(lean.called)
+        with patch.object(process_move, "_plain_context", return_value=False):
+            full = play()
+        self.assertEqual(full, fast)
+
+    def test_turn_limit(self):
+        pokemon_1 = Pokemon(25, 40, ["tackle"], "male", stats_actual=[500, 10, 100, 10, 100, 90])
+        pokemon_2 = Pokemon(7, 40, ["tackle"], "male", stats_actual=[500, 10, 100, 10, 100, 45])
+        battle = Battle(Trainer("Ash", [pokemon_1]), Trainer("Misty", [pokemon_2]), max_turns=3)
+        battle.start()
+        for _ in range(3):
+            self.assertFalse(battle.is_finished())
+            battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertTrue(battle.is_finished())
+        self.assertIsNone(battle.get_winner())
+        self.assertEqual(gs.DRAW_TURN_LIMIT, battle.draw_reason)
+        self.assertEqual("The battle between Ash and Misty ended in a draw!", battle.get_all_text()[-1])
+        self.assertFalse(pokemon_1.in_battle)
+
+        with self.assertRaises(Exception) as context:
+            Battle(battle.t1, battle.t2, max_turns=0)
+        self.assertEqual("Attempted to create Battle with invalid turn limit", str(context.exception))
+
+    def test_stall_detection(self):
+        trainer_1 = Trainer("Ash", [
+            Pokemon(25, 40, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 90]),
+            Pokemon(4, 40, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 90]),
+        ])
+        trainer_2 = Trainer("Misty", [
+            Pokemon(7, 40, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 45]),
+            Pokemon(1, 40, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 45]),
+        ])
+        battle = Battle(trainer_1, trainer_2, stall_turns=4)
+        battle.start()
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        for _ in range(3):
+            battle.turn(["other", "switch"], ["other", "switch"])
+        self.assertFalse(battle.is_finished())
+        battle.turn(["other", "switch"], ["other", "switch"])
+        self.assertTrue(battle.is_finished())
+        self.assertEqual(gs.DRAW_NO_PROGRESS, battle.draw_reason)
+        self.assertEqual(5, battle.turn_count)
+
+        battle.reset()
+        self.assertIsNone(battle.draw_reason)
+        battle.start()
+        self.assertFalse(battle.is_finished())
+
+    def test_close(self):
+        pokemon_1 = Pokemon(25, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        pokemon_2 = Pokemon(7, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        with Battle(trainer_1, trainer_2, profiler=Profiler()) as battle:
+            battle.enable_journal()
+            battle.start()
+            battle.mark()
+            battle.turn(["move", "tackle"], ["move", "tackle"])
+            self.assertIs(battle, pokemon_1.cur_battle)
+            self.assertIs(trainer_2, pokemon_1.enemy)
+
+        self.assertFalse(trainer_1.in_battle or pokemon_1.in_battle)
+        self.assertIsNone(trainer_1.cur_battle)
+        self.assertIsNone(pokemon_2.cur_battle)
+        with self.assertRaises(Exception):
+            battle.turn(["move", "tackle"], ["move", "tackle"])
+
+        gc.disable()
+        try:
+            ref = weakref.ref(battle)
+            del battle
+            self.assertIsNone(ref())
+        finally:
+            gc.enable()
+        Battle(trainer_1, trainer_2).start()
+        self.assertTrue(pokemon_1.in_battle)
+
+    def test_battle_rng(self):
+        def play(rng, noise=0):
+            pokemon_1 = Pokemon(25, 22, ["tackle", "thunder-shock", "metronome"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+            pokemon_2 = Pokemon(4, 22, ["tackle", "ember"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+            battle = Battle(Trainer("Ash", [pokemon_1]), Trainer("Misty", [pokemon_2]), rng=rng)
+            battle.start()
+            while not battle.is_finished():
+                random_seed(noise * 1000 + battle.turn_count)
+                battle.turn(random_policy(battle, battle.t1), random_policy(battle, battle.t2))
+            return battle.get_all_text()
+
+        self.assertEqual(play(Random(8), 1), play(Random(8), 2))
+        battles = [
+            Battle(
+                Trainer("Ash", [Pokemon(25, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+                Trainer("Misty", [Pokemon(4, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+            )
+            for _ in range(2)
+        ]
+        self.assertIsInstance(battles[0].rng, Random)
+        self.assertIsNot(battles[0].rng, battles[1].rng)
+        with self.assertRaises(Exception) as context:
+            play(8)
+        self.assertEqual("Attempted to create Battle with invalid random generator", str(context.exception))
+
+    def test_to_bytes(self):
+        pokemon_1 = Pokemon(1, 22, ["tackle", "leech-seed"], "male", stats_actual=[100, 100, 100, 100, 100, 100], item="oran-berry")
+        pokemon_2 = Pokemon(7, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100])
+        trainer_1 = Trainer('Ash', [pokemon_1, pokemon_2])
+        pokemon_3 = Pokemon(4, 22, ["tackle", "ember"], "male", stats_actual=[100, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_3])
+        battle = Battle(trainer_1, trainer_2, weather=gs.RAIN)
+        battle.start()
+        battle.turn(["move", "leech-seed"], ["move", "ember"])
+
+        data = battle.to_bytes()
+        copy = Battle.from_bytes(data)
+        self.assertEqual(data, copy.to_bytes())
+        self.assertLess(len(battle.to_bytes(text=False)), len(data))
+        self.assertEqual(battle.get_all_text(), copy.get_all_text())
+        self.assertIs(copy.t1.current_poke, copy.t1.poke_list[0])
+        self.assertIs(copy.t2, copy.t1.current_poke.enemy)
+        self.assertIs(copy, copy.t2.current_poke.cur_battle)
+        self.assertEqual(gs.RAIN, copy.battlefield.weather)
+
+        battle.get_cur_text()
+        copy.get_cur_text()
+        for b in (battle, copy):
+            b.turn(["move", "tackle"], ["move", "ember"])
+        self.assertEqual(battle.get_cur_text(), copy.get_cur_text())
+        self.assertEqual(battle.rng.getstate(), copy.rng.getstate())
+        self.assertEqual(pokemon_3.cur_hp, copy.t2.current_poke.cur_hp)
+        self.assertEqual(pokemon_1.cur_hp, copy.t1.current_poke.cur_hp)
+
+        own_rng = Battle(
+            Trainer('Ash', [Pokemon(1, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+            Trainer('Misty', [Pokemon(4, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+            rng=SystemRandom(),
+        )
+        own_rng.start()
+        self.assertIsNot(own_rng.rng, Battle.from_bytes(own_rng.to_bytes()).rng)
+
+        unstarted = Battle(
+            Trainer('Ash', [Pokemon(1, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+            Trainer('Misty', [Pokemon(4, 22, ["tackle"], "male", stats_actual=[100] * 6)]),
+        )
+        with self.assertRaises(Exception) as context:
+            unstarted.to_bytes()
+        self.assertEqual("Attempted to serialize Battle that has not started", str(context.exception))
+
+    def test_to_bytes_layouts(self):
+        # seeds 7 and 16 include a confused Pokemon hurting itself
+        for seed in (0, 1, 2, 3, 4, 5, 7, 16):
+            t1, t2 = PokeSim.random_teams(2, 6, seed=seed, trainers=True)
+            battle = Battle(t1, t2, rng=Random(seed))
+            battle.start()
+            while not battle.is_finished() and battle.turn_count < 60:
+                for obj in sz._battle_objects(battle):
+                    name = type(obj).__name__
+                    layout = sz._LAYOUTS[name]
+                    encoded = set(layout.scalar_names + layout.values + layout.optional + sz._UNENCODED[name])
+                    for key in obj.__dict__:
+                        self.assertIn(key[1:] if key.startswith("_") and key[1:] in encoded else key, encoded)
+                data = battle.to_bytes()
+                self.assertEqual(data, Battle.from_bytes(data).to_bytes())
+                battle.turn(random_policy(battle, t1), random_policy(battle, t2))
+
+    @patch('poke_battle_sim.util.process_move._calculate_is_critical')
+    def test_profiler(self, mock_calculate_crit):
+        pokemon_1 = Pokemon(25, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 100], item="leftovers")
+        trainer_1 = Trainer('Ash', [pokemon_1])
+        pokemon_2 = Pokemon(4, 22, ["tackle"], "male", stats_actual=[100, 100, 100, 100, 100, 1])
+        trainer_2 = Trainer('Misty', [pokemon_2])
+        profiler = Profiler()
+        battle = Battle(trainer_1, trainer_2, profiler=profiler)
+        battle.start()
+
+        mock_calculate_crit.return_value = False
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(2, profiler.phases["turn"][0])
+        self.assertEqual(4, profiler.phases["half_turn"][0])
+        self.assertEqual(4, profiler.phases["process_move"][0])
+        self.assertEqual(2, profiler.phases["battlefield_update"][0])
+        self.assertEqual(4, profiler.effects[pokemon_1.moves[0].ef_id][0])
+        self.assertEqual(2, profiler.handlers[("end_turn_items", "leftovers")])
+        self.assertIn("half_turn", profiler.report())
+
+        with patch('poke_battle_sim.util.process_move.process_move', side_effect=Exception("Move failed")):
+            with self.assertRaises(Exception):
+                battle.turn(["move", "tackle"], ["move", "tackle"])
+        self.assertEqual(5, profiler.phases["process_move"][0])
+        self.assertEqual(3, profiler.phases["turn"][0])
+        self.assertEqual([], profiler._starts)
+
+    @patch('poke_battle_sim.util.process_move._calculate_is_critical')
+    def test_move_slots(self, mock_calculate_crit):
+        mock_calculate_crit.return_value = False
+        pokemon_1 = Pokemon(235, 40, ["tackle", "sketch", "growl"], "male", stats_actual=[500, 10, 100, 10, 100, 90])
+        pokemon_2 = Pokemon(132, 40, ["transform", "thunder-shock"], "male", stats_actual=[500, 10, 100, 10, 100, 45])
+        battle = Battle(Trainer("Ash", [pokemon_1]), Trainer("Misty", [pokemon_2]))
+        battle.start()
+        self.assertEqual({"tackle": 0, "sketch": 1, "growl": 2}, pokemon_1.move_slots)
+        self.assertEqual(0b111, pokemon_1.available_mask())
+
+        battle.turn(["move", "tackle"], ["move", "thunder-shock"])
+        pokemon_1.moves[1] = Move(PokeSim.get_single_move("thunder-shock"))
+        self.assertIs(pokemon_1.moves[1], pokemon_1.get_move_data("thunder-shock"))
+        self.assertEqual({"tackle": 0, "thunder-shock": 1, "growl": 2}, pokemon_1.move_slots)
+        self.assertTrue(pokemon_1.is_move("thunder-shock"))
+        self.assertFalse(pokemon_1.is_move("sketch"))
+
+        pokemon_1.moves[0].disabled = 2
+        pokemon_1.taunt = 2
+        self.assertEqual(0b010, pokemon_1.available_mask())
+        self.assertEqual([pokemon_1.moves[1]], pokemon_1.get_available_moves())
+        self.assertFalse(pokemon_1.is_move("tackle"))
+        self.assertFalse(battle.t1.can_use_move(["move", "growl"]))
+        self.assertTrue(battle.t1.can_use_move(["move", "thunder-shock"]))
+        pokemon_1.moves[0].disabled = 0
+        pokemon_1.taunt = 0
+
+        battle.turn(["move", "growl"], ["move", "transform"])
+        self.assertEqual({"tackle": 0, "thunder-shock": 1, "growl": 2}, pokemon_2.move_slots)
+        self.assertTrue(pokemon_2.is_move("growl"))
+        self.assertFalse(pokemon_2.is_move("transform"))
+        pokemon_2.reset_transform()
+        self.assertEqual({"transform": 0, "thunder-shock": 1}, pokemon_2.move_slots)
+        self.assertTrue(pokemon_2.is_move("transform"))
+        self.assertIsNone(pokemon_2.move_slot(["transform"]))
+
 
 if __name__ == '__main__':
     unittest.main()
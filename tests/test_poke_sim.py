@@ -0,0 +1,119 @@
+import gc
+import tracemalloc
+import unittest
+
+from poke_battle_sim import PokeSim, Trainer
+import poke_battle_sim.conf.global_settings as gs
+from poke_battle_sim.util.packed_table import PackedTable
+
+
+class TestPokeSim(unittest.TestCase):
+
+    def test_packed_table(self):
+        rows = [[1, "bulbasaur", "grass", ""], [2, "ivysaur", "grass", "poison"]]
+        table = PackedTable([list(row) for row in rows])
+
+        self.assertEqual(2, len(table))
+        self.assertEqual(rows[1], table[1])
+        self.assertEqual(rows[0], table[-2])
+        self.assertIs(table[0][2], table[1][2])
+        self.assertEqual(["bulbasaur", "grass"], table[0][1:3])
+        self.assertEqual(rows, [list(row) for row in table])
+        with self.assertRaises(IndexError):
+            table[2]
+
+    def test_static_data_accessors(self):
+        self.assertEqual([25, "pikachu", "electric", "", 35, 55, 40, 50, 50, 90, 4, 60, 112, 1], PokeSim.get_pokemon("pikachu"))
+        self.assertEqual("tackle", PokeSim.get_single_move("tackle")[1])
+        self.assertEqual(35, PokeSim.get_single_move("tackle")[5])
+        self.assertEqual(2.0, PokeSim.get_type_ef("water", "fire"))
+        self.assertEqual(0.0, PokeSim.get_type_ef("normal", "ghost"))
+        self.assertTrue(PokeSim.check_item("oran-berry"))
+        self.assertTrue(PokeSim.check_ability("levitate"))
+
+    def test_queries(self):
+        fire = PokeSim.query_moves(type="fire", min_power=80)
+        self.assertIn(PokeSim._move_name_to_id["flamethrower"], fire)
+        self.assertNotIn(PokeSim._move_name_to_id["ember"], fire)
+        for move_id in fire:
+            move = PokeSim._move_list[move_id - 1]
+            self.assertEqual("fire", move[gs.MOVE_TYPE])
+            self.assertGreaterEqual(move[gs.MOVE_POWER], 80)
+        self.assertEqual(sorted(fire), list(fire))
+
+        physical = PokeSim.query_moves(category=gs.PHYSICAL, ef_id=1, bitmap=True)
+        normal = PokeSim.query_moves(type="normal", bitmap=True)
+        self.assertEqual(
+            sorted(set(PokeSim.query_moves(category=gs.PHYSICAL, ef_id=1)) & set(PokeSim.query_moves(type="normal"))),
+            list(PokeSim.bitmap_ids(physical & normal)),
+        )
+        self.assertEqual([PokeSim._move_name_to_id["blaze-kick"]], list(PokeSim.query_moves(min_power=85, max_power=85, type="fire")))
+
+        immune = PokeSim.query_pokemon(immune_to="ground")
+        self.assertIn(PokeSim.get_pokemon_id("pidgey"), immune)
+        self.assertNotIn(PokeSim.get_pokemon_id("pikachu"), immune)
+        self.assertIn(PokeSim.get_pokemon_id("bulbasaur"), PokeSim.query_pokemon(types=("poison", "grass"), gen=1))
+        self.assertNotIn(PokeSim.get_pokemon_id("bulbasaur"), PokeSim.query_pokemon(types=("grass", "")))
+
+        usable = [PokeSim.get_item_name(i) for i in PokeSim.query_items(usable=True)]
+        self.assertIn("potion", usable)
+        self.assertNotIn("leftovers", usable)
+        self.assertIn("master-ball", [PokeSim.get_item_name(i) for i in PokeSim.query_items(pocket="poke balls pocket")])
+
+    def test_random_teams(self):
+        teams = PokeSim.random_teams(50, 6, seed=3)
+        self.assertEqual(teams, PokeSim.random_teams(50, 6, seed=3))
+        self.assertEqual(50, len(teams))
+        for team in teams:
+            self.assertEqual(6, len(team))
+            for kwargs in team:
+                self.assertEqual(4, len(set(kwargs["moves"])))
+                self.assertLessEqual(sum(kwargs["evs"]), gs.EV_TOTAL_MAX)
+
+        fire = PokeSim.query_pokemon(type="fire")
+        constraints = {
+            "species": fire,
+            "moves": PokeSim.query_moves(type="fire"),
+            "level": 50,
+            "ev_total": 0,
+            "items": ["leftovers"],
+            "unique_species": True,
+        }
+        trainers = PokeSim.random_teams(5, 3, seed=3, constraints=constraints, trainers=True)
+        for trainer in trainers:
+            self.assertIsInstance(trainer, Trainer)
+            self.assertEqual(3, len({poke.id for poke in trainer.poke_list}))
+            for poke in trainer.poke_list:
+                self.assertIn(poke.id, fire)
+                self.assertEqual(50, poke.level)
+                self.assertEqual([0] * 6, poke.evs)
+                self.assertEqual("leftovers", poke.o_item)
+                self.assertTrue(all(move.type == "fire" for move in poke.moves))
+
+        with self.assertRaises(Exception):
+            PokeSim.random_teams(1, 6, constraints={"level": 101})
+        with self.assertRaises(Exception):
+            PokeSim.random_teams(1, 6, constraints={"shiny": True})
+
+    def test_reading_rows_keeps_no_objects(self):
+        PokeSim.start()
+        tables = (PokeSim._move_list, PokeSim._pokemon_stats, PokeSim._item_data, PokeSim._ability_data)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for table in tables:
+                for row in table:
+                    list(row)
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(after - before, 4096)
+
+    def test_freeze(self):
+        PokeSim.freeze()
+        self.assertGreater(gc.get_freeze_count(), 0)
+        gc.unfreeze()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import contextlib
+import cProfile
+import io
+import os
+import tempfile
+import unittest
+
+from poke_battle_sim.profile import run_workload, thread_scaling, cprofile_collapsed, main, StackSampler
+
+
+def inner():
+    return sum(i * i for i in range(20000))
+
+
+def outer():
+    for _ in range(5):
+        inner()
+
+
+class TestProfile(unittest.TestCase):
+
+    def test_workload_is_reproducible(self):
+        stats_1 = run_workload(10, 2, 7, 50)
+        stats_2 = run_workload(10, 2, 7, 50)
+
+        self.assertEqual(10, stats_1["battles"])
+        self.assertEqual(stats_1["turns"], stats_2["turns"])
+        self.assertEqual(stats_1["errors"], stats_2["errors"])
+
+    def test_thread_scaling(self):
+        results = thread_scaling(12, 2, 3, 50, 3)
+
+        self.assertEqual([1, 2, 3], [result["threads"] for result in results])
+        self.assertEqual(1, len({result["turns"] for result in results}))
+        self.assertGreater(results[0]["turns"], 0)
+
+    def test_stack_sampler_collapsed(self):
+        sampler = StackSampler()
+        sampler.stacks = {"a:main;b:turn": 3, "a:main;b:turn;c:damage": 2, "a:main;c:damage": 1}
+
+        self.assertEqual("a:main;b:turn 3\na:main;b:turn;c:damage 2\na:main;c:damage 1", sampler.collapsed())
+        self.assertEqual([("b:turn", 3), ("c:damage", 3)], sampler.top(2))
+
+    def test_cprofile_collapsed(self):
+        profiler = cProfile.Profile()
+        profiler.runcall(outer)
+        stacks = dict(line.rsplit(" ", 1) for line in cprofile_collapsed(profiler).splitlines())
+
+        self.assertIn("test_profile:outer;test_profile:inner;<built-in method builtins.sum>", stacks)
+        self.assertTrue(all(int(count) > 0 for count in stacks.values()))
+
+    def test_main_writes_collapsed_stacks_with_cprofile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stacks.txt")
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(["--battles", "1", "--mode", "cprofile", "--collapsed", path])
+            with open(path) as file:
+                self.assertIn("profile:run_workload;", file.read())
+
+    def test_main_invalid_arguments(self):
+        for argv in (["--battles", "0"], ["--mode", "none", "--collapsed", "stacks.txt"]):
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                main(argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import random
+import tempfile
+import unittest
+
+from poke_battle_sim import PokeSim, Battle
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.replay import ReplayRecorder, ReplayPlayer
+import poke_battle_sim.conf.global_settings as gs
+
+
+def random_selection(trainer):
+    candidates = [p for p in trainer.poke_list if p.is_alive and p is not trainer.current_poke]
+    if candidates:
+        trainer.current_poke = trainer.cur_battle.rng.choice(candidates)
+
+
+def snapshot(battle):
+    return repr([
+        battle.turn_count,
+        battle.get_winner() and battle.get_winner().name,
+        [(p.cur_hp, p.nv_status, p.stat_stages, [m.current_pp for m in p.moves]) for p in battle.t1.poke_list + battle.t2.poke_list],
+    ])
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "battle.replay")
+
+    def record(self, seed, streams=None):
+        t1, t2 = PokeSim.random_teams(2, 4, seed=seed, trainers=True)
+        t1.selection = random_selection
+        t2.selection = random_selection
+        battle = Battle(t1, t2, rng=random.Random(seed))
+        if streams is not None:
+            battle.enable_random_streams(streams)
+        snapshots = {}
+        with ReplayRecorder(battle, self.path, seed=seed, keyframe_interval=5) as recorder:
+            recorder.start()
+            while not battle.is_finished() and battle.turn_count < 40:
+                recorder.turn(random_policy(battle, t1), random_policy(battle, t2))
+                snapshots[battle.turn_count] = snapshot(battle)
+        return battle, snapshots
+
+    def test_replay_reproduces_battle(self):
+        battle, snapshots = self.record(2)
+        player = ReplayPlayer(self.path)
+
+        self.assertEqual(battle.turn_count, player.turns)
+        replayed = player.play()
+        self.assertEqual(snapshot(battle), snapshot(replayed))
+        self.assertEqual([], replayed.get_all_text())
+
+    def test_replay_seek(self):
+        _, snapshots = self.record(4)
+        player = ReplayPlayer(self.path)
+
+        for turn in (len(snapshots), 1, 7, 6, 12, 3):
+            self.assertEqual(snapshots[turn], snapshot(player.seek(turn)))
+        with self.assertRaises(Exception) as context:
+            player.seek(len(snapshots) + 1)
+        self.assertEqual("Attempted to seek replay to invalid turn", str(context.exception))
+
+    def test_replay_random_streams(self):
+        battle, snapshots = self.record(3, streams=7)
+        player = ReplayPlayer(self.path)
+
+        self.assertEqual(snapshot(battle), snapshot(player.play()))
+        self.assertEqual(7, player.battle.streams.seed)
+        for turn in (6, 11, 2):
+            self.assertEqual(snapshots[turn], snapshot(player.seek(turn)))
+
+    def test_replay_turn_limit(self):
+        t1, t2 = PokeSim.random_teams(2, 4, seed=5, trainers=True)
+        battle = Battle(t1, t2, max_turns=3, stall_turns=20, rng=random.Random(5))
+        state = random.getstate()
+        with ReplayRecorder(battle, self.path, seed=5) as recorder:
+            recorder.start()
+            while not battle.is_finished():
+                recorder.turn(random_policy(battle, t1), random_policy(battle, t2))
+        self.assertEqual(state, random.getstate())
+
+        replayed = ReplayPlayer(self.path, text=True).play()
+        self.assertEqual(gs.DRAW_TURN_LIMIT, replayed.draw_reason)
+        self.assertEqual(20, replayed.stall_turns)
+        self.assertTrue(replayed.is_finished())
+        self.assertEqual(battle.get_all_text(), replayed.get_all_text())
+
+    def test_truncated_replay(self):
+        _, snapshots = self.record(4)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        with open(self.path, "wb") as file:
+            file.write(data[:-3])
+
+        player = ReplayPlayer(self.path)
+        self.assertEqual(len(snapshots) - 1, player.turns)
+        self.assertEqual(snapshots[player.turns], snapshot(player.play()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from poke_battle_sim.server import BattleServer, BattleClient, random_batch_policy
+
+TEAM_1 = {"name": "Ash", "pokemon": [{"name_or_id": 25, "level": 22, "moves": ["tackle"], "gender": "male", "stats_actual": [100, 100, 100, 100, 100, 100]}]}
+TEAM_3 = {"name": "Brock", "pokemon": [{"name_or_id": 4, "level": 22, "moves": ["tackle"], "gender": "male", "stats_actual": [1, 100, 100, 100, 100, 1]}]}
+TEAM_2 = {"name": "Misty", "pokemon": [{"name_or_id": 4, "level": 22, "moves": ["tackle"], "gender": "male", "stats_actual": [100, 100, 100, 100, 100, 1]}]}
+
+
+class TestServer(unittest.TestCase):
+
+    def run_with_server(self, scenario, policy=random_batch_policy, pool_size=2):
+        async def main():
+            server = BattleServer(policy=policy)
+            tcp_server = await server.start(port=0)
+            client = BattleClient(pool_size=pool_size)
+            await client.connect(port=tcp_server.sockets[0].getsockname()[1])
+            try:
+                return await scenario(client)
+            finally:
+                await client.close()
+                await server.close()
+
+        return asyncio.run(main())
+
+    def test_turn_with_client_actions(self):
+        async def scenario(client):
+            battle = (await client.request("create", teams=[TEAM_1, TEAM_2]))["battle"]
+            return await client.request("turn", battle=battle, actions=[["move", "tackle"], ["move", "tackle"]])
+
+        response = self.run_with_server(scenario)
+        self.assertIn("PIKACHU used Tackle!", response["text"])
+        self.assertFalse(response["finished"])
+        self.assertIsNone(response["winner"])
+
+    def test_policy_decisions_are_batched(self):
+        calls = []
+
+        def policy(decisions):
+            calls.append(len(decisions))
+            return random_batch_policy(decisions)
+
+        async def scenario(client):
+            battles = await asyncio.gather(*[client.request("create", teams=[TEAM_1, TEAM_2]) for _ in range(8)])
+            return await asyncio.gather(
+                *[client.request("turn", battle=b["battle"], actions=[None, None]) for b in battles]
+            )
+
+        responses = self.run_with_server(scenario, policy)
+        self.assertEqual(8, len(responses))
+        self.assertEqual(16, sum(calls))
+        self.assertLess(len(calls), 16)
+
+    def test_valid_and_errors(self):
+        async def scenario(client):
+            battle = (await client.request("create", teams=[TEAM_1, TEAM_2]))["battle"]
+            valid = await client.request("valid", battle=battle, trainer=0, action=["move", "tackle"])
+            invalid = await client.request("valid", battle=battle, trainer=1, action=["move", "ember"])
+            await client.request("close", battle=battle)
+            with self.assertRaises(Exception) as context:
+                await client.request("turn", battle=battle, actions=[None, None])
+            return valid, invalid, str(context.exception)
+
+        valid, invalid, error = self.run_with_server(scenario)
+        self.assertTrue(valid["valid"])
+        self.assertFalse(invalid["valid"])
+        self.assertEqual("Attempted to use invalid battle id", error)
+
+
+    def test_concurrent_turns_of_finishing_battle(self):
+        team = {"name": "Ash", "pokemon": [{**TEAM_1["pokemon"][0], "moves": ["thunder-shock"]}]}
+
+        async def scenario(client):
+            battle = (await client.request("create", teams=[team, TEAM_3]))["battle"]
+            return await asyncio.gather(
+                *[client.request("turn", battle=battle, actions=[None, None]) for _ in range(2)],
+                return_exceptions=True,
+            )
+
+        first, second = self.run_with_server(scenario)
+        self.assertEqual("Ash", first["winner"])
+        self.assertEqual("Attempted to process turn of finished battle", str(second))
+
+    def test_turn_of_battle_closed_while_deciding(self):
+        async def scenario(client):
+            battle = (await client.request("create", teams=[TEAM_1, TEAM_2]))["battle"]
+            turn = asyncio.ensure_future(client.request("turn", battle=battle, actions=[None, None]))
+            await asyncio.sleep(0)
+            await client.request("close", battle=battle)
+            with self.assertRaises(Exception) as context:
+                await turn
+            return str(context.exception)
+
+        # one connection, so that the server reads the turn before the close
+        self.assertEqual("Attempted to process turn of closed battle", self.run_with_server(scenario, pool_size=1))
+
+    def test_policy_returning_too_few_actions(self):
+        calls = []
+
+        def policy(decisions):
+            calls.append(len(decisions))
+            return random_batch_policy(decisions)[1:] if len(calls) == 1 else random_batch_policy(decisions)
+
+        async def scenario(client):
+            battle = (await client.request("create", teams=[TEAM_1, TEAM_2]))["battle"]
+            with self.assertRaises(Exception) as context:
+                await client.request("turn", battle=battle, actions=[None, None])
+            return str(context.exception), await client.request("turn", battle=battle, actions=[None, None])
+
+        error, response = self.run_with_server(scenario, policy)
+        self.assertEqual("Attempted to decide actions with policy returning too few actions", error)
+        self.assertIn("Turn 1:", response["text"])
+
+    def test_malformed_messages_keep_connection(self):
+        async def main():
+            server = BattleServer()
+            tcp_server = await server.start(port=0)
+            reader, writer = await asyncio.open_connection(port=tcp_server.sockets[0].getsockname()[1])
+            try:
+                writer.write(b"not json\n[1]\n" + json.dumps({"id": 3, "op": "nothing"}).encode() + b"\n")
+                await writer.drain()
+                return [json.loads(await reader.readline()) for _ in range(3)]
+            finally:
+                writer.close()
+                await server.close()
+
+        responses = asyncio.run(main())
+        self.assertEqual(
+            [
+                {"id": None, "error": "Attempted to decode invalid message"},
+                {"id": None, "error": "Attempted to handle request that is not an object"},
+                {"id": 3, "error": "Attempted to use invalid battle id"},
+            ],
+            sorted(responses, key=lambda response: (response["id"] or 0, response["error"])),
+        )
+
+    def test_serve_forever(self):
+        async def main(path):
+            server = BattleServer()
+            serving = asyncio.create_task(server.serve_forever(path=path))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.001)
+            client = BattleClient()
+            await client.connect(path=path)
+            response = await client.request("create", teams=[TEAM_1, TEAM_2])
+            await client.close()
+            serving.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await serving
+            return response
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(1, asyncio.run(main(os.path.join(directory, "server.sock")))["battle"])
+
+
+if __name__ == '__main__':
+    unittest.main()
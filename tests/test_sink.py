@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from poke_battle_sim.batch import run_batch, game_seed, random_policy
+from poke_battle_sim.sink import JsonlSink, open_sink, pyarrow
+from tests.test_batch import make_battle
+
+
+class TestSink(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def test_run_batch_csv_sink(self):
+        path = os.path.join(self.dir, "results.csv")
+        result = run_batch(make_battle, max_battles=25, width=0.01, chunk_size=10, seed=1, sink=path)
+
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(25, len(rows))
+        self.assertEqual(result.t1_wins, sum(row["winner"] == "1" for row in rows))
+        self.assertEqual(result.turns_sum, sum(int(row["turns"]) for row in rows))
+        self.assertEqual("25", rows[0]["t1_team"])
+        self.assertEqual(["0", "1", "2"], [row["chunk"] for row in rows[::10]])
+
+    def test_run_batch_jsonl_sink_per_chunk(self):
+        path = os.path.join(self.dir, "results-{chunk}.jsonl")
+        run_batch(make_battle, max_battles=20, width=0.01, chunk_size=10, seed=1, sink=path)
+
+        for chunk in range(2):
+            with open(path.format(chunk=chunk)) as file:
+                rows = [json.loads(line) for line in file]
+            self.assertEqual(10, len(rows))
+            self.assertEqual([game_seed(1 + chunk, game) for game in range(10)], [row["seed"] for row in rows])
+            self.assertEqual([4], rows[0]["t2_team"])
+            self.assertTrue(all(hp == 0 for row in rows for hp in (row["t1_hp"] if row["winner"] == 2 else row["t2_hp"])))
+
+    def test_sink_rows_replay(self):
+        path = os.path.join(self.dir, "results.jsonl")
+        run_batch(make_battle, max_battles=12, width=0.01, chunk_size=6, seed=4, sink=path)
+        with open(path) as file:
+            rows = [json.loads(line) for line in file]
+
+        battle = make_battle()
+        for row in rows:
+            battle.reset(seed=row["seed"])
+            battle.start()
+            while not battle.is_finished() and battle.turn_count < 1000:
+                battle.turn(random_policy(battle, battle.t1), random_policy(battle, battle.t2))
+            self.assertEqual(row["turns"], battle.turn_count)
+            self.assertEqual(row["t1_hp"] + row["t2_hp"], [poke.cur_hp for poke in battle.t1.poke_list + battle.t2.poke_list])
+
+    def test_sink_buffers_rows(self):
+        path = os.path.join(self.dir, "results.jsonl")
+        with JsonlSink(path, buffer_rows=3) as sink:
+            for i in range(4):
+                sink.add({"game": i})
+            self.assertEqual(3, sink.rows_written)
+            with open(path) as file:
+                self.assertEqual(3, sum(1 for _ in file))
+        with open(path) as file:
+            self.assertEqual(4, sum(1 for _ in file))
+
+    def test_invalid_sinks(self):
+        with self.assertRaises(Exception):
+            open_sink(os.path.join(self.dir, "results.txt"))
+        with self.assertRaises(Exception) as context:
+            run_batch(make_battle, workers=2, sink=os.path.join(self.dir, "results.csv"))
+        self.assertEqual("Attempted to run batch with sink shared between chunks", str(context.exception))
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_run_batch_parquet_sink(self):
+        import pyarrow.parquet
+
+        path = os.path.join(self.dir, "results-{chunk}.parquet")
+        run_batch(make_battle, max_battles=10, width=0.01, chunk_size=10, seed=1, sink=path)
+        self.assertEqual(10, pyarrow.parquet.read_table(path.format(chunk=0)).num_rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from random import Random
+
+from poke_battle_sim import PokeSim, Battle
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.core.text_log import TextLog
+
+
+def play(text_log: TextLog = None) -> tuple[Battle, list]:
+    t1, t2 = PokeSim.random_teams(2, 3, seed=4, trainers=True)
+    battle = Battle(t1, t2, text_log=text_log, rng=Random(4))
+    battle.start()
+    turns = [battle.get_cur_text()]
+    while not battle.is_finished() and battle.turn_count < 50:
+        battle.turn(random_policy(battle, t1), random_policy(battle, t2))
+        turns.append(battle.get_cur_text())
+    return battle, turns
+
+
+class TestTextLog(unittest.TestCase):
+
+    def test_file_stream(self):
+        battle, turns = play()
+        with tempfile.TemporaryFile("w+") as file:
+            log = TextLog(keep=5, stream=file, batch=3)
+            logged, logged_turns = play(log)
+
+            self.assertEqual(turns, logged_turns)
+            self.assertEqual(battle.get_all_text(), logged.get_all_text())
+            self.assertLessEqual(len(log._lines), 8)
+            self.assertEqual(len(battle.get_all_text()), len(log))
+
+            logged.close()
+            file.seek(0)
+            self.assertEqual(battle.get_all_text(), file.read().splitlines())
+
+    def test_callback_stream(self):
+        battle, _ = play()
+        batches = []
+        log = TextLog(keep=4, stream=batches.append, batch=2)
+        play(log)
+
+        streamed = [line for batch in batches for line in batch]
+        self.assertTrue(all(len(batch) == 2 for batch in batches))
+        self.assertEqual(battle.get_all_text()[:len(streamed)], streamed)
+        self.assertEqual(battle.get_all_text()[-len(log._lines):], log.read_all())
+
+    def test_write_only_stream(self):
+        class Writer:
+            def __init__(self):
+                self.text = ""
+
+            def write(self, text):
+                self.text += text
+
+        battle, _ = play()
+        writer = Writer()
+        logged, _ = play(TextLog(keep=4, stream=writer, batch=2))
+        logged.close()
+
+        self.assertEqual(battle.get_all_text(), writer.text.splitlines())
+        self.assertEqual(battle.get_all_text()[-4:], logged.get_all_text()[-4:])
+
+    def test_ring_buffer(self):
+        log = TextLog(keep=3, batch=2)
+        for i in range(10):
+            log.append(str(i))
+        self.assertEqual(10, len(log))
+        self.assertEqual(["6", "7", "8", "9"], log.read_all())
+        self.assertEqual("9", log.pop())
+        del log[7:]
+        self.assertEqual(["6"], log.read_new())
+        self.assertEqual([], log.read_new())
+
+        with self.assertRaises(Exception) as context:
+            del log[2:]
+        self.assertEqual("Attempted to remove text no longer held by TextLog", str(context.exception))
+        with self.assertRaises(Exception) as context:
+            TextLog(keep=0)
+        self.assertEqual("Attempted to create TextLog with invalid number of kept lines", str(context.exception))
+
+    def test_journal_holds_text(self):
+        battle, _ = play()
+        batches = []
+        log = TextLog(keep=2, stream=batches.append, batch=2)
+        t1, t2 = PokeSim.random_teams(2, 3, seed=4, trainers=True)
+        logged = Battle(t1, t2, text_log=log, rng=Random(4))
+        logged.enable_journal()
+        logged.start()
+        marker = logged.mark()
+        state = logged.rng.getstate()
+        for _ in range(5):
+            logged.turn(random_policy(logged, t1), random_policy(logged, t2))
+        logged.undo_to(marker)
+        logged.rng.setstate(state)
+        while not logged.is_finished() and logged.turn_count < 50:
+            logged.turn(random_policy(logged, t1), random_policy(logged, t2))
+        logged.close()
+
+        self.assertEqual(battle.get_all_text(), [line for batch in batches for line in batch])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import gc
+import unittest
+
+from poke_battle_sim import PokeSim
+from poke_battle_sim.tournament import Tournament, paired_comparison
+
+
+def make_team(level):
+    return [{"name_or_id": 25, "level": level, "moves": ["tackle", "thunder-shock"], "gender": "male", "ivs": [31] * 6, "evs": [0] * 6, "nature": "hardy"}]
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_round_robin(self):
+        results = []
+        tournament = Tournament([make_team(40), make_team(10), make_team(25)], games=4, seed=1)
+        tournament.run(callback=lambda i, j, result: results.append((i, j, result)))
+
+        self.assertEqual([(0, 1), (0, 2), (1, 2)], [(i, j) for i, j, _ in results])
+        self.assertTrue(all(sum(result) == 4 for _, _, result in results))
+        self.assertEqual([], tournament.pending())
+        matrix = tournament.win_rate_matrix()
+        self.assertIsNone(matrix[1][1])
+        self.assertEqual(1, matrix[0][2] + matrix[2][0])
+        self.assertEqual(1.0, matrix[0][1])
+
+    def test_ratings(self):
+        tournament = Tournament([make_team(10), make_team(40), make_team(25)], games=4, seed=1).run()
+
+        elo = tournament.elo_ratings()
+        self.assertGreater(elo[1], elo[2])
+        self.assertGreater(elo[2], elo[0])
+        self.assertAlmostEqual(1500, sum(elo) / 3)
+
+    def test_seeded_results(self):
+        teams = PokeSim.random_teams(4, 2, seed=3)
+        first = Tournament(teams, games=2, seed=7, max_turns=50).run()
+        second = Tournament(teams, games=2, seed=7, max_turns=50, workers=2).run()
+
+        self.assertEqual(first.results, second.results)
+        self.assertEqual(0, gc.get_freeze_count())
+
+    def test_add_team(self):
+        tournament = Tournament([make_team(40), make_team(10)], games=2, seed=1).run()
+        played = dict(tournament.results)
+        tournament.add_team(make_team(25))
+
+        self.assertEqual([(0, 2), (1, 2)], tournament.pending())
+        tournament.run()
+        self.assertEqual(played[(0, 1)], tournament.results[(0, 1)])
+        self.assertEqual(3, len(tournament.results))
+
+    def test_invalid_tournament(self):
+        with self.assertRaises(Exception):
+            Tournament([make_team(10)], games=0)
+        with self.assertRaises(Exception):
+            Tournament([make_team(10)], policies=[])
+        with self.assertRaises(Exception):
+            Tournament().add_team([])
+
+    def test_paired_comparison(self):
+        opponents = [make_team(20), make_team(24)]
+        same = paired_comparison(make_team(22), make_team(22), opponents, games=5, seed=1)
+
+        self.assertEqual(10, same.games)
+        self.assertEqual(same.a_scores, same.b_scores)
+        self.assertEqual(0, same.difference)
+        self.assertEqual(1, same.variance_reduction)
+        self.assertIn("reduction: 100.0%", same.report())
+
+        result = paired_comparison(make_team(22), make_team(23), opponents, games=5, seed=1, common=False)
+        self.assertFalse(result.common)
+        low, high = result.difference_interval()
+        self.assertLessEqual(low, result.difference)
+        self.assertLessEqual(result.difference, high)
+        with self.assertRaises(Exception):
+            paired_comparison(make_team(22), make_team(23), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
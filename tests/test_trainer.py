@@ -111,6 +111,33 @@ class TestTrainer(unittest.TestCase):
             trainer.can_switch_out()
         self.assertEqual("Trainer must be in battle", str(context.exception))
 
+    def test_to_bytes(self):
+        pokemon_1 = Pokemon(25, 22, ["tackle", "thunder-shock"], "female", ability="static", nature="modest",
+                            ivs=[31] * 6, evs=[0, 0, 0, 252, 4, 252], item="light-ball", nickname="sparky",
+                            cur_hp=20, status="paralyzed")
+        pokemon_1.moves[1].current_pp = 3
+        pokemon_2 = Pokemon("shedinja", 30, ["scratch"], "genderless", stats_actual=[1, 90, 45, 30, 30, 40])
+        trainer = Trainer('Ash', [pokemon_1, pokemon_2])
+
+        data = trainer.to_bytes()
+        copy = Trainer.from_bytes(data)
+
+        self.assertEqual(data, copy.to_bytes())
+        self.assertEqual("Ash", copy.name)
+        copy_1, copy_2 = copy.poke_list
+        self.assertEqual(pokemon_1.stats_actual, copy_1.stats_actual)
+        self.assertEqual(20, copy_1.cur_hp)
+        self.assertEqual(pokemon_1.nv_status, copy_1.nv_status)
+        self.assertEqual(["tackle", "thunder-shock"], [move.name for move in copy_1.moves])
+        self.assertEqual(3, copy_1.moves[1].current_pp)
+        self.assertEqual(("static", "modest", "light-ball", "SPARKY"), (copy_1.ability, copy_1.nature, copy_1.o_item, copy_1.nickname))
+        self.assertEqual([1, 90, 45, 30, 30, 40], copy_2.stats_actual)
+        self.assertIsNone(copy_2.ivs)
+
+        with self.assertRaises(Exception) as context:
+            Trainer.from_bytes(b"PBS" + bytes([99, 1]))
+        self.assertEqual("Attempted to deserialize data of unsupported version", str(context.exception))
+
 
 if __name__ == '__main__':
     unittest.main()
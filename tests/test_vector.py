@@ -0,0 +1,164 @@
+import random
+import unittest
+
+from poke_battle_sim import Battle, Pokemon, Trainer
+from poke_battle_sim.batch import random_policy
+from poke_battle_sim.vector import (
+    SUPPORTED_EFFECTS,
+    VectorBattles,
+    _BOOST_ITEMS,
+    _ITEMS,
+    _PINCH_ABILITIES,
+    _TYPE_BOOST,
+    is_supported,
+    np,
+    run_battles,
+)
+
+
+def make_poke(name_or_id, moves, level=50, **kwargs):
+    return Pokemon(name_or_id, level, moves, "male", ivs=[31] * 6, evs=[0] * 6, nature="hardy", **kwargs)
+
+
+def make_battle():
+    t1 = Trainer("Ash", [
+        make_poke(25, ["thunder-shock", "tackle", "growl"], item="leftovers"),
+        make_poke(4, ["ember", "scratch", "smokescreen"], ability="blaze"),
+    ])
+    t2 = Trainer("Misty", [
+        make_poke(7, ["water-gun", "tail-whip", "tackle"], item="life-orb"),
+        make_poke(1, ["vine-whip", "poison-powder", "sleep-powder"], item="sitrus-berry"),
+    ])
+    return Battle(t1, t2, weather="sandstorm", text=False)
+
+
+def make_stat_battle():
+    t1 = Trainer("Ash", [
+        make_poke(7, ["bubble-beam", "metal-claw", "harden"], item="oran-berry", ability="torrent"),
+        make_poke(1, ["vine-whip", "acid", "growth"], item="expert-belt", ability="overgrow"),
+    ])
+    t2 = Trainer("Misty", [
+        make_poke(123, ["wing-attack", "swords-dance", "leer"], item="muscle-band", ability="swarm"),
+        make_poke(19, ["tackle", "steel-wing", "agility"], ability="run-away"),
+    ])
+    return Battle(t1, t2, weather="rain", text=False)
+
+
+def make_status_battle():
+    t1 = Trainer("Ash", [
+        make_poke(52, ["thunder-wave", "scratch", "poison-sting"], item="silk-scarf", ability="pickup"),
+        make_poke(4, ["ember", "toxic", "sing"], item="charcoal", ability="blaze"),
+    ])
+    t2 = Trainer("Misty", [
+        make_poke(25, ["thunder-punch", "stun-spore", "double-team"], item="wise-glasses", ability="lightning-rod"),
+        make_poke(7, ["water-gun", "ice-punch", "sand-attack"], item="mystic-water"),
+    ])
+    return Battle(t1, t2, weather="sunny", text=False)
+
+
+# matchups covering every supported move effect, item group and ability group between them
+MATCHUPS = {
+    "sandstorm": make_battle,
+    "stat stages": make_stat_battle,
+    "status": make_status_battle,
+}
+
+
+def play(battle):
+    battle.start()
+    while not battle.is_finished():
+        battle.turn(random_policy(battle, battle.t1), random_policy(battle, battle.t2))
+    return 1 if battle.get_winner() is battle.t1 else 2, battle.turn_count
+
+
+def make_seeded(make, seed):
+    battle = make()
+    battle.rng.seed(seed)
+    return battle
+
+
+def mean_and_se(values):
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return mean, (variance / len(values)) ** 0.5
+
+
+@unittest.skipUnless(np, "numpy is not installed")
+class TestVector(unittest.TestCase):
+
+    def test_matchup_coverage(self):
+        effects, items, abilities = set(), set(), set()
+        for make in MATCHUPS.values():
+            battle = make()
+            self.assertTrue(is_supported(battle))
+            for poke in battle.t1.poke_list + battle.t2.poke_list:
+                effects.update(move.ef_id for move in poke.moves)
+                items.add(_TYPE_BOOST if poke.o_item in _BOOST_ITEMS else _ITEMS.get(poke.o_item))
+                abilities.add("pinch" if poke.ability in _PINCH_ABILITIES else "inert")
+        # no move of the move table has effect 4
+        self.assertEqual(SUPPORTED_EFFECTS - {4}, effects)
+        self.assertEqual(set(_ITEMS.values()) | {_TYPE_BOOST}, items - {None})
+        self.assertEqual({"pinch", "inert"}, abilities)
+
+    def test_outcome_parity(self):
+        for name, make in MATCHUPS.items():
+            with self.subTest(name):
+                vector = VectorBattles([make() for _ in range(3000)], seed=1).run()
+                objects = [play(make_seeded(make, seed)) for seed in range(600)]
+
+                self.assertTrue(all(winner in (1, 2) for winner, _ in vector + objects))
+                vector_rate, vector_se = mean_and_se([winner == 1 for winner, _ in vector])
+                object_rate, object_se = mean_and_se([winner == 1 for winner, _ in objects])
+                self.assertLess(abs(vector_rate - object_rate), 4 * (vector_se ** 2 + object_se ** 2) ** 0.5)
+                vector_turns, vector_se = mean_and_se([turns for _, turns in vector])
+                object_turns, object_se = mean_and_se([turns for _, turns in objects])
+                self.assertLess(abs(vector_turns - object_turns), 4 * (vector_se ** 2 + object_se ** 2) ** 0.5)
+
+    def test_damage_parity(self):
+        def make():
+            return Battle(
+                Trainer("Ash", [make_poke(25, ["tackle"])]),
+                Trainer("Misty", [make_poke(7, ["tail-whip"])]),
+                text=False,
+            )
+
+        engine = VectorBattles([make() for _ in range(3000)], seed=2)
+        engine.step()
+        vector_hp = set(engine.hp[:, 1, 0].tolist())
+        random.seed(2)
+        object_hp = set()
+        for _ in range(300):
+            battle = make()
+            battle.start()
+            battle.turn(["move", "tackle"], ["move", "tail-whip"])
+            object_hp.add(battle.t2.current_poke.cur_hp)
+        self.assertTrue(object_hp <= vector_hp)
+        self.assertEqual(max(object_hp), max(vector_hp))
+
+    def test_routing(self):
+        unsupported = Battle(
+            Trainer("Ash", [make_poke(4, ["fire-fang"])]),
+            Trainer("Misty", [make_poke(7, ["tackle"])]),
+            text=False,
+        )
+        battles = [make_battle(), unsupported, make_battle()]
+        self.assertEqual([True, False, True], [is_supported(battle) for battle in battles])
+
+        outcomes = run_battles(battles, seed=3)
+        self.assertEqual(3, len(outcomes))
+        self.assertTrue(all(winner in (1, 2) and turns > 0 for winner, turns in outcomes))
+        self.assertFalse(battles[0].battle_started)
+        self.assertTrue(unsupported.is_finished())
+        self.assertEqual(outcomes[1][1], unsupported.turn_count)
+
+    def test_invalid_battles(self):
+        started = make_battle()
+        started.start()
+        self.assertFalse(is_supported(started))
+        with self.assertRaises(Exception) as context:
+            VectorBattles([make_battle(), started])
+        self.assertEqual("Attempted to create VectorBattles with unsupported Battle", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()